@@ -0,0 +1,62 @@
+"""
+Compares size and encode/decode time of cached excursions in pickle and compact codec.
+
+Run: python -m benchmarks.bench_codec [--excursions N] [--rounds N]
+"""
+import argparse
+import datetime
+import pickle
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from seeplaces import codec
+from seeplaces.cache import CacheEntry
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.testing import synthetic_excursion
+from seeplaces.window import ExcursionWindow
+
+
+def _timed(fn: Callable[[], Any], rounds: int) -> float:
+    """
+    Returns median duration of fn in milliseconds.
+    """
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--excursions", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    window = ExcursionWindow().merge(
+        datetime.date(2023, 1, 1),
+        datetime.date(2023, 1, 31),
+        [SeePlacesExcursion(**synthetic_excursion(_i)) for _i in range(args.excursions)],
+    )
+    entry = CacheEntry.create(window, ttl=3600)
+
+    formats: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+        "pickle": (pickle.dumps, pickle.loads),
+        "codec": (lambda _v: codec.encode(_v, compress=False), codec.decode),
+        "codec+zlib": (codec.encode, codec.decode),
+    }
+    for label, (dumps, loads) in formats.items():
+        data = dumps(entry)
+        encode_ms = _timed(lambda: dumps(entry), args.rounds)  # pylint: disable=W0640
+        decode_ms = _timed(lambda: loads(data), args.rounds)  # pylint: disable=W0640
+        print(
+            f"{label:>10}: {len(data) / 1024:8.1f} KiB, "
+            f"encode {encode_ms:7.2f} ms, decode {decode_ms:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compares get_excursions with and without compressed responses against local stub server
+on simulated link of limited bandwidth. Reports bytes on wire, latency and decode time.
+
+Run: python -m benchmarks.bench_compression [--items 100 1000 10000] [--calls N]
+                                            [--bandwidth BYTES_PER_SECOND] [--output FILE]
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+from typing import Any
+
+from seeplaces.metrics import (
+    DECODE_SECONDS,
+    HTTP_SECONDS,
+    RESPONSE_BYTES,
+    WIRE_BYTES,
+    InMemoryCollector,
+)
+from seeplaces.service import ACCEPT_ENCODING, SeePlacesOptions, SeePlacesService
+from seeplaces.testing import StubServer
+
+
+DATE_FROM = datetime.date(2023, 1, 1)
+DATE_TO = datetime.date(2023, 1, 7)
+ENDPOINT = "ExcursionForIataCode"
+
+
+def _mean(collector: InMemoryCollector, name: str) -> float:
+    """
+    Returns mean of histogram of excursions endpoint.
+    """
+    histogram = collector.histogram(name, endpoint=ENDPOINT)
+    return histogram.sum / histogram.count if histogram else 0.0
+
+
+def _measure(server: StubServer, compression: bool, calls: int, stream: bool) -> dict[str, Any]:
+    """
+    Returns sizes and timings of uncached get_excursions or iter_excursions calls.
+    """
+    options = SeePlacesOptions(
+        base_url=server.base_url,
+        api_version="1.0",
+        scope_id="123456",
+        compression=compression,
+    )
+    collector = InMemoryCollector()
+    latencies = []
+    with SeePlacesService(options=options, instrumentation=collector) as service:
+        service.get_excursions("AYT", DATE_FROM, DATE_TO, ["Slovak"])  # Load languages, warm up.
+        collector.reset()
+        for _ in range(calls):
+            start = time.perf_counter()
+            if stream:
+                excursions = list(service.iter_excursions("AYT", DATE_FROM, DATE_TO, ["Slovak"]))
+            else:
+                excursions = service.get_excursions("AYT", DATE_FROM, DATE_TO, ["Slovak"])
+            latencies.append(time.perf_counter() - start)
+            assert len(excursions) == server.items
+
+    return {
+        "wire_kib": _mean(collector, WIRE_BYTES) / 1024,
+        "body_kib": _mean(collector, RESPONSE_BYTES) / 1024,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "http_ms": _mean(collector, HTTP_SECONDS) * 1000,
+        "decode_ms": _mean(collector, DECODE_SECONDS) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--calls", type=int, default=10, help="Calls per scenario.")
+    parser.add_argument(
+        "--bandwidth", type=float, default=12.5e6, help="Bytes per second. Default 100 Mbit/s.",
+    )
+    parser.add_argument("--stream", action="store_true", help="Measure iter_excursions.")
+    parser.add_argument("--output", help="Write JSON results to file.")
+    args = parser.parse_args()
+
+    print(f"Accept-Encoding: {ACCEPT_ENCODING}")
+    results = []
+    with StubServer(compression=True, bandwidth=args.bandwidth) as server:
+        for items in args.items:
+            server.items = items
+            identity = _measure(server, compression=False, calls=args.calls, stream=args.stream)
+            compressed = _measure(server, compression=True, calls=args.calls, stream=args.stream)
+            results.append({"items": items, "identity": identity, "compressed": compressed})
+            for label, result in (("identity", identity), ("compressed", compressed)):
+                print(
+                    f"{items:>6} items {label:>10}: wire {result['wire_kib']:9.1f} KiB, "
+                    f"body {result['body_kib']:9.1f} KiB, p50 {result['p50_ms']:8.2f} ms, "
+                    f"decode {result['decode_ms']:6.2f} ms"
+                )
+            print(
+                f"{items:>6} items {'saved':>10}: "
+                f"{1 - compressed['wire_kib'] / identity['wire_kib']:.0%} bytes, "
+                f"{identity['p50_ms'] - compressed['p50_ms']:.2f} ms per call"
+            )
+
+    if args.output:
+        report = {"parameters": vars(args), "accept_encoding": ACCEPT_ENCODING, "results": results}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Load and soak test of SeePlacesService public api against local fault-injecting stub server.
+Replays synthetic or recorded access pattern at target rate with many concurrent callers,
+while stub api is slow, jittery or failing. Reports latency percentiles, error rate,
+upstream api calls and peak thread count.
+
+Run: python -m benchmarks.bench_load [--qps N] [--duration S] [--callers N]
+                                     [--latency S] [--jitter S] [--error-rate R]
+                                     [--pattern FILE] [--record FILE] [--output FILE]
+
+Pattern file has one JSON lookup per line, eg.:
+    {"iata_code": "AYT", "date_from": "2023-07-01", "date_to": "2023-07-07",
+     "spoken_languages": ["Slovak"]}
+"""
+import argparse
+import collections
+import dataclasses
+import datetime
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent import futures
+from typing import Any
+
+from seeplaces.cache import LocalCache
+from seeplaces.service import ExcursionLookup, SeePlacesOptions, SeePlacesService
+from seeplaces.testing import StubServer
+
+
+LANGUAGE_SETS = [["Slovak"], ["Czech"], ["Slovak", "English"], ["German"]]
+
+
+def synthetic_pattern(
+        count: int,
+        airports: int,
+        seed: int = 0,
+) -> list[ExcursionLookup]:
+    """
+    Returns lookups with Zipf-like airport popularity, as few destinations get most traffic.
+    Dates fall in next three months. Stays take 3 to 14 days.
+    """
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    codes = ["".join(_c) for _c in itertools.islice(itertools.product(letters, repeat=3), airports)]
+    weights = [1 / _r for _r in range(1, airports + 1)]
+    today = datetime.date.today()
+    lookups = []
+    for iata_code in rng.choices(codes, weights=weights, k=count):
+        date_from = today + datetime.timedelta(days=rng.randrange(90))
+        lookups.append(ExcursionLookup(
+            iata_code=iata_code,
+            date_from=date_from,
+            date_to=date_from + datetime.timedelta(days=rng.randint(3, 14)),
+            spoken_languages=rng.choice(LANGUAGE_SETS),
+        ))
+    return lookups
+
+
+def load_pattern(path: str) -> list[ExcursionLookup]:
+    """
+    Returns lookups from JSON lines file.
+    """
+    with open(path, encoding="utf-8") as file:
+        return [
+            ExcursionLookup(
+                iata_code=_l["iata_code"],
+                date_from=datetime.date.fromisoformat(_l["date_from"]),
+                date_to=datetime.date.fromisoformat(_l["date_to"]),
+                spoken_languages=_l["spoken_languages"],
+            )
+            for _l in map(json.loads, file) if _l
+        ]
+
+
+def save_pattern(path: str, lookups: list[ExcursionLookup]) -> None:
+    """
+    Writes lookups to JSON lines file, so the same load can be replayed.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for lookup in lookups:
+            file.write(json.dumps(dataclasses.asdict(lookup), default=str) + "\n")
+
+
+class _ThreadMonitor:
+    """
+    Samples number of live threads in background.
+    """
+    peak: int
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.peak = threading.active_count()
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "_ThreadMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.peak = max(self.peak, threading.active_count())
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    """
+    Returns latency percentiles in milliseconds.
+    """
+    if len(latencies) < 2:
+        return {}
+    cuts = statistics.quantiles(latencies, n=1000, method="inclusive")
+    return {
+        "p50_ms": cuts[499] * 1000,
+        "p99_ms": cuts[989] * 1000,
+        "p999_ms": cuts[998] * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def run_load(
+        service: SeePlacesService,
+        lookups: list[ExcursionLookup],
+        qps: float,
+        duration: float,
+        callers: int,
+        deadline: float | None = None,
+) -> dict[str, Any]:
+    """
+    Calls get_excursions at fixed rate for given duration (open loop). Lookups are replayed
+    cyclically. Latency is measured from scheduled start, so queueing of overloaded callers
+    is included.
+    """
+    latencies: list[float] = []
+    errors: collections.Counter[str] = collections.Counter()
+    lock = threading.Lock()
+
+    def _call(lookup: ExcursionLookup, scheduled: float) -> None:
+        try:
+            service.get_excursions(
+                iata_code=lookup.iata_code,
+                date_from=lookup.date_from,
+                date_to=lookup.date_to,
+                spoken_languages=lookup.spoken_languages,
+                deadline=deadline,
+            )
+            error = None
+        except Exception as exc:  # pylint: disable=W0718
+            error = type(exc).__name__
+        latency = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(latency)
+            if error is not None:
+                errors[error] += 1
+
+    calls = int(qps * duration)
+    with _ThreadMonitor() as monitor, futures.ThreadPoolExecutor(
+            max_workers=callers, thread_name_prefix="load-caller",
+    ) as executor:
+        start = time.perf_counter()
+        for index, lookup in zip(range(calls), itertools.cycle(lookups)):
+            scheduled = start + index / qps
+            if (delay := scheduled - time.perf_counter()) > 0:
+                time.sleep(delay)
+            executor.submit(_call, lookup, scheduled)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "calls": len(latencies),
+        "achieved_qps": len(latencies) / elapsed,
+        "error_rate": sum(errors.values()) / max(len(latencies), 1),
+        "errors": dict(errors),
+        "peak_threads": monitor.peak,
+        **_percentiles(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--qps", type=float, default=200.0, help="Target calls per second.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds.")
+    parser.add_argument("--callers", type=int, default=200, help="Concurrent caller threads.")
+    parser.add_argument("--airports", type=int, default=50, help="Airports of synthetic pattern.")
+    parser.add_argument("--pattern", help="Replay lookups from JSON lines file.")
+    parser.add_argument("--record", help="Write synthetic lookups to JSON lines file.")
+    parser.add_argument("--items", type=int, default=100, help="Excursions per airport.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random extra latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 5xx responses.")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--pool-maxsize", type=int, default=10)
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument("--circuit-threshold", type=int, default=0)
+    parser.add_argument("--error-cache-ttl", type=int, default=0)
+    parser.add_argument("--deadline", type=float, help="Seconds per get_excursions call.")
+    parser.add_argument("--output", help="Write JSON report to file.")
+    args = parser.parse_args()
+
+    if args.pattern:
+        lookups = load_pattern(args.pattern)
+    else:
+        lookups = synthetic_pattern(int(args.qps * args.duration), args.airports)
+        if args.record:
+            save_pattern(args.record, lookups)
+
+    with StubServer(
+            items=args.items,
+            latency=args.latency,
+            latency_jitter=args.jitter,
+            error_rate=args.error_rate,
+            seed=0,
+    ) as server:
+        options = SeePlacesOptions(
+            base_url=server.base_url,
+            api_version="1.0",
+            scope_id="123456",
+            pool_maxsize=args.pool_maxsize,
+            max_retries=args.max_retries,
+            circuit_failure_threshold=args.circuit_threshold,
+            error_cache_ttl=args.error_cache_ttl,
+        )
+        cache = None if args.no_cache else LocalCache(max_entries=100_000)
+        with SeePlacesService(options=options, cache=cache) as service:
+            result = run_load(
+                service, lookups, args.qps, args.duration, args.callers, args.deadline,
+            )
+        result |= {
+            "upstream_calls": server.requests,
+            "upstream_connections": server.connections,
+            "distinct_lookups": len({
+                (_l.iata_code, _l.date_from.replace(day=1), tuple(sorted(_l.spoken_languages)))
+                for _l in lookups[:result["calls"]]
+            }),
+        }
+
+    print(
+        f"{result['calls']} calls at {result['achieved_qps']:.0f}/s: "
+        f"p50 {result.get('p50_ms', 0):.1f} ms, p99 {result.get('p99_ms', 0):.1f} ms, "
+        f"p999 {result.get('p999_ms', 0):.1f} ms, "
+        f"errors {result['error_rate']:.2%} {result['errors']}"
+    )
+    print(
+        f"upstream calls {result['upstream_calls']} for {result['distinct_lookups']} distinct "
+        f"airport months, connections {result['upstream_connections']}, "
+        f"peak threads {result['peak_threads']}"
+    )
+    if args.output:
+        report = {"parameters": vars(args), "result": result}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
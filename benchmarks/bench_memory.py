@@ -0,0 +1,83 @@
+"""
+Compares memory retained by excursions parsed from api response with memory retained
+by previous representation (instance __dict__, duration dataclass per excursion).
+
+Run: python -m benchmarks.bench_memory [--excursions N]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.testing import synthetic_excursion
+
+
+@dataclass
+class _LegacyDuration:
+    is_all_day: bool
+    is_many_days: bool
+    duration_hours: float
+    duration_days: float
+    hide_duration: bool
+
+
+class _LegacyExcursion:
+    """
+    Previous layout of SeePlacesExcursion.
+    """
+
+    def __init__(self, **item: Any) -> None:
+        self.name = item["Name"]
+        self.final_price = item["FinalPrice"]
+        self.photo_path = item["PhotoPath"]
+        self.description = item["Description"]
+        self.currency = item["Currency"]
+        self.included_in_price = item["IncludedInPrice"]
+        self._duration = _LegacyDuration(
+            is_all_day=item["IsAllDay"],
+            is_many_days=item["IsManyDays"],
+            duration_hours=item["DurationHours"],
+            duration_days=item["DurationDays"],
+            hide_duration=item["HideDuration"],
+        )
+
+
+def _measure(factory: Callable[..., Any], response: str) -> int:
+    """
+    Returns bytes retained by excursions parsed from api response.
+    """
+    gc.collect()
+    tracemalloc.start()
+    items = json.loads(response)["Items"]
+    excursions = [factory(**_i) for _i in items]
+    del items  # Only excursions are kept, as in cache.
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert excursions
+    return retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--excursions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    response = json.dumps({"Items": [synthetic_excursion(_i) for _i in range(args.excursions)]})
+    legacy = _measure(_LegacyExcursion, response)
+    compact = _measure(SeePlacesExcursion, response)
+
+    for label, retained in (("legacy", legacy), ("compact", compact)):
+        print(
+            f"{label:>8}: {retained / 2 ** 20:.1f} MiB, "
+            f"{retained / args.excursions:.0f} B per excursion"
+        )
+    print(f"{'saved':>8}: {(legacy - compact) / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compares api call latency with and without pooled keep-alive connections.
+
+Run: python -m benchmarks.bench_pool [--requests N]
+"""
+import argparse
+import statistics
+import time
+
+from seeplaces.service import SeePlacesOptions, SeePlacesService
+from seeplaces.testing import StubServer
+
+
+def _measure(server: StubServer, keep_alive: bool, requests_count: int) -> dict[str, float]:
+    """
+    Returns latency statistics of spoken languages api calls in milliseconds.
+    """
+    options = SeePlacesOptions(
+        base_url=server.base_url,
+        api_version="1.0",
+        scope_id="123456",
+        keep_alive=keep_alive,
+    )
+    server.reset_counters()
+    latencies = []
+    with SeePlacesService(options=options) as service:
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            service._call_excursion_spoken_languages()  # pylint: disable=W0212
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "median_ms": statistics.median(latencies),
+        "connections": server.connections,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        fresh = _measure(server, keep_alive=False, requests_count=args.requests)
+        pooled = _measure(server, keep_alive=True, requests_count=args.requests)
+
+    for label, result in (("new connection", fresh), ("pooled", pooled)):
+        print(
+            f"{label:>15}: mean {result['mean_ms']:.3f} ms, "
+            f"median {result['median_ms']:.3f} ms, "
+            f"connections {result['connections']}"
+        )
+    print(f"{'saved':>15}: {fresh['mean_ms'] - pooled['mean_ms']:.3f} ms per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Measures get_excursions against local stub server with cold, warm and mixed cache,
+for responses of different sizes. Reports latency percentiles, throughput, parse cost
+and memory. Results are written as JSON and can be compared with results of previous run.
+
+Run: python -m benchmarks.bench_service [--items 10 1000 10000] [--calls N] [--latency S]
+                                        [--hit-ratio R] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import datetime
+import gc
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from seeplaces.cache import LocalCache
+from seeplaces.metrics import BUILD_SECONDS, DECODE_SECONDS, InMemoryCollector
+from seeplaces.service import SeePlacesOptions, SeePlacesService
+from seeplaces.testing import StubServer
+
+
+DATE_FROM = datetime.date(2023, 1, 1)
+DATE_TO = datetime.date(2023, 1, 7)
+LANGUAGES = ["Slovak"]
+ENDPOINT = "ExcursionForIataCode"
+
+
+def _iata_codes() -> Iterator[str]:
+    """
+    Yields distinct synthetic airport codes, so every cold call misses cache.
+    """
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for _c in itertools.product(letters, repeat=3):
+        yield "".join(_c)
+
+
+def _latency_stats(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """
+    Returns percentiles of latencies in milliseconds and throughput in calls per second.
+    """
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentiles[49] * 1000,
+        "p90_ms": percentiles[89] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def _run(service: SeePlacesService, next_code: Callable[[], str], calls: int) -> dict[str, float]:
+    """
+    Returns latency statistics of get_excursions of airports given by next_code.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        iata_code = next_code()
+        call_start = time.perf_counter()
+        service.get_excursions(iata_code, DATE_FROM, DATE_TO, LANGUAGES)
+        latencies.append(time.perf_counter() - call_start)
+    return _latency_stats(latencies, time.perf_counter() - start)
+
+
+def _parse_cost(collector: InMemoryCollector) -> dict[str, float]:
+    """
+    Returns mean JSON decode and object build time per api response in milliseconds.
+    """
+    result = {}
+    for label, name in (("decode_ms", DECODE_SECONDS), ("build_ms", BUILD_SECONDS)):
+        histogram = collector.histogram(name, endpoint=ENDPOINT)
+        result[label] = histogram.sum / histogram.count * 1000 if histogram else 0.0
+    return result
+
+
+def _memory(service: SeePlacesService, iata_code: str) -> dict[str, float]:
+    """
+    Returns peak memory of cold call and memory retained by its excursions in KiB.
+    """
+    gc.collect()
+    tracemalloc.start()
+    excursions = service.get_excursions(iata_code, DATE_FROM, DATE_TO, LANGUAGES)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert excursions
+    return {"peak_kib": peak / 1024, "retained_kib": retained / 1024}
+
+
+def _measure(server: StubServer, items: int, calls: int, hit_ratio: float) -> dict[str, Any]:
+    """
+    Returns results of all scenarios for responses of given number of items.
+    """
+    server.items = items
+    options = SeePlacesOptions(base_url=server.base_url, api_version="1.0", scope_id="123456")
+    codes = _iata_codes()
+    collector = InMemoryCollector()
+    with SeePlacesService(
+            options=options, cache=LocalCache(max_entries=calls * 3), instrumentation=collector,
+    ) as service:
+        service.get_excursions("AYT", DATE_FROM, DATE_TO, LANGUAGES)  # Load languages, warm up.
+
+        collector.reset()
+        cold = _run(service, lambda: next(codes), calls)
+        parse_cost = _parse_cost(collector)
+        warm = _run(service, lambda: "AYT", calls)
+
+        rng = random.Random(items)
+        mixed = _run(
+            service, lambda: "AYT" if rng.random() < hit_ratio else next(codes), calls,
+        )
+        memory = _memory(service, next(codes))
+
+    return {
+        "items": items,
+        "cold": cold,
+        "warm": warm,
+        "mixed": mixed | {"hit_ratio": hit_ratio},
+        "parse": parse_cost,
+        "memory": memory,
+    }
+
+
+def _compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]]) -> None:
+    """
+    Prints relative change of median latencies against baseline results.
+    """
+    previous = {_r["items"]: _r for _r in baseline}
+    for result in results:
+        if (other := previous.get(result["items"])) is None:
+            continue
+        changes = ", ".join(
+            f"{_s} {result[_s]['p50_ms'] / other[_s]['p50_ms'] - 1:+.0%}"
+            for _s in ("cold", "warm", "mixed")
+        )
+        print(f"{result['items']:>6} items vs baseline: p50 {changes}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000, 10_000])
+    parser.add_argument("--calls", type=int, default=200, help="Calls per scenario.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency in seconds.")
+    parser.add_argument("--hit-ratio", type=float, default=0.8, help="Cache hits of mixed run.")
+    parser.add_argument("--output", help="Write JSON results to file.")
+    parser.add_argument("--baseline", help="Compare with JSON results of previous run.")
+    args = parser.parse_args()
+
+    results = []
+    with StubServer(latency=args.latency) as server:
+        for items in args.items:
+            result = _measure(server, items, args.calls, args.hit_ratio)
+            results.append(result)
+            print(
+                f"{items:>6} items: "
+                + ", ".join(
+                    f"{_s} p50 {result[_s]['p50_ms']:.2f} ms p99 {result[_s]['p99_ms']:.2f} ms"
+                    for _s in ("cold", "warm", "mixed")
+                )
+                + f", decode {result['parse']['decode_ms']:.2f} ms"
+                + f", build {result['parse']['build_ms']:.2f} ms"
+                + f", peak {result['memory']['peak_kib']:.0f} KiB"
+            )
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            _compare(results, json.load(file)["results"])
+    if args.output:
+        report = {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "parameters": {"calls": args.calls, "latency": args.latency},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Command line tools. Api is configured by BASE_URL, API_VERSION and SCOPE_ID environment variables.
+
+Warm cache, eg. from cron:
+    python -m seeplaces warm AYT BTS --months 3 --languages Slovak English --cache myapp.cache:cache
+
+Without shared cache service, warm persistent SQLite cache used by other processes:
+    python -m seeplaces warm AYT BTS --languages Slovak --cache-path /var/cache/seeplaces.db
+"""
+import argparse
+import datetime
+import importlib
+import logging
+import os
+import sys
+from typing import Any
+
+from seeplaces.prefetch import PrefetchScheduler, PrefetchTarget
+from seeplaces.service import SeePlacesOptions, SeePlacesService
+from seeplaces.sqlite_cache import SQLiteCache
+
+
+def _options_from_env() -> SeePlacesOptions:
+    """
+    Returns service options from environment.
+    """
+    try:
+        return SeePlacesOptions(
+            base_url=os.environ["BASE_URL"],
+            api_version=os.environ["API_VERSION"],
+            scope_id=os.environ["SCOPE_ID"],
+        )
+    except KeyError as exc:
+        raise SystemExit(f"Missing configuration key in environment: {exc}") from exc
+
+
+def _load_cache(path: str) -> Any:
+    """
+    Returns cache object from "module:attribute" path. Classes and other factories
+    are called without arguments.
+    """
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise SystemExit(f"Cache path must have format module:attribute, got: {path}")
+    cache = getattr(importlib.import_module(module_name), attribute)
+    if isinstance(cache, type) or (callable(cache) and not hasattr(cache, "get")):
+        cache = cache()
+    return cache
+
+
+def _month(value: str) -> datetime.date:
+    """
+    Returns first day of month given as YYYY-MM.
+    """
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+
+def _add_months(month: datetime.date, count: int) -> datetime.date:
+    """
+    Returns first day of month count months after given month.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def warm(args: argparse.Namespace) -> int:
+    """
+    Prefetches excursions of given airports and months. Returns exit code.
+    """
+    start = args.start or datetime.date.today().replace(day=1)
+    targets = [
+        PrefetchTarget.create(_c, _add_months(start, _i), args.languages)
+        for _c in args.iata_codes
+        for _i in range(args.months)
+    ]
+    cache = SQLiteCache(args.cache_path) if args.cache_path else _load_cache(args.cache)
+    with SeePlacesService(options=_options_from_env(), cache=cache) as service:
+        scheduler = PrefetchScheduler(
+            service, targets, lead_time=args.lead_time, max_workers=args.workers,
+        )
+        result = scheduler.run_once()
+
+    print(
+        f"Prefetched {len(result.prefetched)}, fresh {len(result.skipped)}, "
+        f"failed {len(result.failed)} of {len(targets)} targets."
+    )
+    for target, error in result.failed.items():
+        print(f"  {target.iata_code} {target.month:%Y-%m}: {error}", file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m seeplaces", description=__doc__)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warm_parser = commands.add_parser("warm", help="Prefetch excursions to cache.")
+    warm_parser.add_argument("iata_codes", nargs="+", metavar="IATA")
+    warm_parser.add_argument("--languages", nargs="+", required=True, help="Spoken languages.")
+    warm_parser.add_argument("--months", type=int, default=1, help="Number of months to warm.")
+    warm_parser.add_argument("--start", type=_month, help="First month (YYYY-MM). Default: now.")
+    cache_group = warm_parser.add_mutually_exclusive_group(required=True)
+    cache_group.add_argument("--cache", help="Cache as module:attribute. Called if callable.")
+    cache_group.add_argument("--cache-path", help="File of persistent SQLite cache.")
+    warm_parser.add_argument(
+        "--lead-time", type=float, default=300.0, help="Refresh seconds before staleness.",
+    )
+    warm_parser.add_argument("--workers", type=int, default=4, help="Concurrent prefetches.")
+    warm_parser.set_defaults(handler=warm)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,806 @@
+import asyncio
+import datetime
+import functools
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+try:
+    import httpx
+except ImportError as exc:  # pragma: no cover
+    raise ImportError(
+        "AsyncSeePlacesService requires httpx. Install it with: pip install seeplaces[async]"
+    ) from exc
+
+from seeplaces.base import (
+    LANGUAGES_CACHE_TTL,
+    STREAM_CHUNK_SIZE,
+    SeePlacesOptions,
+    _AccessRecorder,
+    _mapping,
+    _SeePlacesServiceBase,
+    normalize_iata_code,
+)
+from seeplaces.cache import (
+    AsyncCacheProtocol,
+    CacheEntry,
+    ResponseValidators,
+    abatch_get,
+    abatch_set,
+)
+from seeplaces.exceptions import ApiConnectionError, DeadlineExceededError, SeePlacesError
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.languages import LanguageCatalog
+from seeplaces.metrics import CACHE_SECONDS, HTTP_SECONDS, LANGUAGES_SECONDS, Instrumentation
+from seeplaces.ratelimit import BACKGROUND, RateLimiter, priority_scope
+from seeplaces.resilience import deadline_scope, no_deadline
+from seeplaces.singleflight import AsyncSingleFlight
+from seeplaces.stream import JsonArrayStream
+from seeplaces.window import ExcursionWindow, excursion_key, merge_excursions, month_windows
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSeePlacesService(_SeePlacesServiceBase):
+    """
+    Asyncio connection service for SeePlaces API. Mirrors SeePlacesService.
+    """
+    _cache: AsyncCacheProtocol | None
+    _client: httpx.AsyncClient
+    _owns_client: bool
+    _single_flight: AsyncSingleFlight
+    _refreshing: dict[str, asyncio.Future]
+
+    def __init__(
+            self,
+            options: SeePlacesOptions,
+            cache: AsyncCacheProtocol | None = None,
+            cache_prefix: str | None = None,
+            client: httpx.AsyncClient | None = None,
+            rate_limiter: RateLimiter | None = None,
+            access_tracker: _AccessRecorder | None = None,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        super().__init__(
+            options=options,
+            cache_prefix=cache_prefix,
+            rate_limiter=rate_limiter,
+            access_tracker=access_tracker,
+            instrumentation=instrumentation,
+        )
+        self._cache = cache
+
+        # Client owns connection pool shared by all tasks using the service.
+        # Client passed in by caller is closed by caller.
+        self._owns_client = client is None
+        if client is None:
+            client = httpx.AsyncClient(limits=self._pool_limits(options))
+        self._client = client
+        self._single_flight = AsyncSingleFlight()
+        self._refreshing = {}  # Keeps references to running background refresh tasks.
+
+    async def __aenter__(self) -> "AsyncSeePlacesService":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Closes pooled connections and cancels background refresh.
+        Client passed in by caller is left open.
+        """
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def get_excursions(
+        self,
+        iata_code: str,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+        deadline: float | None = None,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns list of SeePlacesExcursion objects from api.
+        Excursions are cached per calendar month. Months of range are read from cache together
+        and only dates missing in cache are fetched.
+        Api calls not finished within deadline (in seconds) fail with DeadlineExceededError.
+        """
+        self._record_access([iata_code], date_from, date_to, spoken_languages)
+        windows = month_windows(date_from, date_to)
+        with deadline_scope(deadline):
+            cached_values = await self._get_cached_windows(iata_code, windows, spoken_languages)
+            results = await asyncio.gather(*(
+                self._get_window_excursions(iata_code, _f, _t, spoken_languages, cached_values)
+                for _f, _t in windows
+            ))
+        return results[0] if len(results) == 1 else merge_excursions(*results)
+
+    async def iter_excursions(
+        self,
+        iata_code: str,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+    ) -> AsyncIterator[SeePlacesExcursion]:
+        """
+        Yields the same excursions as get_excursions. Excursions missing in cache are yielded
+        while api response is read, so whole response is never held in memory.
+        Fetched dates are saved to cache only if generator is exhausted.
+        """
+        self._record_access([iata_code], date_from, date_to, spoken_languages)
+        seen: set[tuple[str, str]] = set()
+        for window_from, window_to in month_windows(date_from, date_to):
+            async for excursion in self._iter_window_excursions(
+                iata_code, window_from, window_to, spoken_languages,
+            ):
+                if (key := excursion_key(excursion)) not in seen:
+                    seen.add(key)
+                    yield excursion
+
+    async def get_excursions_many(
+        self,
+        iata_codes: list[str],
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+        deadline: float | None = None,
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns lists of SeePlacesExcursion objects from api for multiple airports.
+        Airports missing in cache are fetched together in as few api calls as possible.
+        Api calls not finished within deadline (in seconds) fail with DeadlineExceededError.
+        Results are keyed by normalized airport codes.
+        """
+        # Remove duplicates. Keep order.
+        iata_codes = list(dict.fromkeys(normalize_iata_code(_c) for _c in iata_codes))
+        self._record_access(iata_codes, date_from, date_to, spoken_languages)
+        with deadline_scope(deadline):
+            windows = await asyncio.gather(*(
+                self._get_window_excursions_many(iata_codes, _f, _t, spoken_languages)
+                for _f, _t in month_windows(date_from, date_to)
+            ))
+        if len(windows) == 1:
+            return {_c: windows[0][_c] for _c in iata_codes}
+        return {_c: merge_excursions(*(_w[_c] for _w in windows)) for _c in iata_codes}
+
+    async def _get_window_excursions(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+            cached_values: dict[str, Any] | None = None,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns excursions of single month window. Tries to hit cache first.
+        Uses cached values read by caller if given.
+        """
+        cache_key = self._excursions_cache_key(iata_code, date_from, spoken_languages)
+
+        # Search for result in cache. Empty result is valid cached result.
+        cached_result = None
+        if cached_values is not None:
+            cached = cached_values.get(cache_key)
+        else:
+            cached = await self._get_cached(cache_key)
+        if isinstance(cached, CacheEntry):
+            window: ExcursionWindow = cached.value
+            self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+            cached_result = window.find(date_from, date_to)
+        elif cached is not None:
+            cached_result = cached  # Saved without expiry metadata.
+        self._record_lookup("exc", hit=cached_result is not None)
+        if cached_result is not None:
+            return cached_result
+
+        # Get missing dates from API. Concurrent tasks share single api call.
+        return await self._single_flight.do(
+            f"{cache_key}_{date_from.isoformat()}_{date_to.isoformat()}",
+            functools.partial(
+                self._fetch_excursions,
+                cache_key=cache_key,
+                iata_code=iata_code,
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=spoken_languages,
+            ),
+        )
+
+    async def _get_cached_windows(
+            self,
+            iata_code: str,
+            windows: list[tuple[datetime.date, datetime.date]],
+            spoken_languages: list[str],
+    ) -> dict[str, Any] | None:
+        """
+        Returns cached values of month windows read in single round trip. Returns None
+        for single window, which is read by its lookup.
+        """
+        if len(windows) == 1:
+            return None
+        return await self._get_cached_many([
+            self._excursions_cache_key(iata_code, _f, spoken_languages) for _f, _t in windows
+        ])
+
+    async def _get_window_excursions_many(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions of single month window for multiple airports.
+        """
+        result: dict[str, list[SeePlacesExcursion]] = {}
+
+        # Search for results in cache.
+        cache_keys = {
+            _c: self._excursions_cache_key(_c, date_from, spoken_languages) for _c in iata_codes
+        }
+        cached_values = await self._get_cached_many(list(cache_keys.values()))
+        for iata_code, cache_key in cache_keys.items():
+            if isinstance(cached := cached_values.get(cache_key), CacheEntry):
+                self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+                if (excursions := cached.value.find(date_from, date_to)) is not None:
+                    result[iata_code] = excursions
+            elif cached is not None:
+                result[iata_code] = cached  # Saved without expiry metadata.
+            self._record_lookup("exc", hit=iata_code in result)
+
+        # Get missing results from API. Batches run concurrently. Concurrent tasks share
+        # single api call per batch.
+        if missing := [_c for _c in iata_codes if _c not in result]:
+            batches = []
+            for batch in self._iata_code_batches(missing):
+                batch_keys = {_c: cache_keys[_c] for _c in batch}
+                batches.append(self._single_flight.do(
+                    self._batch_flight_key(list(batch_keys.values()), date_from, date_to),
+                    functools.partial(
+                        self._fetch_excursions_batch,
+                        cache_keys=batch_keys,
+                        date_from=date_from,
+                        date_to=date_to,
+                        spoken_languages=spoken_languages,
+                    ),
+                ))
+            for excursions in await asyncio.gather(*batches):
+                result |= excursions
+
+        return {_c: result[_c] for _c in iata_codes}
+
+    async def _fetch_excursions_batch(
+            self,
+            cache_keys: dict[str, str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions of month window for batch of airports from api and saves them
+        to cache. Airports cached by other task meanwhile are not fetched again.
+        Whole range is fetched, as airports may miss different dates.
+        """
+        for cache_key in cache_keys.values():
+            await self._raise_if_failed_recently(cache_key)
+
+        # Other task could have fetched some airports meanwhile.
+        result, previous = self._split_cached_batch(
+            await self._get_cached_many(list(cache_keys.values())),
+            cache_keys,
+            date_from,
+            date_to,
+        )
+        if not (missing := [_c for _c in cache_keys if _c not in result]):
+            return result
+
+        start = time.perf_counter()
+        try:
+            language_ids = await self._get_language_ids(spoken_languages=spoken_languages)
+            excursions = await self._get_excursions_batch(
+                missing, date_from, date_to, language_ids,
+            )
+        except (SeePlacesError, httpx.HTTPError) as exc:
+            for iata_code in missing:
+                await self._remember_failure(cache_keys[iata_code], exc)
+            raise
+
+        # Save results of batch to cache.
+        await self._cache_set_many(self._batch_cache_entries(
+            excursions, cache_keys, previous, date_from, date_to, time.perf_counter() - start,
+        ))
+        return result | excursions
+
+    async def _iter_window_excursions(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> AsyncIterator[SeePlacesExcursion]:
+        """
+        Yields excursions of single month window. Streams dates missing in cache from api.
+        """
+        cache_key = self._excursions_cache_key(iata_code, date_from, spoken_languages)
+
+        # Search for result in cache. Empty result is valid cached result.
+        cached_result = None
+        if isinstance(cached := await self._get_cached(cache_key), CacheEntry):
+            self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+            cached_result = cached.value.find(date_from, date_to)
+        elif cached is not None:
+            cached_result = cached  # Saved without expiry metadata.
+        self._record_lookup("exc", hit=cached_result is not None)
+        if cached_result is not None:
+            for excursion in cached_result:
+                yield excursion
+            return
+        await self._raise_if_failed_recently(cache_key)
+
+        # Excursions of ranges fetched before inside given range belong to the result too.
+        previous = self._extendable_entry(cached)
+        window = previous.value if previous is not None else ExcursionWindow()
+        for excursion in window.excursions_inside(date_from, date_to):
+            yield excursion
+
+        start = time.perf_counter()
+        try:
+            language_ids = await self._get_language_ids(spoken_languages=spoken_languages)
+            for gap_from, gap_to in window.gaps(date_from, date_to):
+                excursions = []
+                async for item in self._stream_excursion_for_iata_code(
+                    iata_code=iata_code,
+                    date_from=gap_from,
+                    date_to=gap_to,
+                    language_ids=language_ids,
+                ):
+                    excursion = SeePlacesExcursion(**item)
+                    excursions.append(excursion)  # Kept for cache only. Raw items are dropped.
+                    yield excursion
+                window = window.merge(gap_from, gap_to, excursions)
+        except (SeePlacesError, httpx.HTTPError) as exc:
+            await self._remember_failure(cache_key, exc)
+            raise
+
+        # Save result to cache.
+        if self._cache is not None:
+            entry, timeout = self._excursions_cache_entry(
+                window, time.perf_counter() - start, previous,
+            )
+            await self._cache_set(cache_key, entry, timeout=timeout)
+
+    async def _get_excursions_batch(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions for batch of airports split by airport.
+        Falls back to api call per airport if combined response cannot be split,
+        and pauses combining airports of later calls.
+        """
+        api_response = await self._call_excursion_for_iata_code(
+            iata_code=iata_codes,
+            date_from=date_from,
+            date_to=date_to,
+            language_ids=language_ids,
+        )
+        if (excursions := self._parse_excursions_by_iata_code(api_response, iata_codes)) is None:
+            self._pause_combined_calls()
+            responses = await asyncio.gather(*(
+                self._call_excursion_for_iata_code(
+                    iata_code=_c,
+                    date_from=date_from,
+                    date_to=date_to,
+                    language_ids=language_ids,
+                )
+                for _c in iata_codes
+            ))
+            excursions = {
+                _c: self._parse_excursions_from_response(_r)
+                for _c, _r in zip(iata_codes, responses)
+            }
+        return excursions
+
+    async def _get_language_ids(self, spoken_languages: list[str]) -> set[str]:
+        """
+        Returns IDs of given languages from in-memory catalog. Loads catalog if needed.
+        """
+        with self._timed(LANGUAGES_SECONDS):
+            if (index := self._language_catalog.index()) is not None:
+                self._record_lookup("lang", hit=True)
+            else:
+                # Concurrent tasks share single load.
+                index = await self._single_flight.do(
+                    self._languages_cache_key(), self._load_language_catalog,
+                )
+            return LanguageCatalog.resolve(index, spoken_languages)
+
+    async def _fetch_excursions(
+            self,
+            cache_key: str,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+            extend: bool = True,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns excursions of range in month window from api. Fetches only dates missing
+        in fresh cached window and saves extended window to cache. Without extend, ranges
+        of cached window inside given range are fetched again and replace the window.
+        Remembers failed api call if error cache is enabled.
+        """
+        cache = self._cache
+        await self._raise_if_failed_recently(cache_key)
+        cached = await self._cache_get(cache_key)
+
+        if extend:
+            # Other task could have fetched some dates meanwhile.
+            previous = self._extendable_entry(cached)
+            window = previous.value if previous is not None else ExcursionWindow()
+            if (excursions := window.find(date_from, date_to)) is not None:
+                return excursions
+            ranges = window.gaps(date_from, date_to)
+        else:
+            previous, window = None, ExcursionWindow()
+            ranges = self._refetched_ranges(cached, date_from, date_to)
+
+        # Refresh of window fetched by single api call is conditional.
+        revalidated = None if extend else self._revalidatable_entry(cached, date_from, date_to)
+        validators = revalidated.validators if revalidated is not None else None
+
+        start = time.perf_counter()
+        try:
+            language_ids = await self._get_language_ids(spoken_languages=spoken_languages)
+            responses = await asyncio.gather(*(
+                self._call_excursion_for_iata_code(
+                    iata_code=iata_code,
+                    date_from=_f,
+                    date_to=_t,
+                    language_ids=language_ids,
+                    validators=validators,
+                )
+                for _f, _t in ranges
+            ))
+        except (SeePlacesError, httpx.HTTPError) as exc:
+            await self._remember_failure(cache_key, exc)
+            raise
+
+        if revalidated is not None and self._is_unchanged(responses[0], validators):
+            # Renew unchanged window without parsing response.
+            if cache is not None:
+                entry, timeout = self._revalidated_entry(revalidated, time.perf_counter() - start)
+                await self._cache_set(cache_key, entry, timeout=timeout)
+            return revalidated.value.excursions_inside(date_from, date_to)
+
+        for (range_from, range_to), api_response in zip(ranges, responses):
+            excursions = self._parse_excursions_from_response(api_response)
+            window = window.merge(range_from, range_to, excursions)
+            validators = self._response_validators(api_response)
+
+        # Validators describe window only if it was fetched by single api call.
+        if [_r.interval for _r in window.ranges] != ranges[:1]:
+            validators = None
+
+        # Save result to cache.
+        if cache is not None:
+            entry, timeout = self._excursions_cache_entry(
+                window, time.perf_counter() - start, previous, validators,
+            )
+            await self._cache_set(cache_key, entry, timeout=timeout)
+
+        return window.excursions_inside(date_from, date_to)
+
+    async def _raise_if_failed_recently(self, cache_key: str) -> None:
+        """
+        Raises ApiConnectionError if api call for cache key failed recently.
+        Does nothing if error cache is disabled.
+        """
+        if self._cache is not None and self._options.error_cache_ttl:
+            if (error := await self._cache_get(self._error_cache_key(cache_key))) is not None:
+                raise ApiConnectionError(f"Skipping api call after recent failure: {error}")
+
+    async def _remember_failure(self, cache_key: str, exc: Exception) -> None:
+        """
+        Saves failed api call for cache key if error cache is enabled.
+        Only upstream failures are saved.
+        """
+        if not self._is_upstream_failure(exc):
+            return
+        if self._cache is not None and (error_cache_ttl := self._options.error_cache_ttl):
+            await self._cache_set(
+                self._error_cache_key(cache_key), str(exc), timeout=error_cache_ttl,
+            )
+
+    async def _load_language_catalog(self) -> dict[str, str]:
+        """
+        Returns index of all languages. Tries to hit cache first, then api.
+        Saves index to cache and in-memory catalog.
+        """
+        cache_key = self._languages_cache_key()
+        index = await self._cache_get(cache_key)
+        self._record_lookup("lang", hit=index is not None)
+        if index is None:
+            api_response = await self._call_excursion_spoken_languages()
+            index = self._language_index_from_response(api_response)
+            await self._cache_set(cache_key, index, timeout=LANGUAGES_CACHE_TTL)
+
+        self._language_catalog.update(index)
+        return index
+
+    async def _get_cached(self, cache_key: str) -> Any:
+        """
+        Returns cached value or None. Returns whole CacheEntry unless it is expired
+        or holds value of other layout.
+        """
+        cached = await self._cache_get(cache_key)
+        return cached if self._is_usable(cached) else None
+
+    async def _get_cached_many(self, cache_keys: list[str]) -> dict[str, Any]:
+        """
+        Returns cached values of given keys. Missing, expired and unusable keys are left out.
+        """
+        return {
+            _k: _v for _k, _v in (await self._cache_get_many(cache_keys)).items()
+            if self._is_usable(_v)
+        }
+
+    async def _cache_get_many(self, cache_keys: list[str]) -> dict[str, Any]:
+        """
+        Returns cached values of keys found in cache. Uses single round trip if cache supports
+        aget_many. Returns empty dict without cache.
+        """
+        if (cache := self._cache) is None or not cache_keys:
+            return {}
+        with self._timed(CACHE_SECONDS, operation="get_many"):
+            return await abatch_get(cache, cache_keys)
+
+    async def _cache_set_many(self, entries: dict[str, tuple[Any, int]]) -> None:
+        """
+        Saves values with their timeouts. Values sharing timeout are saved together
+        if cache supports aset_many. Does nothing without cache.
+        """
+        if (cache := self._cache) is None or not entries:
+            return
+        with self._timed(CACHE_SECONDS, operation="set_many"):
+            for timeout, values in self._group_by_timeout(entries).items():
+                await abatch_set(cache, values, timeout=timeout)
+
+    async def _cache_get(self, cache_key: str) -> Any:
+        """
+        Returns cached value. Returns None without cache.
+        """
+        if (cache := self._cache) is None:
+            return None
+        with self._timed(CACHE_SECONDS, operation="get"):
+            return await cache.aget(cache_key)
+
+    async def _cache_set(self, cache_key: str, value: Any, timeout: int) -> None:
+        """
+        Saves value to cache. Does nothing without cache.
+        """
+        if (cache := self._cache) is not None:
+            with self._timed(CACHE_SECONDS, operation="set"):
+                await cache.aset(cache_key, value, timeout=timeout)
+
+    def _refresh_if_needed(
+            self,
+            cache_key: str,
+            entry: CacheEntry,
+            iata_code: str,
+            spoken_languages: list[str],
+    ) -> None:
+        """
+        Schedules background refresh of all dates in cached window if it is stale
+        or should be refreshed early.
+        """
+        window: ExcursionWindow = entry.value
+        if (span := window.span) and entry.should_refresh(beta=self._options.early_refresh_beta):
+            self._refresh_in_background(cache_key, functools.partial(
+                self._fetch_excursions,
+                cache_key=cache_key,
+                iata_code=iata_code,
+                date_from=span[0],
+                date_to=span[1],
+                spoken_languages=spoken_languages,
+                extend=False,
+            ))
+
+    def _refresh_in_background(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Schedules refresh of cache entry. Refresh of the same key is scheduled only once.
+        """
+        if cache_key in self._refreshing:
+            return
+        task = asyncio.ensure_future(self._refresh(cache_key, fetch))
+        self._refreshing[cache_key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(cache_key, None))
+
+    async def _refresh(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Refreshes cache entry. Stale entry is kept until it expires if refresh fails.
+        Task inherits context of the caller, so its deadline is dropped.
+        Api calls of refresh wait behind interactive calls if rate limiter is used.
+        """
+        try:
+            with no_deadline(), priority_scope(BACKGROUND):
+                await self._single_flight.do(cache_key, fetch)
+        except (SeePlacesError, httpx.HTTPError):
+            logger.warning("Refresh of cache entry %s failed.", cache_key, exc_info=True)
+
+    async def _call_api(
+            self,
+            endpoint: str,
+            query: _mapping,
+            headers: _mapping,
+            stream: bool = False,
+    ) -> httpx.Response:
+        """
+        Generic api call with provided parameters. Parameters override query and header defaults.
+        Body of streamed response is read on access. Caller must close streamed response.
+        Transient failures are retried if enabled. All api calls are idempotent GET requests.
+        """
+        url, params, headers = self._httpx_request(endpoint=endpoint, query=query, headers=headers)
+        label = self._endpoint_label(endpoint)
+        for retry in itertools.count():
+            if (rate_limiter := self._rate_limiter) is not None:
+                await rate_limiter.aacquire()
+            timeout = self._attempt_timeout(endpoint)
+            try:
+                request = self._client.build_request(
+                    "GET", url, params=params, headers=headers, timeout=timeout,
+                )
+                with self._timed(HTTP_SECONDS, endpoint=label):
+                    response = await self._client.send(request, stream=stream)
+            except httpx.HTTPError as exc:
+                self._record_attempt(None)
+                retryable = isinstance(exc, httpx.TransportError)
+                if not retryable or (delay := self._retry_delay(retry)) is None:
+                    self._record_api_call(endpoint, ok=False)
+                    if self._deadline_exceeded():
+                        raise DeadlineExceededError(
+                            f"Api call exceeded deadline: {endpoint}",
+                        ) from exc
+                    raise
+            else:
+                if not self._record_attempt(response.status_code):
+                    break
+                if (delay := self._retry_delay(retry)) is None:
+                    break
+                await response.aclose()
+            logger.info("Retrying api call of %s in %.2fs.", endpoint, delay)
+            await asyncio.sleep(delay)
+
+        try:
+            self._raise_for_status(response, endpoint)
+        except ApiConnectionError:
+            await response.aclose()
+            raise
+        # Body of streamed response is measured while it is read.
+        if stream:
+            self._record_api_call(endpoint, ok=True)
+        else:
+            self._record_api_call(
+                endpoint,
+                ok=True,
+                response_bytes=len(response.content),
+                wire_bytes=response.num_bytes_downloaded,
+            )
+        return response
+
+    def _attempt_timeout(self, endpoint: str) -> httpx.Timeout:
+        """
+        Returns httpx timeout of next api call attempt. See _attempt_timeouts.
+        """
+        connect_timeout, read_timeout = self._attempt_timeouts(endpoint)
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+    def _httpx_request(
+            self,
+            endpoint: str,
+            query: _mapping,
+            headers: _mapping,
+    ) -> tuple[str, _mapping, _mapping]:
+        """
+        Returns url, query and headers of api call in format accepted by httpx.
+        """
+        url, params, headers = self._api_request(endpoint=endpoint, query=query, headers=headers)
+        # Httpx expects sequences instead of sets for repeated query parameters.
+        params = {k: list(v) if isinstance(v, set) else v for k, v in params.items()}
+        return url, params, headers
+
+    def _raise_for_status(self, response: httpx.Response, endpoint: str) -> None:
+        """
+        Raises ApiConnectionError if response status is not OK.
+        Not Modified response of conditional request is OK.
+        """
+        if response.status_code == 304:
+            return
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            self._record_api_call(endpoint, ok=False)
+            raise ApiConnectionError(f"Cannot connect to endpoint: {endpoint}") from exc
+
+    async def _call_excursion_spoken_languages(self) -> httpx.Response:
+        """
+        Returns response of ExcursionSpokenLanguages api call.
+        """
+        endpoint, query, headers = self._excursion_spoken_languages_request()
+        return await self._call_api(endpoint=endpoint, query=query, headers=headers)
+
+    async def _stream_excursion_for_iata_code(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yields items of ExcursionForIataCode api call while response is read in chunks.
+        """
+        endpoint, query, headers = self._excursion_for_iata_code_request(
+            iata_codes=[iata_code],
+            date_from=date_from,
+            date_to=date_to,
+            language_ids=language_ids,
+        )
+        parser = JsonArrayStream("Items")
+        response_bytes = 0
+        response = await self._call_api(
+            endpoint=endpoint, query=query, headers=headers, stream=True,
+        )
+        try:
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                response_bytes += len(chunk)
+                for item in parser.feed(chunk):
+                    yield item
+            self._record_response_bytes(endpoint, response_bytes, response.num_bytes_downloaded)
+            for item in parser.close():
+                yield item
+        finally:
+            await response.aclose()
+
+    async def _call_excursion_for_iata_code(
+            self,
+            iata_code: str | list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+            validators: ResponseValidators | None = None,
+    ) -> httpx.Response:
+        """
+        Returns response of ExcursionForIataCode api call. Accepts single or multiple airports.
+        Request is conditional if validators of previous response are given.
+        """
+        endpoint, query, headers = self._excursion_for_iata_code_request(
+            iata_codes=[iata_code] if isinstance(iata_code, str) else iata_code,
+            date_from=date_from,
+            date_to=date_to,
+            language_ids=language_ids,
+        )
+        headers |= self._conditional_headers(validators)
+        return await self._call_api(endpoint=endpoint, query=query, headers=headers)
+
+    @staticmethod
+    def _pool_limits(options: SeePlacesOptions) -> httpx.Limits:
+        """
+        Returns httpx pool limits equivalent to pool settings of SeePlacesService.
+        """
+        return httpx.Limits(
+            # Httpx limits are not per host. Non-blocking pool opens extra connections.
+            max_connections=(
+                options.pool_connections * options.pool_maxsize if options.pool_block else None
+            ),
+            max_keepalive_connections=options.pool_maxsize if options.keep_alive else 0,
+        )
@@ -0,0 +1,779 @@
+import contextlib
+import datetime
+import hashlib
+import importlib.util
+import math
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, Protocol
+from urllib.parse import urljoin
+
+from seeplaces.cache import CacheEntry, CacheStats, ResponseValidators, RevalidationStats
+from seeplaces.exceptions import DeadlineExceededError
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.languages import LanguageCatalog, shared_catalog
+from seeplaces.metrics import (
+    API_CALLS,
+    BUILD_SECONDS,
+    CACHE_LOOKUPS,
+    DECODE_SECONDS,
+    NOOP,
+    RESPONSE_BYTES,
+    WIRE_BYTES,
+    Instrumentation,
+)
+from seeplaces.ratelimit import RateLimiter
+from seeplaces.resilience import (
+    RETRY_STATUSES,
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+    remaining_time,
+)
+from seeplaces.window import ExcursionWindow, _interval
+
+
+LANGUAGES_CACHE_TTL = 60 * 60 * 24  # 24 hours.
+EXCURSIONS_CACHE_TTL = 60 * 60  # 1 hour.
+EMPTY_EXCURSIONS_CACHE_TTL = 60 * 5  # 5 minutes.
+EXCURSIONS_CACHE_LAYOUT = 2  # Bumped when type of cached excursions changes.
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read at once by iter_excursions.
+COMBINED_CALLS_PAUSE = 60 * 10  # 10 minutes. Api calls per airport after unsplittable response.
+
+# Memcached limit is 250 bytes. Leaves room for suffixes of derived keys, eg. lock keys.
+MAX_CACHE_KEY_LENGTH = 200
+
+
+def _supported_encodings() -> str:
+    """
+    Returns content encodings decoded by requests and httpx. Both decode brotli
+    only if brotli or brotlicffi package is installed.
+    """
+    if any(importlib.util.find_spec(_m) is not None for _m in ("brotli", "brotlicffi")):
+        return "br, gzip, deflate"
+    return "gzip, deflate"
+
+
+ACCEPT_ENCODING = _supported_encodings()
+
+
+_mapping = dict[str, Any]
+"""Type alias for mappings, eg. query and headers."""
+
+_ITEM_IATA_CODE_KEY = "IataCode"
+"""Key of ExcursionForIataCode item holding airport of excursion."""
+
+_LANGUAGES_ENDPOINT = "ExcursionSpokenLanguages"
+_EXCURSIONS_ENDPOINT = "ExcursionForIataCode"
+
+
+def normalize_iata_code(iata_code: str) -> str:
+    """
+    Returns airport code in canonical form, so the same airport maps to the same cache keys.
+    """
+    return iata_code.strip().upper()
+
+
+class _JsonResponse(Protocol):
+    """
+    Api response protocol satisfied by both requests and httpx responses.
+    """
+    status_code: int
+    headers: Any  # Case-insensitive mapping.
+    content: bytes
+
+    def json(self, **kwargs) -> Any: ...
+
+
+class _AccessRecorder(Protocol):
+    """
+    Receives every excursions lookup, eg. AccessTracker learning prefetch targets.
+    """
+
+    def record(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: Iterable[str],
+    ) -> None: ...
+
+
+@dataclass
+class SeePlacesOptions:
+    """
+    Internal options class for SeePlaces service.
+    """
+    base_url: str
+    api_version: str
+    scope_id: str
+
+    # Connection pool settings. See requests.adapters.HTTPAdapter.
+    pool_connections: int = 10  # Number of cached per-host pools.
+    pool_maxsize: int = 10  # Maximum number of connections kept per host.
+    pool_block: bool = False  # Wait for free connection instead of opening extra one.
+    keep_alive: bool = True  # Reuse connections between api calls.
+
+    iata_codes_per_call: int = 10  # Maximum number of airports in single api call.
+    fan_out_workers: int = 8  # Default number of concurrent lookups.
+
+    # Coordinate cache misses between processes with lock in cache. Requires cache.add.
+    cache_lock_timeout: float | None = None  # Seconds. Disabled if None.
+    cache_lock_poll_interval: float = 0.1  # Seconds between checks for result of lock owner.
+
+    # Stale-while-revalidate. Stale excursions are served while refreshed in background.
+    excursions_stale_ttl: int = 0  # Seconds after EXCURSIONS_CACHE_TTL. Disabled if zero.
+    early_refresh_beta: float = 0.0  # Probabilistic refresh before expiry (XFetch). Eg. 1.0.
+    refresh_workers: int = 2  # Number of background refresh threads.
+
+    error_cache_ttl: int = 0  # Seconds to skip api calls after failed call. Disabled if zero.
+
+    # Timeouts of single api call attempt in seconds. Shortened to fit deadline of the caller.
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0  # Maximum wait for next response bytes, not for whole response.
+
+    # Retries of transient failures (connection errors, timeouts, RETRY_STATUSES).
+    max_retries: int = 0  # Disabled if zero.
+    retry_backoff: float = 0.1  # Seconds. Maximum delay before first retry. Doubled per retry.
+    retry_backoff_max: float = 2.0  # Seconds. Maximum delay before any retry.
+
+    # Fail fast with CircuitOpenError after consecutive transient failures.
+    circuit_failure_threshold: int = 0  # Disabled if zero.
+    circuit_reset_timeout: float = 30.0  # Seconds before probe call is allowed.
+
+    compression: bool = True  # Accept compressed responses (ACCEPT_ENCODING). Saves bandwidth.
+
+    currency: str = "EUR"  # Currency of excursion prices.
+    accept_language: str = "sk-SK"  # Language of excursion texts. Slovak is needed for customers.
+
+
+@dataclass
+class ExcursionLookup:
+    """
+    Parameters of single get_excursions call.
+    """
+    iata_code: str
+    date_from: datetime.date
+    date_to: datetime.date
+    spoken_languages: list[str]
+
+
+@dataclass
+class ExcursionLookupResult:
+    """
+    Result of single lookup. Holds either excursions or error raised by the lookup.
+    """
+    lookup: ExcursionLookup
+    excursions: list[SeePlacesExcursion] | None = None
+    error: Exception | None = None
+
+
+class _SpokenLanguage:
+    """
+    Internal class for handling spoken languages.
+    """
+    id: str
+    name: str
+
+    # Require keyword arguments. Discard unused input.
+    def __init__(self, *, Id: str, Name: str, **_) -> None:  # pylint: disable=C0103
+        self.id = Id
+        self.name = Name
+
+
+class _SeePlacesServiceBase:
+    """
+    Shared logic of sync and async SeePlaces services. Does not perform any I/O.
+    """
+    _options: SeePlacesOptions
+    _cache_prefix: str
+    _key_stats: dict[str, CacheStats]
+    _stats_lock: threading.Lock
+    _revalidation_stats: RevalidationStats
+    _language_catalog: LanguageCatalog
+    _circuit_breaker: CircuitBreaker
+    _rate_limiter: RateLimiter | None
+    _access_tracker: _AccessRecorder | None
+    _instrumentation: Instrumentation
+    _combined_calls_paused_until: float
+
+    def __init__(
+            self,
+            options: SeePlacesOptions,
+            cache_prefix: str | None = None,
+            rate_limiter: RateLimiter | None = None,
+            access_tracker: _AccessRecorder | None = None,
+            instrumentation: Instrumentation | None = None,
+    ) -> None:
+        self._options = options
+        # Limiter is usually shared by all services using the same api quota.
+        self._rate_limiter = rate_limiter
+        self._access_tracker = access_tracker
+        self._instrumentation = instrumentation if instrumentation is not None else NOOP
+
+        # Do not use "argument or default" as empty prefix should be allowed.
+        if cache_prefix is None:
+            cache_prefix = "seeplaces"  # Default cache prefix.
+        self._cache_prefix = cache_prefix
+
+        self._key_stats = {"exc": CacheStats(), "lang": CacheStats()}
+        self._stats_lock = threading.Lock()
+        self._revalidation_stats = RevalidationStats()
+        # Paused for a while once combined response of multiple airports cannot be split.
+        self._combined_calls_paused_until = 0.0
+
+        # Languages rarely change. All services of the same api share single catalog.
+        self._language_catalog = shared_catalog(
+            options.base_url, options.api_version, ttl=LANGUAGES_CACHE_TTL,
+        )
+        self._circuit_breaker = CircuitBreaker(
+            failure_threshold=options.circuit_failure_threshold,
+            reset_timeout=options.circuit_reset_timeout,
+        )
+
+    def _record_access(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> None:
+        """
+        Passes lookup to access tracker if any.
+        """
+        if (tracker := self._access_tracker) is not None:
+            for iata_code in iata_codes:
+                tracker.record(iata_code, date_from, date_to, spoken_languages)
+
+    @property
+    def circuit_state(self) -> str:
+        """
+        Returns state of upstream circuit breaker ("closed", "open" or "half_open").
+        """
+        return self._circuit_breaker.state
+
+    def _attempt_timeouts(self, endpoint: str) -> tuple[float, float]:
+        """
+        Returns connect and read timeout of next api call attempt shortened to fit deadline.
+        Raises DeadlineExceededError if deadline passed, CircuitOpenError if circuit is open.
+        """
+        connect_timeout, read_timeout = self._options.connect_timeout, self._options.read_timeout
+        if (remaining := remaining_time()) is not None:
+            if remaining <= 0:
+                raise DeadlineExceededError(f"Api call exceeded deadline: {endpoint}")
+            connect_timeout = min(connect_timeout, remaining)
+            read_timeout = min(read_timeout, remaining)
+        if not self._circuit_breaker.allow():
+            raise CircuitOpenError(f"Skipping api call after repeated failures: {endpoint}")
+        return connect_timeout, read_timeout
+
+    def _record_attempt(self, status_code: int | None) -> bool:
+        """
+        Records outcome of api call attempt. Status code is None if no response was received.
+        Returns True if attempt failed transiently.
+        """
+        if status_code is None or status_code in RETRY_STATUSES:
+            self._circuit_breaker.record_failure()
+            return True
+        self._circuit_breaker.record_success()
+        return False
+
+    def _retry_delay(self, retry: int) -> float | None:
+        """
+        Returns seconds to wait before given retry (counted from zero).
+        Returns None if retries are exhausted or the delay does not fit deadline.
+        """
+        if retry >= self._options.max_retries:
+            return None
+        options = self._options
+        delay = backoff_delay(retry, base=options.retry_backoff, cap=options.retry_backoff_max)
+        if (remaining := remaining_time()) is not None and delay >= remaining:
+            return None
+        return delay
+
+    @staticmethod
+    def _deadline_exceeded() -> bool:
+        """
+        Returns True if deadline of current scope passed.
+        """
+        return (remaining := remaining_time()) is not None and remaining <= 0
+
+    @property
+    def key_stats(self) -> dict[str, CacheStats]:
+        """
+        Returns hit and miss counters of cache lookups by key family ("exc", "lang").
+        Language lookups served by in-memory catalog count as hits.
+        """
+        return self._key_stats
+
+    def _record_lookup(self, family: str, hit: bool) -> None:
+        """
+        Counts cache lookup of given key family.
+        """
+        with self._stats_lock:
+            if hit:
+                self._key_stats[family].hits += 1
+            else:
+                self._key_stats[family].misses += 1
+        self._instrumentation.increment(
+            CACHE_LOOKUPS, {"family": family, "result": "hit" if hit else "miss"},
+        )
+
+    @contextlib.contextmanager
+    def _timed(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Reports duration of the block to instrumentation. Failed blocks are reported too.
+        """
+        if (instrumentation := self._instrumentation) is NOOP:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            instrumentation.observe(name, time.perf_counter() - start, labels)
+
+    def _record_api_call(
+            self,
+            endpoint: str,
+            ok: bool,
+            response_bytes: int | None = None,
+            wire_bytes: int | None = None,
+    ) -> None:
+        """
+        Reports finished api call and size of its response body if known.
+        """
+        labels = {"endpoint": self._endpoint_label(endpoint), "result": "ok" if ok else "error"}
+        self._instrumentation.increment(API_CALLS, labels)
+        if response_bytes is not None:
+            self._record_response_bytes(endpoint, response_bytes, wire_bytes)
+
+    def _record_response_bytes(
+            self,
+            endpoint: str,
+            response_bytes: int,
+            wire_bytes: int | None = None,
+    ) -> None:
+        """
+        Reports size of response body after and before decompression.
+        Streamed responses are reported when fully read.
+        """
+        labels = {"endpoint": self._endpoint_label(endpoint)}
+        self._instrumentation.observe(RESPONSE_BYTES, response_bytes, labels)
+        if wire_bytes is not None:
+            self._instrumentation.observe(WIRE_BYTES, wire_bytes, labels)
+
+    @staticmethod
+    def _group_by_timeout(entries: dict[str, tuple[Any, int]]) -> dict[int, dict[str, Any]]:
+        """
+        Returns values to save grouped by timeout, so each group fits single set_many.
+        """
+        groups: dict[int, dict[str, Any]] = {}
+        for cache_key, (value, timeout) in entries.items():
+            groups.setdefault(timeout, {})[cache_key] = value
+        return groups
+
+    @staticmethod
+    def _endpoint_label(endpoint: str) -> str:
+        """
+        Returns short endpoint name used in metrics, eg. ExcursionForIataCode.
+        """
+        return endpoint.rstrip("/").rsplit("/", 1)[-1]
+
+    def _cache_key(self, family: str, *parts: str) -> str:
+        """
+        Returns cache key of given family built from parts. Keys which are too long
+        or contain characters not allowed by memcached are hashed.
+        """
+        key = "_".join((self._cache_prefix, family, *parts))
+        if len(key) > MAX_CACHE_KEY_LENGTH or not all(32 < ord(_c) < 127 for _c in key):
+            digest = hashlib.sha1(key.encode()).hexdigest()
+            key = f"{self._cache_prefix}_{family}_{digest}"
+        return key
+
+    @staticmethod
+    def _languages_key_part(spoken_languages: list[str]) -> str:
+        """
+        Returns languages part of cache key. Does not depend on order or duplicates.
+        """
+        return ",".join(sorted(set(spoken_languages)))
+
+    def _excursions_cache_key(
+        self,
+        iata_code: str,
+        date_from: datetime.date,
+        spoken_languages: list[str],
+    ) -> str:
+        """
+        Returns cache key for excursions of month window containing date_from.
+        Includes all parameters affecting api response. Dates of window are kept in cache.
+        """
+        options = self._options
+        return self._cache_key(
+            "exc",
+            f"v{EXCURSIONS_CACHE_LAYOUT}",
+            options.scope_id,
+            options.currency,
+            options.accept_language,
+            normalize_iata_code(iata_code),
+            f"{date_from:%Y-%m}",
+            self._languages_key_part(spoken_languages),
+        )
+
+    def _languages_cache_key(self) -> str:
+        """
+        Returns cache key for catalog of all languages.
+        """
+        return self._cache_key("lang", "catalog")
+
+    def _error_cache_key(self, cache_key: str) -> str:
+        """
+        Returns cache key of failed api call for given cache key.
+        """
+        return f"{cache_key}_err"
+
+    @staticmethod
+    def _is_upstream_failure(exc: Exception) -> bool:
+        """
+        Returns True if api call failed because of upstream. Failures caused by deadline
+        of caller or by local state, eg. open circuit, are not remembered for other callers.
+        """
+        return not isinstance(exc, (DeadlineExceededError, CircuitOpenError))
+
+    def _excursions_cache_entry(
+            self,
+            window: ExcursionWindow,
+            fetch_duration: float,
+            previous: CacheEntry | None = None,
+            validators: ResponseValidators | None = None,
+    ) -> tuple[CacheEntry, int]:
+        """
+        Returns cache entry of excursion window with expiry metadata and its cache timeout.
+        Empty window is cached for shorter time. Stale entries are kept until they expire.
+        Window extending previous entry expires with it, as it holds previously fetched data.
+        Only most recently fetched ranges of window are kept.
+        """
+        ttl = EMPTY_EXCURSIONS_CACHE_TTL if window.is_empty else EXCURSIONS_CACHE_TTL
+        entry = CacheEntry.create(
+            window.latest(),
+            ttl=ttl,
+            stale_ttl=self._options.excursions_stale_ttl,
+            fetch_duration=fetch_duration,
+            validators=validators,
+        )
+        if previous is not None:
+            entry.stale_at = min(entry.stale_at, previous.stale_at)
+            entry.expires_at = min(entry.expires_at, previous.expires_at)
+        return entry, max(1, math.ceil(entry.expires_at - time.time()))
+
+    @staticmethod
+    def _is_usable(cached: Any) -> bool:
+        """
+        Returns True if cached excursions can be served. Expired entries and entries
+        of other layout are ignored.
+        """
+        if isinstance(cached, CacheEntry):
+            return isinstance(cached.value, ExcursionWindow) and not cached.is_expired()
+        return cached is not None
+
+    @staticmethod
+    def _refetched_ranges(
+            cached: Any,
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> list[_interval]:
+        """
+        Returns ranges of cached window inside given range, so each range keeps answering
+        its own dates when fetched again. Returns whole range if no such range is cached.
+        """
+        if isinstance(cached, CacheEntry) and isinstance(window := cached.value, ExcursionWindow):
+            if ranges := [_r.interval for _r in window.ranges if _r.inside(date_from, date_to)]:
+                return ranges
+        return [(date_from, date_to)]
+
+    def _batch_flight_key(
+            self,
+            cache_keys: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> str:
+        """
+        Returns key of api call shared by concurrent callers fetching the same batch of airports.
+        """
+        return self._cache_key(
+            "exc_batch", *cache_keys, date_from.isoformat(), date_to.isoformat(),
+        )
+
+    def _split_cached_batch(
+            self,
+            cached_values: dict[str, Any],
+            cache_keys: dict[str, str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> tuple[dict[str, list[SeePlacesExcursion]], dict[str, CacheEntry]]:
+        """
+        Returns excursions of airports with fresh cached range and cached entries
+        of other airports which can be extended.
+        """
+        result: dict[str, list[SeePlacesExcursion]] = {}
+        previous: dict[str, CacheEntry] = {}
+        for iata_code, cache_key in cache_keys.items():
+            if (entry := self._extendable_entry(cached_values.get(cache_key))) is None:
+                continue
+            if (excursions := entry.value.find(date_from, date_to)) is not None:
+                result[iata_code] = excursions
+            else:
+                previous[iata_code] = entry
+        return result, previous
+
+    def _batch_cache_entries(
+            self,
+            excursions: dict[str, list[SeePlacesExcursion]],
+            cache_keys: dict[str, str],
+            previous: dict[str, CacheEntry],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            fetch_duration: float,
+    ) -> dict[str, tuple[CacheEntry, int]]:
+        """
+        Returns cache entries of fetched airports with their cache timeouts.
+        """
+        entries = {}
+        for iata_code, _e in excursions.items():
+            entry = previous.get(iata_code)
+            window = entry.value if entry is not None else ExcursionWindow()
+            entries[cache_keys[iata_code]] = self._excursions_cache_entry(
+                window.merge(date_from, date_to, _e), fetch_duration, entry,
+            )
+        return entries
+
+    @staticmethod
+    def _extendable_entry(cached: Any) -> CacheEntry | None:
+        """
+        Returns cached entry if it holds fresh excursion window which can be extended.
+        """
+        if (
+            isinstance(cached, CacheEntry)
+            and isinstance(cached.value, ExcursionWindow)
+            and not cached.is_stale()
+        ):
+            return cached
+        return None
+
+    @staticmethod
+    def _revalidatable_entry(
+            cached: Any,
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> CacheEntry | None:
+        """
+        Returns cached entry if it holds validators of single response covering given range.
+        """
+        if (
+            isinstance(cached, CacheEntry)
+            and cached.validators is not None
+            and isinstance(cached.value, ExcursionWindow)
+            and [_r.interval for _r in cached.value.ranges] == [(date_from, date_to)]
+            and not cached.is_expired()
+        ):
+            return cached
+        return None
+
+    @staticmethod
+    def _conditional_headers(validators: ResponseValidators | None) -> _mapping:
+        """
+        Returns headers of conditional request. Empty without validators.
+        """
+        headers = {}
+        if validators is not None:
+            if validators.etag is not None:
+                headers["if-none-match"] = validators.etag
+            if validators.last_modified is not None:
+                headers["if-modified-since"] = validators.last_modified
+        return headers
+
+    @staticmethod
+    def _response_validators(response: _JsonResponse) -> ResponseValidators:
+        """
+        Returns validators of api response.
+        """
+        return ResponseValidators(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            content_hash=hashlib.sha1(response.content).hexdigest(),
+        )
+
+    def _is_unchanged(self, response: _JsonResponse, validators: ResponseValidators | None) -> bool:
+        """
+        Returns True if response confirms that content of validated response did not change.
+        Counts outcome of conditional refresh.
+        """
+        if validators is None:
+            return False
+        if response.status_code == 304:
+            self._record_revalidation("not_modified")
+            return True
+        if validators.content_hash == hashlib.sha1(response.content).hexdigest():
+            self._record_revalidation("unchanged")
+            return True
+        self._record_revalidation("modified")
+        return False
+
+    def _revalidated_entry(
+            self,
+            entry: CacheEntry,
+            fetch_duration: float,
+    ) -> tuple[CacheEntry, int]:
+        """
+        Returns cache entry of unchanged window with renewed expiry and its cache timeout.
+        """
+        return self._excursions_cache_entry(
+            entry.value, fetch_duration, validators=entry.validators,
+        )
+
+    @property
+    def revalidation_stats(self) -> RevalidationStats:
+        """
+        Returns outcomes of conditional refreshes. Avoided refreshes did not parse response.
+        """
+        return self._revalidation_stats
+
+    def _record_revalidation(self, outcome: str) -> None:
+        """
+        Counts outcome of conditional refresh ("not_modified", "unchanged" or "modified").
+        """
+        with self._stats_lock:
+            stats = self._revalidation_stats
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+    def _parse_languages_from_response(self, response: _JsonResponse) -> list[_SpokenLanguage]:
+        """
+        Returns api call response parsed into list of _SpokenLanguage objects.
+        """
+        with self._timed(DECODE_SECONDS, endpoint=_LANGUAGES_ENDPOINT):
+            json_data: dict[str, Any] = response.json()
+
+        languages = []
+        with self._timed(BUILD_SECONDS, endpoint=_LANGUAGES_ENDPOINT):
+            # Assuming SpokenLanguages is iterable.
+            if languages_from_response := json_data.get("SpokenLanguages"):
+                for _l in languages_from_response:
+                    languages.append(_SpokenLanguage(**_l))
+        return languages
+
+    def _language_index_from_response(self, response: _JsonResponse) -> dict[str, str]:
+        """
+        Returns api call response parsed into language name to ID index.
+        """
+        return {_l.name: _l.id for _l in self._parse_languages_from_response(response)}
+
+    def _parse_excursions_from_response(
+            self,
+            response: _JsonResponse,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns api call response parsed into list of SeePlacesExcursion objects.
+        """
+        with self._timed(DECODE_SECONDS, endpoint=_EXCURSIONS_ENDPOINT):
+            json_data: dict[str, Any] = response.json()
+
+        excursions = []
+        with self._timed(BUILD_SECONDS, endpoint=_EXCURSIONS_ENDPOINT):
+            # Assuming Items is iterable.
+            if excursions_from_response := json_data.get("Items"):
+                for _e in excursions_from_response:
+                    excursions.append(SeePlacesExcursion(**_e))
+        return excursions
+
+    def _parse_excursions_by_iata_code(
+            self,
+            response: _JsonResponse,
+            iata_codes: list[str],
+    ) -> dict[str, list[SeePlacesExcursion]] | None:
+        """
+        Returns api call response for multiple airports split by airport.
+        Returns None if some excursion cannot be assigned to requested airport.
+        """
+        with self._timed(DECODE_SECONDS, endpoint=_EXCURSIONS_ENDPOINT):
+            json_data: dict[str, Any] = response.json()
+
+        excursions: dict[str, list[SeePlacesExcursion]] = {_c: [] for _c in iata_codes}
+        with self._timed(BUILD_SECONDS, endpoint=_EXCURSIONS_ENDPOINT):
+            # Assuming Items is iterable.
+            for _e in json_data.get("Items") or []:
+                if len(iata_codes) == 1:
+                    iata_code = iata_codes[0]
+                else:
+                    iata_code = normalize_iata_code(_e.get(_ITEM_IATA_CODE_KEY) or "")
+                if iata_code not in excursions:
+                    return None
+                excursions[iata_code].append(SeePlacesExcursion(**_e))
+        return excursions
+
+    def _pause_combined_calls(self) -> None:
+        """
+        Calls api per airport for COMBINED_CALLS_PAUSE. Combined calls are tried again later,
+        as single unsplittable response may not be permanent.
+        """
+        self._combined_calls_paused_until = time.monotonic() + COMBINED_CALLS_PAUSE
+
+    def _iata_code_batches(self, iata_codes: list[str]) -> list[list[str]]:
+        """
+        Returns airports split into batches fitting single api call.
+        Each airport is called alone for a while after api items did not carry their airport.
+        """
+        combined = time.monotonic() >= self._combined_calls_paused_until
+        size = self._options.iata_codes_per_call if combined else 1
+        return [iata_codes[i:i + size] for i in range(0, len(iata_codes), size)]
+
+    def _api_request(
+            self,
+            endpoint: str,
+            query: _mapping,
+            headers: _mapping,
+    ) -> tuple[str, _mapping, _mapping]:
+        """
+        Returns url, query and headers of api call. Parameters override query and header defaults.
+        """
+        accept_encoding = ACCEPT_ENCODING if self._options.compression else "identity"
+        return (
+            urljoin(self._options.base_url, endpoint),
+            {"api-version": self._options.api_version} | query,
+            {"accept": "application/json", "accept-encoding": accept_encoding} | headers,
+        )
+
+    def _excursion_spoken_languages_request(self) -> tuple[str, _mapping, _mapping]:
+        """
+        Returns endpoint, query and headers of ExcursionSpokenLanguages api call.
+        """
+        endpoint_path = f"api/Excursion/{_LANGUAGES_ENDPOINT}"
+        # English is accepted here. Customers do not see the response.
+        headers = {"accept-language": "en-US"}
+        return endpoint_path, {}, headers
+
+    def _excursion_for_iata_code_request(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+    ) -> tuple[str, _mapping, _mapping]:
+        """
+        Returns endpoint, query and headers of ExcursionForIataCode api call.
+        """
+        endpoint_path = f"api/Excursion/{_EXCURSIONS_ENDPOINT}"
+        query = {
+            "input.iataCodes": iata_codes,
+            "input.dateFrom": date_from.isoformat(),
+            "input.dateTo": date_to.isoformat(),
+            "input.spokenLanguages": language_ids,
+        }
+        headers = {
+            "x-scope-id": self._options.scope_id,
+            "currency": self._options.currency,
+            "accept-language": self._options.accept_language,
+        }
+        return endpoint_path, query, headers
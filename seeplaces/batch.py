@@ -0,0 +1,326 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover
+    raise ImportError(
+        "ExcursionBatch requires numpy. Install it with: pip install seeplaces[batch]"
+    ) from exc
+
+from seeplaces.codec import _ALL_DAY, _HIDE_DURATION, _MANY_DAYS
+from seeplaces.excursion import SeePlacesExcursion
+
+
+_NUMERIC_COLUMNS = ("final_price", "duration_hours", "duration_days")
+
+
+@dataclass
+class PriceStats:
+    """
+    Price statistics of excursions in batch.
+    """
+    count: int
+    min: float
+    max: float
+    mean: float
+    median: float
+
+
+class _Dictionary:
+    """
+    Dictionary encoding of repeated values. Maps values to small integer codes.
+    """
+    values: list[Any]
+
+    _codes: dict[Any, int]
+
+    def __init__(self) -> None:
+        self.values = []
+        self._codes = {}
+
+    def code(self, value: Any) -> int | None:
+        """
+        Returns code of value. Returns None if value is not in dictionary.
+        """
+        return self._codes.get(value)
+
+    def encode(self, value: Any) -> int:
+        """
+        Returns code of value. Adds value to dictionary if needed.
+        """
+        if (code := self._codes.get(value)) is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ExcursionBatch:
+    """
+    Excursions stored as columns. Numeric values are kept in numpy arrays, repeated strings
+    are dictionary encoded. Filter, sort and aggregate run as numpy operations on columns
+    without creating excursion objects. SeePlacesExcursion objects are created lazily on
+    iteration. Batches are immutable. Operations return new batches.
+    """
+    final_price: np.ndarray
+    duration_hours: np.ndarray
+    duration_days: np.ndarray
+
+    _names: np.ndarray
+    _photo_paths: np.ndarray
+    _descriptions: np.ndarray
+    _duration_flags: np.ndarray
+    _currency_codes: np.ndarray
+    _currencies: _Dictionary
+    _included_codes: np.ndarray
+    _included: _Dictionary
+
+    def __init__(
+        self,
+        *,  # Require keyword arguments.
+        final_price: np.ndarray,
+        duration_hours: np.ndarray,
+        duration_days: np.ndarray,
+        names: np.ndarray,
+        photo_paths: np.ndarray,
+        descriptions: np.ndarray,
+        duration_flags: np.ndarray,
+        currency_codes: np.ndarray,
+        currencies: _Dictionary,
+        included_codes: np.ndarray,
+        included: _Dictionary,
+    ) -> None:
+        """
+        Creates batch from columns of equal length. Codes refer to values of given dictionaries.
+        """
+        self.final_price = final_price
+        self.duration_hours = duration_hours
+        self.duration_days = duration_days
+
+        self._names = names
+        self._photo_paths = photo_paths
+        self._descriptions = descriptions
+        self._duration_flags = duration_flags
+        self._currency_codes = currency_codes
+        self._currencies = currencies
+        self._included_codes = included_codes
+        self._included = included
+
+    @classmethod
+    def from_items(cls, items: Iterable[dict[str, Any]]) -> "ExcursionBatch":
+        """
+        Returns batch of ExcursionForIataCode response items. Discards unused item properties.
+        """
+        return cls._from_rows(
+            (
+                _i["Name"],
+                _i["FinalPrice"],
+                _i["PhotoPath"],
+                _i["Description"],
+                _i["Currency"],
+                tuple(_i["IncludedInPrice"]),
+                (
+                    _ALL_DAY * bool(_i["IsAllDay"])
+                    | _MANY_DAYS * bool(_i["IsManyDays"])
+                    | _HIDE_DURATION * bool(_i["HideDuration"])
+                ),
+                _i["DurationHours"],
+                _i["DurationDays"],
+            )
+            for _i in items
+        )
+
+    @classmethod
+    def from_excursions(cls, excursions: Iterable[SeePlacesExcursion]) -> "ExcursionBatch":
+        """
+        Returns batch of excursions, eg. result of get_excursions.
+        """
+        return cls._from_rows(_excursion_row(_e) for _e in excursions)
+
+    @classmethod
+    def _from_rows(cls, rows: Iterable[tuple]) -> "ExcursionBatch":
+        """
+        Returns batch of rows of name, price, photo path, description, currency, included
+        items, duration flags, hours and days. Each column is converted to array at once.
+        """
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * 9
+        names, prices, photo_paths, descriptions, currencies, included, flags, hours, days = columns
+        currency_dictionary, included_dictionary = _Dictionary(), _Dictionary()
+        return cls(
+            final_price=np.array(prices, dtype=np.float64),
+            duration_hours=np.array(hours, dtype=np.float64),
+            duration_days=np.array(days, dtype=np.float64),
+            names=_object_array(names),
+            photo_paths=_object_array(photo_paths),
+            descriptions=_object_array(descriptions),
+            duration_flags=np.array(flags, dtype=np.uint8),
+            currency_codes=np.array(
+                [currency_dictionary.encode(_c) for _c in currencies], dtype=np.uint32,
+            ),
+            currencies=currency_dictionary,
+            included_codes=np.array(
+                [included_dictionary.encode(_i) for _i in included], dtype=np.uint32,
+            ),
+            included=included_dictionary,
+        )
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[SeePlacesExcursion]:
+        return (self[_i] for _i in range(len(self)))
+
+    def __getitem__(self, index: int) -> SeePlacesExcursion:
+        """
+        Returns excursion at given position. Creates new SeePlacesExcursion object.
+        """
+        flags = int(self._duration_flags[index])
+        return SeePlacesExcursion(
+            Name=self._names[index],
+            FinalPrice=float(self.final_price[index]),
+            PhotoPath=self._photo_paths[index],
+            Description=self._descriptions[index],
+            Currency=self._currencies.values[self._currency_codes[index]],
+            IncludedInPrice=self._included.values[self._included_codes[index]],
+            IsAllDay=bool(flags & _ALL_DAY),
+            IsManyDays=bool(flags & _MANY_DAYS),
+            DurationHours=float(self.duration_hours[index]),
+            DurationDays=float(self.duration_days[index]),
+            HideDuration=bool(flags & _HIDE_DURATION),
+        )
+
+    @property
+    def currencies(self) -> list[str]:
+        """
+        Returns currencies of excursions in batch.
+        """
+        return [self._currencies.values[_c] for _c in self._currency_codes]
+
+    def filter(
+            self,
+            *,  # Require keyword arguments.
+            min_price: float | None = None,
+            max_price: float | None = None,
+            currency: str | None = None,
+            max_duration_hours: float | None = None,
+            all_day: bool | None = None,
+    ) -> "ExcursionBatch":
+        """
+        Returns batch of excursions matching all given conditions.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_price is not None:
+            mask &= self.final_price >= min_price
+        if max_price is not None:
+            mask &= self.final_price <= max_price
+        if currency is not None:
+            # Compare integer codes instead of strings.
+            if (code := self._currencies.code(currency)) is None:
+                mask[:] = False
+            else:
+                mask &= self._currency_codes == code
+        if max_duration_hours is not None:
+            mask &= self.duration_hours <= max_duration_hours
+        if all_day is not None:
+            mask &= (self._duration_flags & _ALL_DAY).astype(bool) == all_day
+        return self._take(np.flatnonzero(mask))
+
+    def sort(self, key: str = "final_price", descending: bool = False) -> "ExcursionBatch":
+        """
+        Returns batch sorted by numeric column. Sort is stable.
+        """
+        values = self._sort_values(key, descending)
+        return self._take(np.argsort(values, kind="stable"))
+
+    def top_k(self, k: int, key: str = "final_price", descending: bool = False) -> "ExcursionBatch":
+        """
+        Returns batch of k excursions with lowest (or highest) values of numeric column.
+        Of equal values, excursions earlier in batch are selected first.
+        """
+        values = self._sort_values(key, descending)
+        if k <= 0:
+            return self._take(np.array([], dtype=np.intp))
+        if k >= len(self):
+            return self._take(np.argsort(values, kind="stable"))
+
+        # Partition finds k-th value without sorting whole column. Only selected rows are sorted.
+        kth = np.partition(values, k - 1)[k - 1]
+        below = np.flatnonzero(values < kth)
+        indices = np.concatenate((below, np.flatnonzero(values == kth)[:k - len(below)]))
+        return self._take(indices[np.argsort(values[indices], kind="stable")])
+
+    def price_stats(self) -> PriceStats | None:
+        """
+        Returns price statistics. Returns None for empty batch.
+        Prices in different currencies are not converted. Filter by currency first.
+        """
+        if not (prices := self.final_price).size:
+            return None
+        return PriceStats(
+            count=len(prices),
+            min=float(prices.min()),
+            max=float(prices.max()),
+            mean=float(prices.mean()),
+            median=float(np.median(prices)),
+        )
+
+    def _sort_values(self, key: str, descending: bool) -> np.ndarray:
+        """
+        Returns numeric column of given name. Negated for descending order.
+        """
+        if key not in _NUMERIC_COLUMNS:
+            raise ValueError(f"Unknown column: {key}. Use one of: {', '.join(_NUMERIC_COLUMNS)}")
+        column = getattr(self, key)
+        return -column if descending else column
+
+    def _take(self, indices: np.ndarray) -> "ExcursionBatch":
+        """
+        Returns new batch with rows at given positions. Shares dictionaries with this batch.
+        """
+        return ExcursionBatch(
+            final_price=self.final_price[indices],
+            duration_hours=self.duration_hours[indices],
+            duration_days=self.duration_days[indices],
+            names=self._names[indices],
+            photo_paths=self._photo_paths[indices],
+            descriptions=self._descriptions[indices],
+            duration_flags=self._duration_flags[indices],
+            currency_codes=self._currency_codes[indices],
+            currencies=self._currencies,
+            included_codes=self._included_codes[indices],
+            included=self._included,
+        )
+
+
+def _excursion_row(excursion: SeePlacesExcursion) -> tuple:
+    """
+    Returns excursion as row of batch columns.
+    """
+    duration = excursion._duration  # pylint: disable=W0212
+    return (
+        excursion.name,
+        excursion.final_price,
+        excursion.photo_path,
+        excursion.description,
+        excursion.currency,
+        tuple(excursion.included_in_price),
+        (
+            _ALL_DAY * duration.is_all_day
+            | _MANY_DAYS * duration.is_many_days
+            | _HIDE_DURATION * duration.hide_duration
+        ),
+        duration.duration_hours,
+        duration.duration_days,
+    )
+
+
+def _object_array(values: Iterable[str]) -> np.ndarray:
+    """
+    Returns one-dimensional numpy array of strings kept as python objects.
+    """
+    values = list(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
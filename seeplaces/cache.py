@@ -0,0 +1,444 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+
+class CacheProtocol(Protocol):
+    """
+    Generic cache protocol designed to be used with Django cache API.
+    See: https://docs.djangoproject.com/en/3.2/topics/cache/#the-low-level-cache-api.
+    """
+    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any: ...
+    def set(self, key: str, value: Any, timeout: int = 0, version: Any = None) -> None: ...
+    """Generic integer placeholder used as DEFAULT_TIMEOUT."""
+
+
+class LockingCacheProtocol(CacheProtocol, Protocol):
+    """
+    Cache protocol with atomic add, eg. Django cache backed by Redis or Memcached.
+    """
+    def add(self, key: str, value: Any, timeout: int = 0, version: Any = None) -> bool: ...
+    def delete(self, key: str, version: Any = None) -> Any: ...
+
+
+class BatchCacheProtocol(CacheProtocol, Protocol):
+    """
+    Cache protocol with multi-key operations, eg. Django cache. Saves round trips to remote
+    cache. Use batch_get, batch_set and batch_delete to fall back to single-key operations.
+    """
+    def get_many(self, keys: list[str], version: Any = None) -> dict[str, Any]: ...
+    def set_many(self, data: dict[str, Any], timeout: int = 0, version: Any = None) -> list: ...
+    def delete_many(self, keys: list[str], version: Any = None) -> Any: ...
+
+
+class AsyncCacheProtocol(Protocol):
+    """
+    Generic async cache protocol designed to be used with Django async cache API.
+    See: https://docs.djangoproject.com/en/4.1/topics/cache/#asynchronous-support.
+    """
+    async def aget(self, key: str, default: Any | None = None, version: Any = None) -> Any: ...
+    async def aset(self, key: str, value: Any, timeout: int = 0, version: Any = None) -> None: ...
+
+
+def batch_get(cache: CacheProtocol, keys: list[str], version: Any = None) -> dict[str, Any]:
+    """
+    Returns values of keys found in cache. Uses get_many if cache supports it.
+    """
+    if hasattr(cache, "get_many"):
+        return cache.get_many(keys, version=version)  # type: ignore[attr-defined]
+    values = {_k: cache.get(_k, version=version) for _k in keys}
+    return {_k: _v for _k, _v in values.items() if _v is not None}
+
+
+def batch_set(
+        cache: CacheProtocol,
+        data: dict[str, Any],
+        timeout: int | None = 0,
+        version: Any = None,
+) -> None:
+    """
+    Saves values with the same timeout. Uses set_many if cache supports it.
+    """
+    if hasattr(cache, "set_many"):
+        cache.set_many(data, timeout=timeout, version=version)  # type: ignore[attr-defined]
+        return
+    for key, value in data.items():
+        cache.set(key, value, timeout=timeout, version=version)  # type: ignore[arg-type]
+
+
+def batch_delete(cache: CacheProtocol, keys: list[str], version: Any = None) -> None:
+    """
+    Removes entries. Uses delete_many if cache supports it.
+    """
+    if hasattr(cache, "delete_many"):
+        cache.delete_many(keys, version=version)  # type: ignore[attr-defined]
+        return
+    for key in keys:
+        cache.delete(key, version=version)  # type: ignore[attr-defined]
+
+
+async def abatch_get(
+        cache: AsyncCacheProtocol,
+        keys: list[str],
+        version: Any = None,
+) -> dict[str, Any]:
+    """
+    Async variant of batch_get. Uses aget_many if cache supports it, concurrent aget otherwise.
+    """
+    if hasattr(cache, "aget_many"):
+        return await cache.aget_many(keys, version=version)  # type: ignore[attr-defined]
+    values = await asyncio.gather(*(cache.aget(_k, version=version) for _k in keys))
+    return {_k: _v for _k, _v in zip(keys, values) if _v is not None}
+
+
+async def abatch_set(
+        cache: AsyncCacheProtocol,
+        data: dict[str, Any],
+        timeout: int | None = 0,
+        version: Any = None,
+) -> None:
+    """
+    Async variant of batch_set. Uses aset_many if cache supports it, concurrent aset otherwise.
+    """
+    if hasattr(cache, "aset_many"):
+        await cache.aset_many(data, timeout=timeout, version=version)  # type: ignore[attr-defined]
+        return
+    await asyncio.gather(*(
+        cache.aset(_k, _v, timeout=timeout, version=version)  # type: ignore[arg-type]
+        for _k, _v in data.items()
+    ))
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit and miss counters of single cache tier.
+    """
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Returns share of hits in all lookups. Returns zero if there were no lookups.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class RevalidationStats:
+    """
+    Outcomes of conditional refreshes of cache entries.
+    """
+    not_modified: int = 0  # Api responded 304 Not Modified.
+    unchanged: int = 0  # Api sent the same content again. Content was not parsed.
+    modified: int = 0
+
+    @property
+    def avoided(self) -> int:
+        """
+        Returns number of refreshes which did not need to parse api response.
+        """
+        return self.not_modified + self.unchanged
+
+
+@dataclass
+class ResponseValidators:
+    """
+    Validators of api response used for conditional requests.
+    """
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None  # Fallback if api does not send validator headers.
+
+
+@dataclass
+class CacheEntry:
+    """
+    Cached value with soft (stale) and hard (expired) expiry. Times are unix timestamps,
+    so entries can be shared by processes.
+    """
+    value: Any
+    stale_at: float
+    expires_at: float
+    fetch_duration: float = 0.0  # Seconds needed to fetch value. Used for early refresh.
+    validators: ResponseValidators | None = None  # Validators of response holding whole value.
+
+    @classmethod
+    def create(
+            cls,
+            value: Any,
+            ttl: float,
+            stale_ttl: float = 0.0,
+            fetch_duration: float = 0.0,
+            validators: ResponseValidators | None = None,
+    ) -> "CacheEntry":
+        """
+        Returns new entry. Entry becomes stale after ttl and expires stale_ttl later.
+        """
+        now = time.time()
+        return cls(
+            value=value,
+            stale_at=now + ttl,
+            expires_at=now + ttl + stale_ttl,
+            fetch_duration=fetch_duration,
+            validators=validators,
+        )
+
+    def is_stale(self) -> bool:
+        """
+        Returns True if entry should not be served without refresh.
+        """
+        return time.time() >= self.stale_at
+
+    def is_expired(self) -> bool:
+        """
+        Returns True if entry should not be served at all.
+        """
+        return time.time() >= self.expires_at
+
+    def should_refresh(self, beta: float = 0.0) -> bool:
+        """
+        Returns True for stale entries. Fresh entries are refreshed early with probability
+        growing towards stale_at (XFetch). Zero beta disables early refresh.
+        """
+        now = time.time()
+        if now >= self.stale_at:
+            return True
+        if beta <= 0 or self.fetch_duration <= 0:
+            return False
+        # Random value in (0, 1]. Logarithm is negative, so the gap is positive.
+        gap = -self.fetch_duration * beta * math.log(1.0 - random.random())
+        return now + gap >= self.stale_at
+
+
+class LocalCache:
+    """
+    Bounded in-process cache with LRU eviction and per-entry TTL. Implements CacheProtocol.
+    Values are not copied. Cached objects must not be modified by callers.
+    """
+    max_entries: int
+    default_timeout: int
+    stats: CacheStats
+
+    _entries: OrderedDict[tuple[str, Any], tuple[float | None, Any]]
+    _lock: threading.Lock
+
+    def __init__(self, max_entries: int = 1024, default_timeout: int = 300) -> None:
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self.stats = CacheStats()
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Returns cached value or default if key is missing or expired.
+        """
+        with self._lock:
+            if (entry := self._entries.get((key, version))) is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end((key, version))  # Mark as recently used.
+                    self.stats.hits += 1
+                    return value
+                del self._entries[(key, version)]
+            self.stats.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> None:
+        """
+        Saves value. Zero timeout uses default timeout, None never expires (as in Django).
+        Evicts least recently used entries if cache is full.
+        """
+        with self._lock:
+            self._store(key, value, timeout=timeout, version=version)
+
+    def add(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> bool:
+        """
+        Saves value only if key is missing or expired. Returns True if value was saved.
+        """
+        with self._lock:
+            if (entry := self._entries.get((key, version))) is not None:
+                expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    return False
+            self._store(key, value, timeout=timeout, version=version)
+            return True
+
+    def delete(self, key: str, version: Any = None) -> bool:
+        """
+        Removes entry. Returns True if key existed.
+        """
+        with self._lock:
+            return self._entries.pop((key, version), None) is not None
+
+    def get_many(self, keys: list[str], version: Any = None) -> dict[str, Any]:
+        """
+        Returns values of keys found in cache. Counts hit or miss of every key.
+        """
+        sentinel = object()
+        values = {_k: self.get(_k, default=sentinel, version=version) for _k in keys}
+        return {_k: _v for _k, _v in values.items() if _v is not sentinel}
+
+    def set_many(self, data: dict[str, Any], timeout: int | None = 0, version: Any = None) -> list:
+        """
+        Saves values with the same timeout. Returns keys which failed to save (none).
+        """
+        with self._lock:
+            for key, value in data.items():
+                self._store(key, value, timeout=timeout, version=version)
+        return []
+
+    def delete_many(self, keys: list[str], version: Any = None) -> None:
+        """
+        Removes entries.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop((key, version), None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: str, value: Any, timeout: int | None, version: Any) -> None:
+        """
+        Saves value. Caller must hold the lock.
+        """
+        if timeout == 0:
+            timeout = self.default_timeout
+        if timeout is not None and timeout < 0:
+            self._entries.pop((key, version), None)
+            return
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        self._entries[(key, version)] = (expires_at, value)
+        self._entries.move_to_end((key, version))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class TieredCache:
+    """
+    Two-tier cache. In-process LocalCache in front of shared remote cache (eg. Redis).
+    Implements CacheProtocol.
+    """
+    local: LocalCache
+    remote: CacheProtocol
+    local_timeout: int
+
+    _remote_stats: CacheStats
+    _lock: threading.Lock
+
+    def __init__(self, local: LocalCache, remote: CacheProtocol, local_timeout: int = 60) -> None:
+        self.local = local
+        self.remote = remote
+        # Local entries expire sooner to bound staleness between processes.
+        self.local_timeout = local_timeout
+
+        self._remote_stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        """
+        Returns hit and miss counters of each tier.
+        """
+        return {"local": self.local.stats, "remote": self._remote_stats}
+
+    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Returns value from local tier. Falls back to remote tier and saves its value locally.
+        """
+        if (value := self.local.get(key, version=version)) is not None:
+            return value
+
+        value = self.remote.get(key, version=version)
+        with self._lock:
+            if value is None:
+                self._remote_stats.misses += 1
+            else:
+                self._remote_stats.hits += 1
+        if value is None:
+            return default
+
+        self.local.set(key, value, timeout=self.local_timeout, version=version)
+        return value
+
+    def set(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> None:
+        """
+        Saves value to both tiers. Local entry does not outlive remote entry.
+        """
+        self.remote.set(key, value, timeout=timeout, version=version)
+        local_timeout = self.local_timeout
+        if timeout is not None and timeout != 0:
+            local_timeout = min(timeout, local_timeout)
+        self.local.set(key, value, timeout=local_timeout, version=version)
+
+    def add(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> bool:
+        """
+        Saves value only if key is missing in remote tier. Returns True if value was saved.
+        """
+        return bool(self.remote.add(key, value, timeout=timeout, version=version))  # type: ignore
+
+    def delete(self, key: str, version: Any = None) -> None:
+        """
+        Removes entry from both tiers.
+        """
+        self.local.delete(key, version=version)
+        self.remote.delete(key, version=version)  # type: ignore
+
+    def get_many(self, keys: list[str], version: Any = None) -> dict[str, Any]:
+        """
+        Returns values from local tier. Keys missing locally are read from remote tier
+        in single batch and saved locally.
+        """
+        values = self.local.get_many(keys, version=version)
+        if missing := [_k for _k in keys if _k not in values]:
+            remote_values = batch_get(self.remote, missing, version=version)
+            with self._lock:
+                self._remote_stats.hits += len(remote_values)
+                self._remote_stats.misses += len(missing) - len(remote_values)
+            self.local.set_many(remote_values, timeout=self.local_timeout, version=version)
+            values |= remote_values
+        return values
+
+    def set_many(self, data: dict[str, Any], timeout: int | None = 0, version: Any = None) -> list:
+        """
+        Saves values to both tiers. Local entries do not outlive remote entries.
+        """
+        batch_set(self.remote, data, timeout=timeout, version=version)
+        local_timeout = self.local_timeout
+        if timeout is not None and timeout != 0:
+            local_timeout = min(timeout, local_timeout)
+        return self.local.set_many(data, timeout=local_timeout, version=version)
+
+    def delete_many(self, keys: list[str], version: Any = None) -> None:
+        """
+        Removes entries from both tiers.
+        """
+        self.local.delete_many(keys, version=version)
+        batch_delete(self.remote, keys, version=version)
+
+
+def lock_cache(cache: CacheProtocol) -> LockingCacheProtocol | None:
+    """
+    Returns cache which holds locks or None if it has no atomic add. Locks skip local tier
+    of TieredCache, so waiters see release by other process at once.
+    """
+    if isinstance(cache, TieredCache):
+        cache = cache.remote
+    return cache if hasattr(cache, "add") else None  # type: ignore[return-value]
@@ -0,0 +1,398 @@
+import datetime
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import chain, islice
+from typing import Any
+
+from seeplaces.cache import (
+    CacheEntry,
+    CacheProtocol,
+    ResponseValidators,
+    abatch_get,
+    abatch_set,
+    batch_delete,
+    batch_get,
+    batch_set,
+)
+from seeplaces.excursion import SeePlacesExcursion, _ExcursionDuration, _shared_duration
+from seeplaces.window import ExcursionWindow, FetchedRange
+
+
+SCHEMA_VERSION = 3  # Increase on any change of encoded layout.
+
+_MAGIC = b"SP"
+_HEADER = struct.Struct("<2sBBB")  # Magic, schema version, kind, flags.
+_KIND_EXCURSIONS = 1  # CacheEntry holding ExcursionWindow.
+_KIND_LANGUAGES = 2  # Language name to ID index.
+_FLAG_ZLIB = 1
+
+# Excursions layout: entry times, counts and validators, then fetched ranges (dates and number
+# of excursions) and columns of excursions of all ranges. Strings are stored once in single
+# blob separated by NUL and referenced by index.
+_EXCURSIONS_HEADER = struct.Struct("<dddIIIIIII")
+_NO_STRING = 0xFFFFFFFF  # Index of missing optional string.
+_STRING_SEPARATOR = "\0"
+_INT_COLUMNS = 6  # Name, photo path, description, currency, duration flags, included count.
+_FLOAT_COLUMNS = 3  # Final price, duration hours, duration days.
+
+_ALL_DAY, _MANY_DAYS, _HIDE_DURATION = 1, 2, 4
+"""Bit flags of duration settings."""
+
+
+class _StringTable:
+    """
+    Dictionary encoding of strings shared by all encoded excursions.
+    """
+    strings: list[str]
+
+    _indexes: dict[str, int]
+
+    def __init__(self) -> None:
+        self.strings = []
+        self._indexes = {}
+
+    def index(self, value: str) -> int:
+        """
+        Returns index of string. Adds string to table if needed.
+        """
+        if (index := self._indexes.get(value)) is None:
+            index = self._indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def encode(value: Any, compress: bool = True) -> bytes | None:
+    """
+    Returns cached value encoded as bytes. Returns None for values without compact layout.
+    """
+    if isinstance(value, CacheEntry) and isinstance(value.value, ExcursionWindow):
+        kind, body = _KIND_EXCURSIONS, _encode_excursions_entry(value)
+    elif isinstance(value, dict) and all(isinstance(_v, str) for _v in value.values()):
+        kind, body = _KIND_LANGUAGES, json.dumps(value, separators=(",", ":")).encode()
+    else:
+        return None
+    if body is None:
+        return None
+
+    flags = 0
+    if compress:
+        body = zlib.compress(body)
+        flags |= _FLAG_ZLIB
+    return _HEADER.pack(_MAGIC, SCHEMA_VERSION, kind, flags) + body
+
+
+def decode(data: bytes) -> Any:
+    """
+    Returns value encoded by encode. Returns None if data were written by different
+    schema version or are corrupted, so callers see cache miss.
+    """
+    if not is_encoded(data) or len(data) < _HEADER.size:
+        return None
+    _, version, kind, flags = _HEADER.unpack_from(data)
+    if version != SCHEMA_VERSION:
+        return None
+    body = data[_HEADER.size:]
+    try:
+        if flags & _FLAG_ZLIB:
+            body = zlib.decompress(body)
+        if kind == _KIND_EXCURSIONS:
+            return _decode_excursions_entry(body)
+        if kind == _KIND_LANGUAGES:
+            return json.loads(body)
+    except (zlib.error, struct.error, ValueError, IndexError):
+        return None
+    return None
+
+
+def is_encoded(data: Any) -> bool:
+    """
+    Returns True if data look like value written by encode (of any schema version).
+    """
+    return isinstance(data, bytes) and data[:2] == _MAGIC
+
+
+def _encode_excursions_entry(entry: CacheEntry) -> bytes | None:
+    """
+    Returns body of cache entry holding excursion window.
+    Returns None if some string cannot be stored in string blob.
+    """
+    window: ExcursionWindow = entry.value
+    strings = _StringTable()
+    ranges, ints, floats, included = array("I"), array("I"), array("d"), array("I")
+    for fetched in window.ranges:
+        ranges.extend((
+            fetched.date_from.toordinal(), fetched.date_to.toordinal(), len(fetched.excursions),
+        ))
+    for _e in chain.from_iterable(_r.excursions for _r in window.ranges):
+        duration = _e._duration  # pylint: disable=W0212
+        ints.extend((
+            strings.index(_e.name),
+            strings.index(_e.photo_path),
+            strings.index(_e.description),
+            strings.index(_e.currency),
+            (
+                _ALL_DAY * duration.is_all_day
+                | _MANY_DAYS * duration.is_many_days
+                | _HIDE_DURATION * duration.hide_duration
+            ),
+            len(_e.included_in_price),
+        ))
+        included.extend(strings.index(_i) for _i in _e.included_in_price)
+        floats.extend((_e.final_price, duration.duration_hours, duration.duration_days))
+
+    validators = entry.validators or ResponseValidators()
+    etag, last_modified, content_hash = (
+        _NO_STRING if _v is None else strings.index(_v)
+        for _v in (validators.etag, validators.last_modified, validators.content_hash)
+    )
+
+    if any(_STRING_SEPARATOR in _s for _s in strings.strings):
+        return None
+    blob = _STRING_SEPARATOR.join(strings.strings).encode()
+    if sys.byteorder == "big":
+        for column in (ranges, ints, included, floats):
+            column.byteswap()
+
+    header = _EXCURSIONS_HEADER.pack(
+        entry.stale_at,
+        entry.expires_at,
+        entry.fetch_duration,
+        len(window.ranges),
+        len(ints) // _INT_COLUMNS,
+        len(included),
+        len(blob),
+        etag,
+        last_modified,
+        content_hash,
+    )
+    return b"".join((
+        header, ranges.tobytes(), ints.tobytes(), included.tobytes(), floats.tobytes(), blob,
+    ))
+
+
+def _decode_excursions_entry(body: bytes) -> CacheEntry:
+    """
+    Returns cache entry holding excursion window from body.
+    """
+    (
+        stale_at, expires_at, fetch_duration, range_count, excursion_count, included_count,
+        blob_size, etag, last_modified, content_hash,
+    ) = _EXCURSIONS_HEADER.unpack_from(body)
+
+    offset = _EXCURSIONS_HEADER.size
+    columns = []
+    for typecode, count in (
+        ("I", range_count * 3),
+        ("I", excursion_count * _INT_COLUMNS),
+        ("I", included_count),
+        ("d", excursion_count * _FLOAT_COLUMNS),
+    ):
+        column = array(typecode)
+        size = count * column.itemsize
+        column.frombytes(body[offset:offset + size])
+        if sys.byteorder == "big":
+            column.byteswap()
+        columns.append(column)
+        offset += size
+    ranges, ints, included, floats = columns[0], columns[1], columns[2], columns[3]
+    if len(body) != offset + blob_size:
+        raise ValueError("Unexpected size of encoded excursions.")
+    strings = body[offset:].decode().split(_STRING_SEPARATOR)
+
+    restore = SeePlacesExcursion._restore  # pylint: disable=W0212
+
+    # Repeated values are shared by decoded excursions.
+    currencies: dict[int, str] = {}
+    included_tuples: dict[tuple[int, ...], tuple[str, ...]] = {}
+    durations: dict[tuple[int, float, float], _ExcursionDuration] = {}
+
+    excursions = []
+    included_indexes = iter(included)
+    for (name, photo_path, description, currency, flags, included_size), floats_row in zip(
+        zip(*[iter(ints)] * _INT_COLUMNS),
+        zip(*[iter(floats)] * _FLOAT_COLUMNS),
+    ):
+        final_price, duration_hours, duration_days = floats_row
+        included_key = tuple(islice(included_indexes, included_size))
+
+        if (currency_value := currencies.get(currency)) is None:
+            currency_value = currencies[currency] = sys.intern(strings[currency])
+        if (included_value := included_tuples.get(included_key)) is None:
+            included_value = included_tuples[included_key] = tuple(
+                sys.intern(strings[_i]) for _i in included_key
+            )
+        duration_key = (flags, duration_hours, duration_days)
+        if (duration := durations.get(duration_key)) is None:
+            duration = durations[duration_key] = _shared_duration(
+                is_all_day=bool(flags & _ALL_DAY),
+                is_many_days=bool(flags & _MANY_DAYS),
+                duration_hours=duration_hours,
+                duration_days=duration_days,
+                hide_duration=bool(flags & _HIDE_DURATION),
+            )
+
+        excursions.append(restore(
+            strings[name],
+            final_price,
+            strings[photo_path],
+            strings[description],
+            currency_value,
+            included_value,
+            duration,
+        ))
+
+    if sum(ranges[2::3]) != len(excursions):
+        raise ValueError("Unexpected number of encoded excursions.")
+    fetched_ranges, offset = [], 0
+    for date_from, date_to, count in zip(*[iter(ranges)] * 3):
+        fetched_ranges.append(FetchedRange(
+            datetime.date.fromordinal(date_from),
+            datetime.date.fromordinal(date_to),
+            excursions[offset:offset + count],
+        ))
+        offset += count
+    window = ExcursionWindow(ranges=fetched_ranges)
+    validators = None
+    if (etag, last_modified, content_hash) != (_NO_STRING,) * 3:
+        validators = ResponseValidators(*(
+            None if _i == _NO_STRING else strings[_i]
+            for _i in (etag, last_modified, content_hash)
+        ))
+    return CacheEntry(
+        value=window,
+        stale_at=stale_at,
+        expires_at=expires_at,
+        fetch_duration=fetch_duration,
+        validators=validators,
+    )
+
+
+class CodecCache:
+    """
+    Cache wrapper saving excursions and language IDs in compact versioned format instead
+    of pickled objects. Other values are passed to wrapped cache unchanged.
+    Values written by other schema version are reported as cache miss.
+    """
+    cache: CacheProtocol
+    compress: bool
+
+    def __init__(self, cache: CacheProtocol, compress: bool = True) -> None:
+        self.cache = cache
+        self.compress = compress
+
+    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Returns decoded value or default if key is missing or was written by other schema.
+        """
+        return self._decode(self.cache.get(key, version=version), default)
+
+    def set(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> None:
+        """
+        Saves encoded value.
+        """
+        self.cache.set(key, self._encode(value), timeout=timeout, version=version)  # type: ignore
+
+    def add(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> bool:
+        """
+        Saves encoded value only if key is missing. Returns True if value was saved.
+        """
+        return bool(self.cache.add(  # type: ignore[attr-defined]
+            key, self._encode(value), timeout=timeout, version=version,
+        ))
+
+    def delete(self, key: str, version: Any = None) -> Any:
+        """
+        Removes entry.
+        """
+        return self.cache.delete(key, version=version)  # type: ignore[attr-defined]
+
+    def get_many(self, keys: list[str], version: Any = None) -> dict[str, Any]:
+        """
+        Returns decoded values of keys found in cache. Other schema versions are left out.
+        """
+        return self._decode_many(batch_get(self.cache, keys, version=version))
+
+    def set_many(self, data: dict[str, Any], timeout: int | None = 0, version: Any = None) -> list:
+        """
+        Saves encoded values with the same timeout.
+        """
+        encoded = {_k: self._encode(_v) for _k, _v in data.items()}
+        batch_set(self.cache, encoded, timeout=timeout, version=version)
+        return []
+
+    def delete_many(self, keys: list[str], version: Any = None) -> None:
+        """
+        Removes entries.
+        """
+        batch_delete(self.cache, keys, version=version)
+
+    async def aget(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Async variant of get. Requires cache with async API.
+        """
+        return self._decode(await self.cache.aget(key, version=version), default)  # type: ignore
+
+    async def aset(
+            self,
+            key: str,
+            value: Any,
+            timeout: int | None = 0,
+            version: Any = None,
+    ) -> None:
+        """
+        Async variant of set. Requires cache with async API.
+        """
+        await self.cache.aset(  # type: ignore[attr-defined]
+            key, self._encode(value), timeout=timeout, version=version,
+        )
+
+    async def aget_many(self, keys: list[str], version: Any = None) -> dict[str, Any]:
+        """
+        Async variant of get_many. Requires cache with async API.
+        """
+        data = await abatch_get(self.cache, keys, version=version)  # type: ignore[arg-type]
+        return self._decode_many(data)
+
+    async def aset_many(
+            self,
+            data: dict[str, Any],
+            timeout: int | None = 0,
+            version: Any = None,
+    ) -> list:
+        """
+        Async variant of set_many. Requires cache with async API.
+        """
+        encoded = {_k: self._encode(_v) for _k, _v in data.items()}
+        await abatch_set(self.cache, encoded, timeout=timeout, version=version)  # type: ignore
+        return []
+
+    def _encode(self, value: Any) -> Any:
+        """
+        Returns encoded value or value itself if it has no compact layout.
+        """
+        encoded = encode(value, compress=self.compress)
+        return value if encoded is None else encoded
+
+    def _decode_many(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Returns decoded values. Values of other schema versions are left out.
+        """
+        sentinel = object()
+        values = {_k: self._decode(_v, sentinel) for _k, _v in data.items()}
+        return {_k: _v for _k, _v in values.items() if _v is not sentinel}
+
+    @staticmethod
+    def _decode(data: Any, default: Any) -> Any:
+        """
+        Returns decoded value. Returns default for missing data and other schema versions.
+        """
+        if data is None:
+            return default
+        if not is_encoded(data):
+            return data
+        if (value := decode(data)) is None:
+            return default
+        return value
@@ -8,3 +8,15 @@ class ApiConnectionError(SeePlacesError):
     """
     Service connection error.
     """
+
+
+class DeadlineExceededError(ApiConnectionError):
+    """
+    Api call did not finish within given deadline.
+    """
+
+
+class ResponseParseError(SeePlacesError):
+    """
+    Api response is not valid JSON object.
+    """
@@ -1,17 +1,41 @@
-from dataclasses import dataclass
+import functools
+import sys
 
 
-@dataclass
 class _ExcursionDuration:
     """
-    Excursion duration settings.
+    Excursion duration settings. Instances are shared by excursions and must not be modified.
     """
+    __slots__ = ("is_all_day", "is_many_days", "duration_hours", "duration_days", "hide_duration")
+
     is_all_day: bool
     is_many_days: bool
     duration_hours: float
     duration_days: float
     hide_duration: bool
 
+    def __init__(
+        self,
+        is_all_day: bool,
+        is_many_days: bool,
+        duration_hours: float,
+        duration_days: float,
+        hide_duration: bool,
+    ) -> None:
+        self.is_all_day = is_all_day
+        self.is_many_days = is_many_days
+        self.duration_hours = duration_hours
+        self.duration_days = duration_days
+        self.hide_duration = hide_duration
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores duration from pickle. Accepts dict state pickled before slots were used.
+        """
+        _, slots = state if isinstance(state, tuple) else (None, state)
+        for name, value in slots.items():
+            setattr(self, name, value)
+
     def readable(self) -> str:
         """
         Returns duration in readable format.
@@ -32,17 +56,32 @@ class _ExcursionDuration:
         return f"Počet hodín: {self.duration_hours:.2f}"
 
 
+# Only few distinct durations exist. Excursions share single instance of each.
+_shared_duration = functools.lru_cache(maxsize=1024)(_ExcursionDuration)
+
+
 class SeePlacesExcursion:
     """
     Excursion class returned from SeePlaces Excursion api call.
+    Uses slots and shares repeated values, as thousands of excursions are kept in caches.
     """
+    __slots__ = (
+        "name",
+        "final_price",
+        "photo_path",
+        "description",
+        "currency",
+        "included_in_price",
+        "_duration",
+    )
+
     # Do not use defaults. All parameters should be present in response.
     name: str
     final_price: float
     photo_path: str
     description: str
     currency: str
-    included_in_price: list[str]
+    included_in_price: tuple[str, ...]
 
     _duration: _ExcursionDuration
 
@@ -69,9 +108,10 @@ class SeePlacesExcursion:
         self.final_price = FinalPrice
         self.photo_path = PhotoPath
         self.description = Description
-        self.currency = Currency
-        self.included_in_price = IncludedInPrice
-        self._duration = _ExcursionDuration(
+        # Currencies and included items repeat in most excursions.
+        self.currency = sys.intern(Currency)
+        self.included_in_price = tuple(sys.intern(_i) for _i in IncludedInPrice)
+        self._duration = _shared_duration(
             is_all_day=IsAllDay,
             is_many_days=IsManyDays,
             duration_hours=DurationHours,
@@ -79,6 +119,56 @@ class SeePlacesExcursion:
             hide_duration=HideDuration,
         )
 
+    @classmethod
+    def _restore(
+            cls,
+            name: str,
+            final_price: float,
+            photo_path: str,
+            description: str,
+            currency: str,
+            included_in_price: tuple[str, ...],
+            duration: _ExcursionDuration,
+    ) -> "SeePlacesExcursion":
+        """
+        Returns excursion from already normalized values, eg. decoded from cache.
+        Skips mapping of api response.
+        """
+        excursion = cls.__new__(cls)
+        excursion.name = name
+        excursion.final_price = final_price
+        excursion.photo_path = photo_path
+        excursion.description = description
+        excursion.currency = currency
+        excursion.included_in_price = included_in_price
+        excursion._duration = duration
+        return excursion
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores excursion from pickle. Accepts dict state pickled before slots were used.
+        """
+        if isinstance(state, tuple):
+            for name, value in state[1].items():
+                setattr(self, name, value)
+            return
+
+        # Pickled before slots. Values are compacted as in __init__.
+        duration = state["_duration"]
+        self.name = state["name"]
+        self.final_price = state["final_price"]
+        self.photo_path = state["photo_path"]
+        self.description = state["description"]
+        self.currency = sys.intern(state["currency"])
+        self.included_in_price = tuple(sys.intern(_i) for _i in state["included_in_price"])
+        self._duration = _shared_duration(
+            is_all_day=duration.is_all_day,
+            is_many_days=duration.is_many_days,
+            duration_hours=duration.duration_hours,
+            duration_days=duration.duration_days,
+            hide_duration=duration.hide_duration,
+        )
+
     def get_duration_display(self) -> str:
         """
         Returns duration in readable format.
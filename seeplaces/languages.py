@@ -0,0 +1,59 @@
+import threading
+import time
+
+
+class LanguageCatalog:
+    """
+    Index of all spoken languages (name to ID) held in memory. Thread safe.
+    Catalog expires after ttl seconds and has to be loaded again.
+    """
+    ttl: float
+
+    _index: dict[str, str] | None
+    _loaded_at: float
+    _lock: threading.Lock
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+        self._index = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def index(self) -> dict[str, str] | None:
+        """
+        Returns name to ID index. Returns None if catalog was not loaded yet or expired.
+        """
+        with self._lock:
+            if self._index is None or time.monotonic() - self._loaded_at >= self.ttl:
+                return None
+            return self._index
+
+    def update(self, index: dict[str, str]) -> None:
+        """
+        Replaces catalog content. Returned indexes are never modified.
+        """
+        with self._lock:
+            self._index = dict(index)
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def resolve(index: dict[str, str], spoken_languages: list[str]) -> set[str]:
+        """
+        Returns IDs of given languages. Unknown languages are ignored.
+        """
+        return {index[_n] for _n in spoken_languages if _n in index}
+
+
+_catalogs: dict[tuple[str, str], LanguageCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def shared_catalog(base_url: str, api_version: str, ttl: float) -> LanguageCatalog:
+    """
+    Returns process-wide catalog of given api. Services using the same api share it.
+    """
+    with _catalogs_lock:
+        if (catalog := _catalogs.get((base_url, api_version))) is None:
+            catalog = _catalogs[(base_url, api_version)] = LanguageCatalog(ttl=ttl)
+        return catalog
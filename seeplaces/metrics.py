@@ -0,0 +1,202 @@
+import bisect
+import math
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Protocol
+
+
+# Metrics emitted by services.
+CACHE_SECONDS = "seeplaces_cache_seconds"  # Labels: operation (get, set, get_many, set_many).
+LANGUAGES_SECONDS = "seeplaces_languages_seconds"  # Resolution of language IDs.
+HTTP_SECONDS = "seeplaces_http_seconds"  # Labels: endpoint. Until body is read or streaming starts.
+RESPONSE_BYTES = "seeplaces_response_bytes"  # Labels: endpoint. Decompressed body size.
+WIRE_BYTES = "seeplaces_wire_bytes"  # Labels: endpoint. Body size received, before decompression.
+DECODE_SECONDS = "seeplaces_decode_seconds"  # Labels: endpoint. JSON decode.
+BUILD_SECONDS = "seeplaces_build_seconds"  # Labels: endpoint. Construction of result objects.
+CACHE_LOOKUPS = "seeplaces_cache_lookups_total"  # Labels: family (exc, lang), result (hit, miss).
+API_CALLS = "seeplaces_api_calls_total"  # Labels: endpoint, result (ok, error).
+
+DURATION_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+"""Upper bounds of duration histogram buckets in seconds."""
+
+SIZE_BUCKETS = tuple(float(4 ** _i * 256) for _i in range(10))
+"""Upper bounds of size histogram buckets in bytes (256 B to 64 MiB)."""
+
+
+class Instrumentation(Protocol):
+    """
+    Receiver of service metrics. Must be safe to call from multiple threads.
+    """
+
+    def observe(self, name: str, value: float, labels: Mapping[str, str]) -> None:
+        """
+        Records single measurement, eg. duration in seconds or size in bytes.
+        """
+
+    def increment(self, name: str, labels: Mapping[str, str], value: float = 1.0) -> None:
+        """
+        Increases counter.
+        """
+
+
+class NoopInstrumentation:
+    """
+    Default instrumentation. Discards all metrics.
+    """
+
+    def observe(self, name: str, value: float, labels: Mapping[str, str]) -> None:
+        pass
+
+    def increment(self, name: str, labels: Mapping[str, str], value: float = 1.0) -> None:
+        pass
+
+
+NOOP = NoopInstrumentation()
+
+
+_LabelsKey = tuple[tuple[str, str], ...]
+"""Type alias for sorted label pairs identifying single series."""
+
+
+@dataclass
+class Histogram:
+    """
+    Measurements counted in buckets. Bucket counts are not cumulative.
+    """
+    bounds: tuple[float, ...]
+    bucket_counts: list[int] = field(default_factory=list)  # Last bucket is +Inf.
+    count: int = 0
+    sum: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.bucket_counts:
+            self.bucket_counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """
+        Counts single measurement.
+        """
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns upper bound of bucket holding given quantile (0 to 1). Returns 0 if empty.
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = math.ceil(q * self.count), 0
+        for bound, count in zip((*self.bounds, math.inf), self.bucket_counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class InMemoryCollector:
+    """
+    Instrumentation keeping histograms and counters in memory.
+    Metrics can be inspected in tests or exported in Prometheus text format.
+    """
+    duration_buckets: tuple[float, ...]
+    size_buckets: tuple[float, ...]
+
+    _histograms: dict[str, dict[_LabelsKey, Histogram]]
+    _counters: dict[str, dict[_LabelsKey, float]]
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            duration_buckets: tuple[float, ...] = DURATION_BUCKETS,
+            size_buckets: tuple[float, ...] = SIZE_BUCKETS,  # Used by metrics ending with _bytes.
+    ) -> None:
+        self.duration_buckets = duration_buckets
+        self.size_buckets = size_buckets
+
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Mapping[str, str]) -> None:
+        """
+        Records measurement in histogram of given name and labels.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if (histogram := series.get(key)) is None:
+                bounds = self.size_buckets if name.endswith("_bytes") else self.duration_buckets
+                histogram = series[key] = Histogram(bounds=bounds)
+            histogram.observe(value)
+
+    def increment(self, name: str, labels: Mapping[str, str], value: float = 1.0) -> None:
+        """
+        Increases counter of given name and labels.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def histogram(self, name: str, **labels: str) -> Histogram | None:
+        """
+        Returns histogram of given name and labels. None if nothing was observed.
+        """
+        with self._lock:
+            return self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def counter(self, name: str, **labels: str) -> float:
+        """
+        Returns sum of counter series having given labels. Without labels sums all series.
+        """
+        wanted = set(labels.items())
+        with self._lock:
+            series = self._counters.get(name, {})
+            return sum(_v for _k, _v in series.items() if wanted.issubset(_k))
+
+    def reset(self) -> None:
+        """
+        Removes all metrics.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self) -> str:
+        """
+        Returns all metrics in Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.bounds, math.inf), histogram.bucket_counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, le=le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+            for name, counters in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(counters.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: _LabelsKey, **extra: str) -> str:
+    """
+    Returns labels in Prometheus format, eg. {endpoint="X",le="0.1"}. Empty without labels.
+    """
+    pairs = (*key, *extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (_k, _v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for _k, _v in pairs
+    )
+    return "{" + ",".join(f'{_k}="{_v}"' for _k, _v in escaped) + "}"
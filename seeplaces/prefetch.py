@@ -0,0 +1,246 @@
+import calendar
+import datetime
+import logging
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from concurrent import futures
+from dataclasses import dataclass, field
+
+import requests
+
+from seeplaces.exceptions import SeePlacesError
+from seeplaces.service import SeePlacesService, normalize_iata_code
+from seeplaces.window import month_windows
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_TARGETS = 10_000  # Default limit of targets counted by AccessTracker.
+
+
+def month_span(month: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """
+    Returns first and last day of month of given date.
+    """
+    first = month.replace(day=1)
+    return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+
+@dataclass(frozen=True)
+class PrefetchTarget:
+    """
+    Excursions of single airport, calendar month and languages kept warm in cache.
+    """
+    iata_code: str
+    month: datetime.date  # First day of month.
+    spoken_languages: tuple[str, ...]
+
+    @classmethod
+    def create(
+            cls,
+            iata_code: str,
+            month: datetime.date,
+            spoken_languages: Iterable[str],
+    ) -> "PrefetchTarget":
+        """
+        Returns target normalized, so the same lookups map to the same target.
+        """
+        return cls(
+            iata_code=normalize_iata_code(iata_code),
+            month=month.replace(day=1),
+            spoken_languages=tuple(sorted(set(spoken_languages))),
+        )
+
+
+@dataclass
+class PrefetchResult:
+    """
+    Outcome of single prefetch run.
+    """
+    prefetched: list[PrefetchTarget] = field(default_factory=list)
+    skipped: list[PrefetchTarget] = field(default_factory=list)  # Fresh in cache.
+    failed: dict[PrefetchTarget, Exception] = field(default_factory=dict)
+
+
+class AccessTracker:
+    """
+    Counts looked up targets, so the most requested ones can be prefetched.
+    Targets of past months are dropped. When more than max_targets are counted, only half
+    of them with the highest counts are kept. Safe to share by threads.
+    """
+    max_targets: int
+
+    _counts: Counter[PrefetchTarget]
+    _lock: threading.Lock
+
+    def __init__(self, max_targets: int = MAX_TRACKED_TARGETS) -> None:
+        self.max_targets = max_targets
+
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: Iterable[str],
+    ) -> None:
+        """
+        Counts lookup of every month of given date range.
+        """
+        spoken_languages = tuple(spoken_languages)
+        targets = [
+            PrefetchTarget.create(iata_code, _f, spoken_languages)
+            for _f, _ in month_windows(date_from, date_to)
+        ]
+        with self._lock:
+            self._counts.update(targets)
+            if len(self._counts) > self.max_targets:
+                self._prune()
+
+    def hot(self, limit: int, min_count: int = 1) -> list[PrefetchTarget]:
+        """
+        Returns most looked up targets of current and future months.
+        """
+        with self._lock:
+            self._prune()
+            counts = self._counts.most_common()
+        return [_t for _t, _c in counts if _c >= min_count][:limit]
+
+    def _prune(self) -> None:
+        """
+        Drops targets of past months. Keeps half of max_targets with the highest counts
+        if too many targets are counted. Must be called with lock held.
+        """
+        current_month = datetime.date.today().replace(day=1)
+        counts = Counter({_t: _c for _t, _c in self._counts.items() if _t.month >= current_month})
+        if len(counts) > self.max_targets:
+            counts = Counter(dict(counts.most_common(self.max_targets // 2)))
+        self._counts = counts
+
+
+class PrefetchScheduler:
+    """
+    Refreshes excursions of configured and most looked up targets before they become stale,
+    so users do not wait for api calls. Prefetch api calls have background priority.
+    Runs once on demand or periodically in background thread.
+    """
+    service: SeePlacesService
+    targets: set[PrefetchTarget]
+    tracker: AccessTracker | None
+    hot_limit: int
+    lead_time: float
+    max_workers: int
+
+    _thread: threading.Thread | None
+    _stopped: threading.Event
+
+    def __init__(
+            self,
+            service: SeePlacesService,
+            targets: Iterable[PrefetchTarget] = (),
+            *,  # Require keyword arguments.
+            tracker: AccessTracker | None = None,  # Source of most looked up targets.
+            hot_limit: int = 100,  # Maximum number of targets taken from tracker.
+            lead_time: float = 300.0,  # Seconds before soft expiry when entry is refreshed.
+            max_workers: int = 4,  # Maximum number of concurrent prefetches.
+    ) -> None:
+        self.service = service
+        self.targets = set(targets)
+        self.tracker = tracker
+        self.hot_limit = hot_limit
+        self.lead_time = lead_time
+        self.max_workers = max_workers
+
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def due_targets(self) -> list[PrefetchTarget]:
+        """
+        Returns configured targets followed by most looked up ones. Past months are skipped.
+        """
+        current_month = datetime.date.today().replace(day=1)
+        targets = dict.fromkeys(sorted(
+            (_t for _t in self.targets if _t.month >= current_month),
+            key=lambda _t: (_t.month, _t.iata_code, _t.spoken_languages),
+        ))
+        if self.tracker is not None:
+            targets.update(dict.fromkeys(self.tracker.hot(self.hot_limit)))
+        return list(targets)
+
+    def run_once(self) -> PrefetchResult:
+        """
+        Prefetches all due targets which are missing in cache or become stale soon.
+        Errors of single target are captured in result.
+        """
+        result = PrefetchResult()
+        with futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="seeplaces-prefetch",
+        ) as executor:
+            pending = {executor.submit(self._prefetch, _t): _t for _t in self.due_targets()}
+            for future in futures.as_completed(pending):
+                target = pending[future]
+                try:
+                    prefetched = future.result()
+                except (SeePlacesError, requests.RequestException) as exc:
+                    logger.warning("Prefetch of %s failed.", target, exc_info=True)
+                    result.failed[target] = exc
+                    continue
+                (result.prefetched if prefetched else result.skipped).append(target)
+        return result
+
+    def start(self, interval: float = 60.0) -> None:
+        """
+        Runs prefetch every interval seconds in background thread until stopped.
+        Interval should be shorter than lead time.
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(interval,),
+            name="seeplaces-prefetch-scheduler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops background thread. Waits for running prefetch.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _run(self, interval: float) -> None:
+        """
+        Body of background thread.
+        """
+        while not self._stopped.is_set():
+            result = self.run_once()
+            logger.info(
+                "Prefetched %d targets, %d fresh, %d failed.",
+                len(result.prefetched), len(result.skipped), len(result.failed),
+            )
+            self._stopped.wait(interval)
+
+    def _prefetch(self, target: PrefetchTarget) -> bool:
+        """
+        Prefetches single target. Returns False if it was fresh in cache.
+        """
+        date_from, date_to = month_span(target.month)
+        return self.service.prefetch_excursions(
+            iata_code=target.iata_code,
+            date_from=date_from,
+            date_to=date_to,
+            spoken_languages=list(target.spoken_languages),
+            lead_time=self.lead_time,
+        )
@@ -0,0 +1,187 @@
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from seeplaces.exceptions import DeadlineExceededError
+from seeplaces.resilience import remaining_time
+
+
+INTERACTIVE = "interactive"
+"""Priority of calls waited for by users. Served first."""
+
+BACKGROUND = "background"
+"""Priority of prefetch and refresh calls. Served only if no interactive call waits."""
+
+_PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "seeplaces_priority", default=INTERACTIVE,
+)
+"""Priority of api calls made by current thread or task."""
+
+
+@contextlib.contextmanager
+def priority_scope(priority: str) -> Iterator[None]:
+    """
+    Runs api calls made within the block with given priority.
+    """
+    if priority not in _PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    """
+    Returns priority of api calls made by current thread or task.
+    """
+    return _priority.get()
+
+
+@dataclass
+class RateLimitStats:
+    """
+    Waits for rate limiter of single priority.
+    """
+    acquired: int = 0
+    wait_time: float = 0.0  # Seconds waited by all acquired calls.
+    max_wait: float = 0.0  # Seconds waited by the slowest call.
+    queued: int = 0  # Calls waiting now.
+
+    @property
+    def average_wait(self) -> float:
+        """
+        Returns average seconds waited by acquired call.
+        """
+        return self.wait_time / self.acquired if self.acquired else 0.0
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all services calling the same api quota. Allows rate calls
+    per second with bursts up to burst calls. Waiting calls are served in order,
+    interactive calls before background ones. Safe to share by threads and event loops.
+    """
+    rate: float
+    burst: float
+
+    _tokens: float
+    _updated: float
+    _queues: dict[str, deque[object]]
+    _stats: dict[str, RateLimitStats]
+    _condition: threading.Condition
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1.")
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._queues = {_p: deque() for _p in _PRIORITIES}
+        self._stats = {_p: RateLimitStats() for _p in _PRIORITIES}
+        self._condition = threading.Condition()
+
+    @property
+    def stats(self) -> dict[str, RateLimitStats]:
+        """
+        Returns copy of wait statistics by priority, including current queue depth.
+        """
+        with self._condition:
+            return {
+                _p: RateLimitStats(
+                    acquired=_s.acquired,
+                    wait_time=_s.wait_time,
+                    max_wait=_s.max_wait,
+                    queued=len(self._queues[_p]),
+                )
+                for _p, _s in self._stats.items()
+            }
+
+    def acquire(self, priority: str | None = None) -> float:
+        """
+        Waits for permission to make single api call. Returns seconds waited.
+        Uses priority of current scope by default. Raises DeadlineExceededError
+        if permission cannot be given within deadline of current scope.
+        """
+        priority = priority or current_priority()
+        start = time.monotonic()
+        ticket = object()
+        with self._condition:
+            self._queues[priority].append(ticket)
+            try:
+                while wait := self._take(ticket, priority):
+                    self._condition.wait(self._bounded_wait(wait))
+                return self._record(priority, start)
+            finally:
+                self._queues[priority].remove(ticket)
+                self._condition.notify_all()
+
+    async def aacquire(self, priority: str | None = None) -> float:
+        """
+        Async variant of acquire. Does not block event loop.
+        """
+        priority = priority or current_priority()
+        start = time.monotonic()
+        ticket = object()
+        with self._condition:
+            self._queues[priority].append(ticket)
+        try:
+            while True:
+                with self._condition:
+                    if not (wait := self._take(ticket, priority)):
+                        return self._record(priority, start)
+                await asyncio.sleep(self._bounded_wait(wait))
+        finally:
+            with self._condition:
+                self._queues[priority].remove(ticket)
+                self._condition.notify_all()
+
+    def _take(self, ticket: object, priority: str) -> float:
+        """
+        Takes token for ticket if it is next in line. Must be called with lock held.
+        Returns zero if token was taken, otherwise seconds until next token.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        queue = self._queues[priority]
+        is_next = queue[0] is ticket and (priority == INTERACTIVE or not self._queues[INTERACTIVE])
+        if is_next and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        # Calls which are not next are woken up when the call before them finishes.
+        return max((1 - self._tokens) / self.rate, 1e-3)
+
+    @staticmethod
+    def _bounded_wait(wait: float) -> float:
+        """
+        Returns wait shortened to fit deadline of current scope. Raises DeadlineExceededError
+        if the deadline passed.
+        """
+        if (remaining := remaining_time()) is None:
+            return wait
+        if remaining <= 0:
+            raise DeadlineExceededError("Waiting for rate limit exceeded deadline.")
+        return min(wait, remaining)
+
+    def _record(self, priority: str, start: float) -> float:
+        """
+        Counts acquired call. Must be called with lock held. Returns seconds waited.
+        """
+        waited = time.monotonic() - start
+        stats = self._stats[priority]
+        stats.acquired += 1
+        stats.wait_time += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        return waited
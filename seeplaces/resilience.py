@@ -0,0 +1,144 @@
+import contextlib
+import contextvars
+import random
+import threading
+import time
+from collections.abc import Iterator
+
+from seeplaces.exceptions import ApiConnectionError
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+"""Response statuses of transient upstream failures. Api calls failing with them are retried."""
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "seeplaces_deadline", default=None,
+)
+"""Monotonic time by which api calls of current thread or task must finish."""
+
+
+class CircuitOpenError(ApiConnectionError):
+    """
+    Api call was skipped, because upstream failed repeatedly.
+    """
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """
+    Limits api calls made within the block to given number of seconds.
+    Nested scopes cannot extend deadline of outer scope. Does nothing if seconds is None.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    if (outer := _deadline.get()) is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextlib.contextmanager
+def no_deadline() -> Iterator[None]:
+    """
+    Runs block without deadline of outer scope, eg. background refresh of deadline-bound call.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """
+    Returns seconds left until deadline of current scope. Returns None without deadline.
+    """
+    if (deadline := _deadline.get()) is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def backoff_delay(retry: int, base: float, cap: float) -> float:
+    """
+    Returns delay before given retry (counted from zero). Exponential backoff with full jitter,
+    so clients failing at the same time do not retry at the same time.
+    """
+    return random.uniform(0.0, min(cap, base * 2 ** retry))
+
+
+class CircuitBreaker:
+    """
+    Stops api calls after consecutive failures. Calls are allowed again after reset timeout,
+    starting with single probe call. Probe success closes the circuit, failure opens it again.
+    Probe without recorded outcome is replaced after another reset timeout.
+    Disabled if failure threshold is zero. Safe to share by threads.
+    """
+    failure_threshold: int
+    reset_timeout: float
+
+    _failures: int
+    _opened_at: float | None
+    _probing: bool
+    _lock: threading.Lock
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Returns "closed", "open" or "half_open".
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """
+        Returns True if api call may be made. Reserves probe call of half open circuit.
+        """
+        if not self.failure_threshold:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if (now := time.monotonic()) - self._opened_at < self.reset_timeout:
+                return False
+            self._opened_at = now
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Closes circuit.
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """
+        Counts failed call. Opens circuit at failure threshold or if probe call failed.
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
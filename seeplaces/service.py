@@ -1,76 +1,144 @@
 import datetime
-from dataclasses import dataclass
-from typing import Any, Protocol
-from urllib.parse import urljoin
+import functools
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent import futures
+from typing import Any, TypeVar
 
 import requests
-
-from seeplaces.exceptions import ApiConnectionError
+from requests.adapters import HTTPAdapter
+
+from seeplaces.base import (  # pylint: disable=W0611
+    ACCEPT_ENCODING,
+    COMBINED_CALLS_PAUSE,
+    EMPTY_EXCURSIONS_CACHE_TTL,
+    EXCURSIONS_CACHE_LAYOUT,
+    EXCURSIONS_CACHE_TTL,
+    LANGUAGES_CACHE_TTL,
+    MAX_CACHE_KEY_LENGTH,
+    STREAM_CHUNK_SIZE,
+    ExcursionLookup,
+    ExcursionLookupResult,
+    SeePlacesOptions,
+    _AccessRecorder,
+    _EXCURSIONS_ENDPOINT,
+    _LANGUAGES_ENDPOINT,
+    _mapping,
+    _SeePlacesServiceBase,
+    _SpokenLanguage,
+    normalize_iata_code,
+)
+from seeplaces.cache import (  # pylint: disable=W0611
+    AsyncCacheProtocol,
+    CacheEntry,
+    CacheProtocol,
+    CacheStats,
+    LocalCache,
+    ResponseValidators,
+    RevalidationStats,
+    TieredCache,
+    batch_get,
+    batch_set,
+    lock_cache,
+)
+from seeplaces.exceptions import ApiConnectionError, DeadlineExceededError, SeePlacesError
 from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.languages import LanguageCatalog
+from seeplaces.metrics import CACHE_SECONDS, HTTP_SECONDS, LANGUAGES_SECONDS, Instrumentation
+from seeplaces.ratelimit import BACKGROUND, RateLimiter, priority_scope
+from seeplaces.resilience import deadline_scope
+from seeplaces.singleflight import CacheLock, SingleFlight
+from seeplaces.stream import JsonArrayStream
+from seeplaces.window import ExcursionWindow, excursion_key, merge_excursions, month_windows
 
 
-LANGUAGES_CACHE_TTL = 60 * 60 * 24  # 24 hours.
-EXCURSIONS_CACHE_TTL = 60 * 60  # 1 hour.
-
-
-_mapping = dict[str, Any]
-"""Type alias for mappings, eg. query and headers."""
-
-
-class CacheProtocol(Protocol):
-    """
-    Generic cache protocol designed to be used with Django cache API.
-    See: https://docs.djangoproject.com/en/3.2/topics/cache/#the-low-level-cache-api.
-    """
-    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any: ...
-    def set(self, key: str, value: Any, timeout: int = 0, version: Any = None) -> None: ...
-    """Generic integer placeholder used as DEFAULT_TIMEOUT."""
-
-
-@dataclass
-class SeePlacesOptions:
-    """
-    Internal options class for SeePlaces service.
-    """
-    base_url: str
-    api_version: str
-    scope_id: str
-
+logger = logging.getLogger(__name__)
 
-class _SpokenLanguage:
-    """
-    Internal class for handling spoken languages.
-    """
-    id: str
-    name: str
 
-    # Require keyword arguments. Discard unused input.
-    def __init__(self, *, Id: str, Name: str, **_) -> None:  # pylint: disable=C0103
-        self.id = Id
-        self.name = Name
+_T = TypeVar("_T")
 
 
-class SeePlacesService:
+class SeePlacesService(_SeePlacesServiceBase):
     """
     Connection service for SeePlaces API.
     """
-    _options: SeePlacesOptions
     _cache: CacheProtocol | None
-    _cache_prefix: str
+
+    _adapter: HTTPAdapter
+    _local: threading.local
+    _single_flight: SingleFlight
+
+    _refresh_executor: futures.ThreadPoolExecutor | None
+    _refreshing: set[str]
+    _refresh_lock: threading.Lock
 
     def __init__(
             self,
             options: SeePlacesOptions,
             cache: CacheProtocol | None = None,
             cache_prefix: str | None = None,
+            local_cache: LocalCache | None = None,
+            rate_limiter: RateLimiter | None = None,
+            access_tracker: _AccessRecorder | None = None,
+            instrumentation: Instrumentation | None = None,
     ) -> None:
-        self._options = options
+        super().__init__(
+            options=options,
+            cache_prefix=cache_prefix,
+            rate_limiter=rate_limiter,
+            access_tracker=access_tracker,
+            instrumentation=instrumentation,
+        )
+
+        # Optional in-process cache in front of given cache.
+        if local_cache is not None:
+            cache = local_cache if cache is None else TieredCache(local=local_cache, remote=cache)
         self._cache = cache
 
-        # Do not use "argument or default" as empty prefix should be allowed.
-        if cache_prefix is None:
-            cache_prefix = "seeplaces"  # Default cache prefix.
-        self._cache_prefix = cache_prefix
+        # Connection pool is shared by all threads. Sessions are thread local.
+        self._adapter = HTTPAdapter(
+            pool_connections=options.pool_connections,
+            pool_maxsize=options.pool_maxsize,
+            pool_block=options.pool_block,
+        )
+        self._local = threading.local()
+        self._single_flight = SingleFlight()
+
+        # Background refresh of stale cache entries. Executor is created on first use.
+        self._refresh_executor = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    def __enter__(self) -> "SeePlacesService":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes pooled connections and stops background refresh.
+        Service opens new connections if used again.
+        """
+        self._adapter.close()
+        with self._refresh_lock:
+            if (executor := self._refresh_executor) is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._refresh_executor = None
+
+    @property
+    def cache_stats(self) -> dict[str, CacheStats]:
+        """
+        Returns hit and miss counters of in-process cache tiers. Empty without local cache.
+        """
+        if isinstance(self._cache, TieredCache):
+            return self._cache.stats
+        if isinstance(self._cache, LocalCache):
+            return {"local": self._cache.stats}
+        return {}
 
     def get_excursions(
         self,
@@ -78,135 +146,783 @@ class SeePlacesService:
         date_from: datetime.date,
         date_to: datetime.date,
         spoken_languages: list[str],
+        deadline: float | None = None,
     ) -> list[SeePlacesExcursion]:
         """
         Returns list of SeePlacesExcursion objects from api.
+        Excursions are cached per calendar month. Months of range are read from cache together
+        and only dates missing in cache are fetched.
+        Api calls not finished within deadline (in seconds) fail with DeadlineExceededError.
+        """
+        self._record_access([iata_code], date_from, date_to, spoken_languages)
+        windows = month_windows(date_from, date_to)
+        with deadline_scope(deadline):
+            cached_values = self._get_cached_windows(iata_code, windows, spoken_languages)
+            results = [
+                self._get_window_excursions(iata_code, _f, _t, spoken_languages, cached_values)
+                for _f, _t in windows
+            ]
+        return results[0] if len(results) == 1 else merge_excursions(*results)
+
+    def iter_excursions(
+        self,
+        iata_code: str,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+    ) -> Iterator[SeePlacesExcursion]:
+        """
+        Yields the same excursions as get_excursions. Excursions missing in cache are yielded
+        while api response is read, so whole response is never held in memory.
+        Fetched dates are saved to cache only if generator is exhausted.
+        """
+        self._record_access([iata_code], date_from, date_to, spoken_languages)
+        seen: set[tuple[str, str]] = set()
+        for window_from, window_to in month_windows(date_from, date_to):
+            for excursion in self._iter_window_excursions(
+                iata_code, window_from, window_to, spoken_languages,
+            ):
+                if (key := excursion_key(excursion)) not in seen:
+                    seen.add(key)
+                    yield excursion
+
+    def get_excursions_many(
+        self,
+        iata_codes: list[str],
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+        deadline: float | None = None,
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns lists of SeePlacesExcursion objects from api for multiple airports.
+        Airports missing in cache are fetched together in as few api calls as possible.
+        Api calls not finished within deadline (in seconds) fail with DeadlineExceededError.
+        Results are keyed by normalized airport codes.
+        """
+        # Remove duplicates. Keep order.
+        iata_codes = list(dict.fromkeys(normalize_iata_code(_c) for _c in iata_codes))
+        self._record_access(iata_codes, date_from, date_to, spoken_languages)
+        results: dict[str, list[list[SeePlacesExcursion]]] = {_c: [] for _c in iata_codes}
+        with deadline_scope(deadline):
+            for window_from, window_to in month_windows(date_from, date_to):
+                excursions = self._get_window_excursions_many(
+                    iata_codes, window_from, window_to, spoken_languages,
+                )
+                for iata_code, _e in excursions.items():
+                    results[iata_code].append(_e)
+        return {
+            _c: _r[0] if len(_r) == 1 else merge_excursions(*_r) for _c, _r in results.items()
+        }
+
+    def prefetch_excursions(
+        self,
+        iata_code: str,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        spoken_languages: list[str],
+        lead_time: float = 0.0,
+    ) -> bool:
+        """
+        Saves excursions to cache unless they are cached and stay fresh for lead time (seconds).
+        Cached ranges becoming stale are refetched. Api calls have background priority.
+        Returns True if api was called.
+        """
+        called = False
+        with priority_scope(BACKGROUND):
+            for window_from, window_to in month_windows(date_from, date_to):
+                cache_key = self._excursions_cache_key(iata_code, window_from, spoken_languages)
+                if (cached := self._get_cached(cache_key)) is not None:
+                    if not isinstance(cached, CacheEntry):
+                        continue  # Saved without expiry metadata.
+                fresh = cached is not None and cached.stale_at - time.time() > lead_time
+                if fresh and cached.value.covers(window_from, window_to):
+                    continue
+
+                fetch = functools.partial(
+                    self._fetch_excursions,
+                    cache_key=cache_key,
+                    iata_code=iata_code,
+                    date_from=window_from,
+                    date_to=window_to,
+                    spoken_languages=spoken_languages,
+                )
+                if cached is not None and not fresh:
+                    self._fetch_coalesced(cache_key, functools.partial(fetch, extend=False))
+                self._fetch_coalesced(cache_key, fetch)  # Fill missing dates.
+                called = True
+        return called
+
+    def _get_window_excursions(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+            cached_values: dict[str, Any] | None = None,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns excursions of single month window. Tries to hit cache first.
+        Uses cached values read by caller if given.
         """
-        # Search for result in cache.
         cache_key = self._excursions_cache_key(iata_code, date_from, spoken_languages)
-        if (cache := self._cache) and (cached_result := cache.get(cache_key)):
+
+        # Search for result in cache. Empty result is valid cached result.
+        cached_result = None
+        if cached_values is not None:
+            cached = cached_values.get(cache_key)
+        else:
+            cached = self._get_cached(cache_key)
+        if isinstance(cached, CacheEntry):
+            window: ExcursionWindow = cached.value
+            self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+            cached_result = window.find(date_from, date_to)
+        elif cached is not None:
+            cached_result = cached  # Saved without expiry metadata.
+        self._record_lookup("exc", hit=cached_result is not None)
+        if cached_result is not None:
             return cached_result
 
-        # Get result from API.
-        language_ids = self._get_language_ids(spoken_languages=spoken_languages)
+        # Get missing dates from API. Concurrent callers share single api call.
+        return self._fetch_coalesced(
+            f"{cache_key}_{date_from.isoformat()}_{date_to.isoformat()}",
+            functools.partial(
+                self._fetch_excursions,
+                cache_key=cache_key,
+                iata_code=iata_code,
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=spoken_languages,
+            ),
+        )
+
+    def _get_cached_windows(
+            self,
+            iata_code: str,
+            windows: list[tuple[datetime.date, datetime.date]],
+            spoken_languages: list[str],
+    ) -> dict[str, Any] | None:
+        """
+        Returns cached values of month windows read in single round trip. Returns None
+        for single window, which is read by its lookup.
+        """
+        if len(windows) == 1:
+            return None
+        return self._get_cached_many([
+            self._excursions_cache_key(iata_code, _f, spoken_languages) for _f, _t in windows
+        ])
+
+    def _get_window_excursions_many(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions of single month window for multiple airports.
+        """
+        result: dict[str, list[SeePlacesExcursion]] = {}
+
+        # Search for results in cache.
+        cache_keys = {
+            _c: self._excursions_cache_key(_c, date_from, spoken_languages) for _c in iata_codes
+        }
+        cached_values = self._get_cached_many(list(cache_keys.values()))
+        for iata_code, cache_key in cache_keys.items():
+            if isinstance(cached := cached_values.get(cache_key), CacheEntry):
+                self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+                if (excursions := cached.value.find(date_from, date_to)) is not None:
+                    result[iata_code] = excursions
+            elif cached is not None:
+                result[iata_code] = cached  # Saved without expiry metadata.
+            self._record_lookup("exc", hit=iata_code in result)
+
+        # Get missing results from API. Concurrent callers share single api call per batch.
+        if missing := [_c for _c in iata_codes if _c not in result]:
+            for batch in self._iata_code_batches(missing):
+                batch_keys = {_c: cache_keys[_c] for _c in batch}
+                result |= self._fetch_coalesced(
+                    self._batch_flight_key(list(batch_keys.values()), date_from, date_to),
+                    functools.partial(
+                        self._fetch_excursions_batch,
+                        cache_keys=batch_keys,
+                        date_from=date_from,
+                        date_to=date_to,
+                        spoken_languages=spoken_languages,
+                    ),
+                )
+
+        return {_c: result[_c] for _c in iata_codes}
+
+    def _fetch_excursions_batch(
+            self,
+            cache_keys: dict[str, str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions of month window for batch of airports from api and saves them
+        to cache. Airports cached by other caller meanwhile are not fetched again.
+        Whole range is fetched, as airports may miss different dates.
+        """
+        for cache_key in cache_keys.values():
+            self._raise_if_failed_recently(cache_key)
+
+        # Other caller could have fetched some airports meanwhile.
+        result, previous = self._split_cached_batch(
+            self._get_cached_many(list(cache_keys.values())), cache_keys, date_from, date_to,
+        )
+        if not (missing := [_c for _c in cache_keys if _c not in result]):
+            return result
+
+        start = time.perf_counter()
+        try:
+            language_ids = self._get_language_ids(spoken_languages=spoken_languages)
+            excursions = self._get_excursions_batch(missing, date_from, date_to, language_ids)
+        except (SeePlacesError, requests.RequestException) as exc:
+            for iata_code in missing:
+                self._remember_failure(cache_keys[iata_code], exc)
+            raise
+
+        # Save results of batch to cache.
+        self._cache_set_many(self._batch_cache_entries(
+            excursions, cache_keys, previous, date_from, date_to, time.perf_counter() - start,
+        ))
+        return result | excursions
+
+    def _iter_window_excursions(
+            self,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+    ) -> Iterator[SeePlacesExcursion]:
+        """
+        Yields excursions of single month window. Streams dates missing in cache from api.
+        """
+        cache_key = self._excursions_cache_key(iata_code, date_from, spoken_languages)
+
+        # Search for result in cache. Empty result is valid cached result.
+        if isinstance(cached := self._get_cached(cache_key), CacheEntry):
+            self._refresh_if_needed(cache_key, cached, iata_code, spoken_languages)
+            if (excursions := cached.value.find(date_from, date_to)) is not None:
+                self._record_lookup("exc", hit=True)
+                yield from excursions
+                return
+        elif cached is not None:
+            self._record_lookup("exc", hit=True)
+            yield from cached  # Saved without expiry metadata.
+            return
+        self._record_lookup("exc", hit=False)
+        self._raise_if_failed_recently(cache_key)
+
+        # Excursions of ranges fetched before inside given range belong to the result too.
+        previous = self._extendable_entry(cached)
+        window = previous.value if previous is not None else ExcursionWindow()
+        yield from window.excursions_inside(date_from, date_to)
+
+        start = time.perf_counter()
+        try:
+            language_ids = self._get_language_ids(spoken_languages=spoken_languages)
+            for gap_from, gap_to in window.gaps(date_from, date_to):
+                excursions = []
+                for item in self._stream_excursion_for_iata_code(
+                    iata_code=iata_code,
+                    date_from=gap_from,
+                    date_to=gap_to,
+                    language_ids=language_ids,
+                ):
+                    excursion = SeePlacesExcursion(**item)
+                    excursions.append(excursion)  # Kept for cache only. Raw items are dropped.
+                    yield excursion
+                window = window.merge(gap_from, gap_to, excursions)
+        except (SeePlacesError, requests.RequestException) as exc:
+            self._remember_failure(cache_key, exc)
+            raise
+
+        # Save result to cache.
+        if self._cache is not None:
+            entry, timeout = self._excursions_cache_entry(
+                window, time.perf_counter() - start, previous,
+            )
+            self._cache_set(cache_key, entry, timeout=timeout)
+
+    def iter_excursions_concurrently(
+            self,
+            lookups: Iterable[ExcursionLookup],
+            max_workers: int | None = None,
+            deadline: float | None = None,
+    ) -> Iterator[ExcursionLookupResult]:
+        """
+        Runs independent lookups concurrently. Yields results in order of completion.
+        Errors of single lookup are captured in its result and do not abort other lookups.
+        Lookups not finished within deadline (in seconds) fail with DeadlineExceededError.
+        """
+        executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers or self._options.fan_out_workers,
+            thread_name_prefix="seeplaces",
+        )
+        pending = {executor.submit(self._lookup_excursions, _l, deadline): _l for _l in lookups}
+        try:
+            for future in futures.as_completed(pending, timeout=deadline):
+                del pending[future]
+                yield future.result()
+        except futures.TimeoutError:
+            for future, lookup in pending.items():
+                if future.done():  # Finished after deadline check.
+                    yield future.result()
+                else:
+                    future.cancel()
+                    yield ExcursionLookupResult(
+                        lookup=lookup,
+                        error=DeadlineExceededError(f"Lookup exceeded deadline: {deadline}s"),
+                    )
+        finally:
+            # Do not wait for running lookups. Their results are discarded.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _lookup_excursions(
+            self,
+            lookup: ExcursionLookup,
+            deadline: float | None = None,
+    ) -> ExcursionLookupResult:
+        """
+        Returns result of single lookup. Captures api errors.
+        """
+        try:
+            excursions = self.get_excursions(
+                iata_code=lookup.iata_code,
+                date_from=lookup.date_from,
+                date_to=lookup.date_to,
+                spoken_languages=lookup.spoken_languages,
+                deadline=deadline,
+            )
+        except (SeePlacesError, requests.RequestException) as exc:
+            return ExcursionLookupResult(lookup=lookup, error=exc)
+        return ExcursionLookupResult(lookup=lookup, excursions=excursions)
+
+    def _get_excursions_batch(
+            self,
+            iata_codes: list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+    ) -> dict[str, list[SeePlacesExcursion]]:
+        """
+        Returns excursions for batch of airports split by airport.
+        Falls back to api call per airport if combined response cannot be split,
+        and pauses combining airports of later calls.
+        """
         api_response = self._call_excursion_for_iata_code(
-            iata_code=iata_code,
+            iata_code=iata_codes,
             date_from=date_from,
             date_to=date_to,
             language_ids=language_ids,
         )
-        json_data: dict[str, Any] = api_response.json()
+        if (excursions := self._parse_excursions_by_iata_code(api_response, iata_codes)) is None:
+            self._pause_combined_calls()
+            excursions = {
+                _c: self._parse_excursions_from_response(
+                    self._call_excursion_for_iata_code(
+                        iata_code=_c,
+                        date_from=date_from,
+                        date_to=date_to,
+                        language_ids=language_ids,
+                    )
+                )
+                for _c in iata_codes
+            }
+        return excursions
 
-        excursions = []
-        # Assuming Items is iterable.
-        if excursions_from_response := json_data.get("Items"):
-            for _e in excursions_from_response:
-                excursions.append(SeePlacesExcursion(**_e))
+    def _get_language_ids(self, spoken_languages: list[str]) -> set[str]:
+        """
+        Returns IDs of given languages from in-memory catalog. Loads catalog if needed.
+        """
+        with self._timed(LANGUAGES_SECONDS):
+            if (index := self._language_catalog.index()) is not None:
+                self._record_lookup("lang", hit=True)
+            else:
+                # Concurrent callers share single load.
+                index = self._fetch_coalesced(
+                    self._languages_cache_key(), self._load_language_catalog,
+                )
+            return LanguageCatalog.resolve(index, spoken_languages)
+
+    def _fetch_excursions(
+            self,
+            cache_key: str,
+            iata_code: str,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            spoken_languages: list[str],
+            extend: bool = True,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns excursions of range in month window from api. Fetches only dates missing
+        in fresh cached window and saves extended window to cache. Without extend, ranges
+        of cached window inside given range are fetched again and replace the window.
+        Remembers failed api call if error cache is enabled.
+        """
+        cache = self._cache
+        self._raise_if_failed_recently(cache_key)
+        cached = self._cache_get(cache_key)
+
+        if extend:
+            # Other caller could have fetched some dates meanwhile.
+            previous = self._extendable_entry(cached)
+            window = previous.value if previous is not None else ExcursionWindow()
+            if (excursions := window.find(date_from, date_to)) is not None:
+                return excursions
+            ranges = window.gaps(date_from, date_to)
+        else:
+            previous, window = None, ExcursionWindow()
+            ranges = self._refetched_ranges(cached, date_from, date_to)
+
+        # Refresh of window fetched by single api call is conditional.
+        revalidated = None if extend else self._revalidatable_entry(cached, date_from, date_to)
+        conditional = revalidated.validators if revalidated is not None else None
+        validators = None
+
+        start = time.perf_counter()
+        try:
+            language_ids = self._get_language_ids(spoken_languages=spoken_languages)
+            for range_from, range_to in ranges:
+                api_response = self._call_excursion_for_iata_code(
+                    iata_code=iata_code,
+                    date_from=range_from,
+                    date_to=range_to,
+                    language_ids=language_ids,
+                    validators=conditional,
+                )
+                if revalidated is not None and self._is_unchanged(api_response, conditional):
+                    # Renew unchanged window without parsing response.
+                    if cache is not None:
+                        entry, timeout = self._revalidated_entry(
+                            revalidated, time.perf_counter() - start,
+                        )
+                        self._cache_set(cache_key, entry, timeout=timeout)
+                    return revalidated.value.excursions_inside(date_from, date_to)
+                excursions = self._parse_excursions_from_response(api_response)
+                window = window.merge(range_from, range_to, excursions)
+                validators = self._response_validators(api_response)
+        except (SeePlacesError, requests.RequestException) as exc:
+            self._remember_failure(cache_key, exc)
+            raise
+
+        # Validators describe window only if it was fetched by single api call.
+        if [_r.interval for _r in window.ranges] != ranges[:1]:
+            validators = None
 
         # Save result to cache.
         if cache is not None:
-            cache.set(cache_key, excursions, timeout=EXCURSIONS_CACHE_TTL)
+            entry, timeout = self._excursions_cache_entry(
+                window, time.perf_counter() - start, previous, validators,
+            )
+            self._cache_set(cache_key, entry, timeout=timeout)
 
-        return excursions
+        return window.excursions_inside(date_from, date_to)
 
-    def _get_language_ids(self, spoken_languages: list[str]) -> set[str]:
+    def _raise_if_failed_recently(self, cache_key: str) -> None:
         """
-        Returns IDs of given languages. Tries to hit cache first. Saves result to cache.
+        Raises ApiConnectionError if api call for cache key failed recently.
+        Does nothing if error cache is disabled.
         """
-        # Search for result in cache.
-        cache_key = self._languages_cache_key(spoken_languages)
-        if (cache := self._cache) and (cached_result := cache.get(cache_key)):
-            return cached_result
+        if self._cache is not None and self._options.error_cache_ttl:
+            if (error := self._cache_get(self._error_cache_key(cache_key))) is not None:
+                raise ApiConnectionError(f"Skipping api call after recent failure: {error}")
 
-        # Get result from API.
-        api_response = self._call_excursion_spoken_languages()
-        all_languages = self._parse_languages_from_response(api_response)
-        language_ids = {_l.id for _l in all_languages if _l.name in spoken_languages}
+    def _remember_failure(self, cache_key: str, exc: Exception) -> None:
+        """
+        Saves failed api call for cache key if error cache is enabled.
+        Only upstream failures are saved.
+        """
+        if not self._is_upstream_failure(exc):
+            return
+        if self._cache is not None and (error_cache_ttl := self._options.error_cache_ttl):
+            self._cache_set(self._error_cache_key(cache_key), str(exc), timeout=error_cache_ttl)
 
-        # Save result to cache.
-        if cache is not None:
-            cache.set(cache_key, language_ids, timeout=LANGUAGES_CACHE_TTL)
+    def _load_language_catalog(self) -> dict[str, str]:
+        """
+        Returns index of all languages. Tries to hit cache first, then api.
+        Saves index to cache and in-memory catalog.
+        """
+        cache_key = self._languages_cache_key()
+        index = self._cache_get(cache_key)
+        self._record_lookup("lang", hit=index is not None)
+        if index is None:
+            index = self._language_index_from_response(self._call_excursion_spoken_languages())
+            self._cache_set(cache_key, index, timeout=LANGUAGES_CACHE_TTL)
 
-        return language_ids
+        self._language_catalog.update(index)
+        return index
 
-    def _excursions_cache_key(
-        self,
-        iata_code: str,
-        date_from: datetime.date,
-        spoken_languages: list[str],
-    ) -> str:
+    def _get_cached(self, cache_key: str) -> Any:
+        """
+        Returns cached value or None. Returns whole CacheEntry unless it is expired
+        or holds value of other layout.
+        """
+        cached = self._cache_get(cache_key)
+        return cached if self._is_usable(cached) else None
+
+    def _get_cached_many(self, cache_keys: list[str]) -> dict[str, Any]:
+        """
+        Returns cached values of given keys. Missing, expired and unusable keys are left out.
+        """
+        return {
+            _k: _v for _k, _v in self._cache_get_many(cache_keys).items() if self._is_usable(_v)
+        }
+
+    def _cache_get_many(self, cache_keys: list[str]) -> dict[str, Any]:
+        """
+        Returns cached values of keys found in cache. Uses single round trip if cache supports
+        get_many. Returns empty dict without cache.
+        """
+        if (cache := self._cache) is None or not cache_keys:
+            return {}
+        with self._timed(CACHE_SECONDS, operation="get_many"):
+            return batch_get(cache, cache_keys)
+
+    def _cache_set_many(self, entries: dict[str, tuple[Any, int]]) -> None:
         """
-        Returns cache key for excursions.
+        Saves values with their timeouts. Values sharing timeout are saved together
+        if cache supports set_many. Does nothing without cache.
         """
-        lang_code = "".join(_l[:3] for _l in spoken_languages)
-        return f"{self._cache_prefix}_exc_{iata_code}_{date_from.month}_{lang_code}"
+        if (cache := self._cache) is None or not entries:
+            return
+        with self._timed(CACHE_SECONDS, operation="set_many"):
+            for timeout, values in self._group_by_timeout(entries).items():
+                batch_set(cache, values, timeout=timeout)
 
-    def _languages_cache_key(self, spoken_languages: list[str]) -> str:
+    def _cache_get(self, cache_key: str) -> Any:
         """
-        Returns cache key for languages.
+        Returns cached value. Returns None without cache.
         """
-        code = "".join(_l[:3] for _l in spoken_languages)
-        return f"{self._cache_prefix}_lang_{code}"
+        if (cache := self._cache) is None:
+            return None
+        with self._timed(CACHE_SECONDS, operation="get"):
+            return cache.get(cache_key)
 
-    def _parse_languages_from_response(self, response: requests.Response) -> list[_SpokenLanguage]:
+    def _cache_set(self, cache_key: str, value: Any, timeout: int) -> None:
         """
-        Returns api call response parsed into list of _SpokenLanguage objects.
+        Saves value to cache. Does nothing without cache.
         """
-        json_data: dict[str, Any] = response.json()
+        if (cache := self._cache) is not None:
+            with self._timed(CACHE_SECONDS, operation="set"):
+                cache.set(cache_key, value, timeout=timeout)
 
-        languages = []
-        # Assuming SpokenLanguages is iterable.
-        if languages_from_response := json_data.get("SpokenLanguages"):
-            for _l in languages_from_response:
-                languages.append(_SpokenLanguage(**_l))
-        return languages
+    def _refresh_if_needed(
+            self,
+            cache_key: str,
+            entry: CacheEntry,
+            iata_code: str,
+            spoken_languages: list[str],
+    ) -> None:
+        """
+        Schedules background refresh of all dates in cached window if it is stale
+        or should be refreshed early.
+        """
+        window: ExcursionWindow = entry.value
+        if (span := window.span) and entry.should_refresh(beta=self._options.early_refresh_beta):
+            self._refresh_in_background(cache_key, functools.partial(
+                self._fetch_excursions,
+                cache_key=cache_key,
+                iata_code=iata_code,
+                date_from=span[0],
+                date_to=span[1],
+                spoken_languages=spoken_languages,
+                extend=False,
+            ))
+
+    def _refresh_in_background(self, cache_key: str, fetch: Callable[[], Any]) -> None:
+        """
+        Schedules refresh of cache entry. Refresh of the same key is scheduled only once.
+        """
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._refresh_executor is None:
+                self._refresh_executor = futures.ThreadPoolExecutor(
+                    max_workers=self._options.refresh_workers,
+                    thread_name_prefix="seeplaces-refresh",
+                )
+            self._refresh_executor.submit(self._refresh, cache_key, fetch)
+
+    def _refresh(self, cache_key: str, fetch: Callable[[], Any]) -> None:
+        """
+        Refreshes cache entry. Stale entry is kept until it expires if refresh fails.
+        Api calls of refresh wait behind interactive calls if rate limiter is used.
+        """
+        try:
+            with priority_scope(BACKGROUND):
+                self._fetch_coalesced(cache_key, fetch)
+        except (SeePlacesError, requests.RequestException):
+            logger.warning("Refresh of cache entry %s failed.", cache_key, exc_info=True)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+
+    def _fetch_coalesced(self, cache_key: str, fetch: Callable[[], _T]) -> _T:
+        """
+        Runs fetch only once for concurrent cache misses of the same key in this process.
+        Coordinates with other processes using cache lock if enabled.
+        """
+        return self._single_flight.do(cache_key, lambda: self._fetch_locked(cache_key, fetch))
 
-    def _call_api(self, endpoint: str, query: _mapping, headers: _mapping) -> requests.Response:
+    def _fetch_locked(self, cache_key: str, fetch: Callable[[], _T]) -> _T:
+        """
+        Runs fetch while holding cache lock. Waits for other lock owner first if lock is taken.
+        Excursions fetch reuses dates saved by other process.
+        """
+        cache = self._cache
+        timeout = self._options.cache_lock_timeout
+        if cache is None or timeout is None or lock_cache(cache) is None:
+            return fetch()
+
+        lock = CacheLock(cache, f"{cache_key}_lock", timeout=timeout)
+        if not lock.acquire():
+            # Other process fetches the same key. Fetch reuses its cached result.
+            lock.wait(cache_key, poll_interval=self._options.cache_lock_poll_interval)
+            return fetch()
+
+        try:
+            return fetch()
+        finally:
+            lock.release()
+
+    def _call_api(
+            self,
+            endpoint: str,
+            query: _mapping,
+            headers: _mapping,
+            stream: bool = False,
+    ) -> requests.Response:
         """
         Generic api call with provided parameters. Parameters override query and header defaults.
+        Body of streamed response is read on access. Caller must close streamed response.
+        Transient failures are retried if enabled. All api calls are idempotent GET requests.
         """
-        base_url = self._options.base_url
-        response = requests.get(
-            urljoin(base_url, endpoint),
-            params={"api-version": self._options.api_version} | query,
-            headers={"accept": "application/json"} | headers,
-            timeout=60,
-        )
+        url, params, headers = self._api_request(endpoint=endpoint, query=query, headers=headers)
+        label = self._endpoint_label(endpoint)
+        for retry in itertools.count():
+            if (rate_limiter := self._rate_limiter) is not None:
+                rate_limiter.acquire()
+            timeout = self._attempt_timeouts(endpoint)
+            try:
+                with self._timed(HTTP_SECONDS, endpoint=label):
+                    response = self._session().get(
+                        url, params=params, headers=headers, timeout=timeout, stream=stream,
+                    )
+            except requests.RequestException as exc:
+                self._record_attempt(None)
+                retryable = isinstance(exc, (requests.ConnectionError, requests.Timeout))
+                if not retryable or (delay := self._retry_delay(retry)) is None:
+                    self._record_api_call(endpoint, ok=False)
+                    if self._deadline_exceeded():
+                        raise DeadlineExceededError(
+                            f"Api call exceeded deadline: {endpoint}",
+                        ) from exc
+                    raise
+            else:
+                if not self._record_attempt(response.status_code):
+                    break
+                if (delay := self._retry_delay(retry)) is None:
+                    break
+                response.close()
+            logger.info("Retrying api call of %s in %.2fs.", endpoint, delay)
+            time.sleep(delay)
+
         try:
             response.raise_for_status()  # Raise exception if response status is not OK.
         except requests.HTTPError as exc:
+            response.close()
+            self._record_api_call(endpoint, ok=False)
             raise ApiConnectionError(f"Cannot connect to endpoint: {endpoint}") from exc
+        # Body of streamed response is measured while it is read.
+        if stream:
+            self._record_api_call(endpoint, ok=True)
+        else:
+            self._record_api_call(
+                endpoint,
+                ok=True,
+                response_bytes=len(response.content or b""),
+                wire_bytes=self._wire_bytes(response),
+            )
         return response
 
+    @staticmethod
+    def _wire_bytes(response: requests.Response) -> int | None:
+        """
+        Returns number of body bytes read from connection, before decompression.
+        """
+        tell = getattr(response.raw, "tell", None)
+        return tell() if tell is not None else None
+
+    def _session(self) -> requests.Session:
+        """
+        Returns session of current thread. Sessions share connection pool of the service.
+        """
+        if (session := getattr(self._local, "session", None)) is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            if not self._options.keep_alive:
+                session.headers["connection"] = "close"
+            self._local.session = session
+        return session
+
     def _call_excursion_spoken_languages(self) -> requests.Response:
         """
         Returns response of ExcursionSpokenLanguages api call.
         """
-        endpoint_path = "api/Excursion/ExcursionSpokenLanguages"
-        # English is accepted here. Customers do not see the response.
-        headers = {"accept-language": "en-US"}
-        return self._call_api(endpoint=endpoint_path, query={}, headers=headers)
+        endpoint, query, headers = self._excursion_spoken_languages_request()
+        return self._call_api(endpoint=endpoint, query=query, headers=headers)
 
-    def _call_excursion_for_iata_code(
+    def _stream_excursion_for_iata_code(
             self,
             iata_code: str,
             date_from: datetime.date,
             date_to: datetime.date,
             language_ids: set[str],
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yields items of ExcursionForIataCode api call while response is read in chunks.
+        """
+        endpoint, query, headers = self._excursion_for_iata_code_request(
+            iata_codes=[iata_code],
+            date_from=date_from,
+            date_to=date_to,
+            language_ids=language_ids,
+        )
+        parser = JsonArrayStream("Items")
+        response_bytes = 0
+        response = self._call_api(endpoint=endpoint, query=query, headers=headers, stream=True)
+        with response:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                response_bytes += len(chunk)
+                yield from parser.feed(chunk)
+            self._record_response_bytes(endpoint, response_bytes, self._wire_bytes(response))
+            yield from parser.close()
+
+    def _call_excursion_for_iata_code(
+            self,
+            iata_code: str | list[str],
+            date_from: datetime.date,
+            date_to: datetime.date,
+            language_ids: set[str],
+            validators: ResponseValidators | None = None,
     ) -> requests.Response:
         """
-        Returns response of ExcursionForIataCode api call.
+        Returns response of ExcursionForIataCode api call. Accepts single or multiple airports.
+        Request is conditional if validators of previous response are given.
         """
-        endpoint_path = "api/Excursion/ExcursionForIataCode"
-        query = {
-            "input.iataCodes": iata_code,
-            "input.dateFrom": date_from.isoformat(),
-            "input.dateTo": date_to.isoformat(),
-            "input.spokenLanguages": language_ids,
-        }
-        headers = {
-            "x-scope-id": self._options.scope_id,
-            "currency": "EUR",
-            "accept-language": "sk-SK",  # Slovak is needed for customers.
-        }
-        return self._call_api(endpoint=endpoint_path, query=query, headers=headers)
+        endpoint, query, headers = self._excursion_for_iata_code_request(
+            iata_codes=[iata_code] if isinstance(iata_code, str) else iata_code,
+            date_from=date_from,
+            date_to=date_to,
+            language_ids=language_ids,
+        )
+        headers |= self._conditional_headers(validators)
+        return self._call_api(endpoint=endpoint, query=query, headers=headers)
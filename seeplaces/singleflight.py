@@ -0,0 +1,161 @@
+import asyncio
+import functools
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+from seeplaces.cache import CacheProtocol, LockingCacheProtocol, lock_cache
+from seeplaces.exceptions import DeadlineExceededError
+from seeplaces.resilience import no_deadline, remaining_time
+
+
+_T = TypeVar("_T")
+
+
+class _Call(Generic[_T]):
+    """
+    Single in-flight call shared by all waiting threads.
+    """
+    done: threading.Event
+    result: _T | None
+    error: BaseException | None
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key across threads. Only the first caller runs
+    the function. Other callers wait for its result (or its exception).
+    """
+    _calls: dict[str, _Call]
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], _T]) -> _T:
+        """
+        Returns result of fn. Runs fn only once for concurrent calls with the same key.
+        Waiting callers raise DeadlineExceededError if deadline of their scope passes.
+        Callers run fn again if it exceeded deadline of its caller.
+        """
+        with self._lock:
+            if (call := self._calls.get(key)) is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            if not call.done.wait(remaining_time()):
+                raise DeadlineExceededError(f"Shared call exceeded deadline: {key}")
+            if isinstance(call.error, DeadlineExceededError):
+                return self.do(key, fn)  # Deadline of other caller, not of this one.
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces concurrent calls with the same key within event loop. Cancelling one waiting
+    caller does not cancel the shared call.
+    """
+    _calls: dict[str, asyncio.Future]
+
+    def __init__(self) -> None:
+        self._calls = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[_T]]) -> _T:
+        """
+        Returns result of fn. Runs fn only once for concurrent calls with the same key.
+        Callers raise DeadlineExceededError if deadline of their scope passes. Shared call
+        runs without deadline of its first caller and continues for other callers.
+        """
+        if (task := self._calls.get(key)) is None:
+            with no_deadline():  # Task copies context on creation.
+                task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(functools.partial(self._done, key))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), remaining_time())
+        except asyncio.TimeoutError as exc:
+            raise DeadlineExceededError(f"Shared call exceeded deadline: {key}") from exc
+
+    def _done(self, key: str, task: asyncio.Future) -> None:
+        """
+        Forgets finished call. Retrieves its exception, as all callers could stop waiting.
+        """
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+
+class CacheLock:
+    """
+    Best-effort lock shared by processes using the same cache. Relies on atomic cache.add.
+    Lock expires after timeout, so crashed owner does not block others forever.
+    Lock of TieredCache is held in its remote tier only.
+    """
+    key: str
+    timeout: float
+
+    _cache: LockingCacheProtocol
+    _token: str
+
+    def __init__(self, cache: CacheProtocol, key: str, timeout: float) -> None:
+        if (locking_cache := lock_cache(cache)) is None:
+            raise ValueError(f"Cache does not support atomic add: {type(cache).__name__}")
+        self.key = key
+        self.timeout = timeout
+
+        self._cache = locking_cache
+        self._token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        """
+        Returns True if lock was acquired.
+        """
+        # Cache timeouts are whole seconds.
+        return bool(self._cache.add(self.key, self._token, timeout=max(1, round(self.timeout))))
+
+    def release(self) -> None:
+        """
+        Releases lock if it is still owned. Check and delete are not atomic.
+        """
+        if self._cache.get(self.key) == self._token:
+            self._cache.delete(self.key)
+
+    def wait(self, result_key: str, poll_interval: float) -> Any:
+        """
+        Waits until other lock owner releases lock. Returns cached result or None
+        if lock expired or was released without result. Raises DeadlineExceededError
+        if deadline of current scope passes first.
+        """
+        expires = time.monotonic() + self.timeout
+        while (now := time.monotonic()) < expires:
+            if self._cache.get(self.key) is None:  # Released or expired.
+                return self._cache.get(result_key)
+            if (remaining := remaining_time()) is not None:
+                if remaining <= 0:
+                    raise DeadlineExceededError(f"Cache lock wait exceeded deadline: {self.key}")
+                poll_interval = min(poll_interval, remaining)
+            time.sleep(min(poll_interval, expires - now))
+        return None
@@ -0,0 +1,318 @@
+import asyncio
+import contextlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from seeplaces.cache import CacheStats
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires_at REAL,
+        size INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS cache_entries_expires_at ON cache_entries (expires_at)",
+)
+_CULL_EVERY = 64  # Number of writes of single instance between size checks.
+_MAX_VARIABLES = 500  # Keys per query. Older SQLite allows 999 query parameters.
+
+
+class SQLiteCache:
+    """
+    Persistent cache in SQLite database file. Implements CacheProtocol with add and delete,
+    so it can coordinate cache lock too. Safe for threads and for processes on one host
+    sharing the file (eg. gunicorn workers, cron jobs). Values are pickled, so the file
+    must be writable only by trusted users.
+
+    Entries expire by timeout. If database grows over max_size bytes, expired entries
+    are removed first, then entries closest to expiry.
+    """
+    path: str
+    max_size: int
+    default_timeout: int
+    busy_timeout: float
+    stats: CacheStats
+
+    _local: threading.local
+    _connections: list[sqlite3.Connection]
+    _pid: int
+    _writes: int
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            path: str,
+            max_size: int = 256 * 2 ** 20,  # Bytes of pickled values.
+            default_timeout: int = 300,
+            busy_timeout: float = 5.0,  # Seconds to wait for write lock held by other process.
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.default_timeout = default_timeout
+        self.busy_timeout = busy_timeout
+        self.stats = CacheStats()
+
+        self._local = threading.local()
+        self._connections = []
+        self._pid = os.getpid()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers do not block writer.
+        with self._transaction() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    def get(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Returns cached value or default if key is missing or expired.
+        """
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+            (self._key(key, version),),
+        ).fetchone()
+        hit = row is not None and (row[1] is None or row[1] > time.time())
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+        return pickle.loads(row[0]) if hit else default
+
+    def set(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> None:
+        """
+        Saves value. Zero timeout uses default timeout, None never expires (as in Django).
+        """
+        with self._transaction() as connection:
+            self._store(connection, self._key(key, version), value, timeout)
+        self._written()
+
+    def add(self, key: str, value: Any, timeout: int | None = 0, version: Any = None) -> bool:
+        """
+        Saves value only if key is missing or expired. Returns True if value was saved.
+        Atomic across processes.
+        """
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT expires_at FROM cache_entries WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None and (row[0] is None or row[0] > time.time()):
+                return False
+            self._store(connection, key, value, timeout)
+        self._written()
+        return True
+
+    def delete(self, key: str, version: Any = None) -> bool:
+        """
+        Removes entry. Returns True if key existed.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM cache_entries WHERE key = ?", (self._key(key, version),),
+            )
+        return cursor.rowcount > 0
+
+    def get_many(self, keys: list[str], version: Any = None) -> dict[str, Any]:
+        """
+        Returns values of keys found in cache. Reads keys in as few queries as possible.
+        """
+        stored_keys = {self._key(_k, version): _k for _k in keys}
+        ordered_keys = list(stored_keys)
+        now, values = time.time(), {}
+        for offset in range(0, len(ordered_keys), _MAX_VARIABLES):
+            chunk = ordered_keys[offset:offset + _MAX_VARIABLES]
+            rows = self._connection().execute(
+                "SELECT key, value, expires_at FROM cache_entries"
+                f" WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for stored_key, data, expires_at in rows:
+                if expires_at is None or expires_at > now:
+                    values[stored_keys[stored_key]] = pickle.loads(data)
+        with self._lock:
+            self.stats.hits += len(values)
+            self.stats.misses += len(stored_keys) - len(values)
+        return values
+
+    def set_many(self, data: dict[str, Any], timeout: int | None = 0, version: Any = None) -> list:
+        """
+        Saves values with the same timeout in single transaction.
+        Returns keys which failed to save (none).
+        """
+        with self._transaction() as connection:
+            for key, value in data.items():
+                self._store(connection, self._key(key, version), value, timeout)
+        self._written()
+        return []
+
+    def delete_many(self, keys: list[str], version: Any = None) -> None:
+        """
+        Removes entries in single transaction.
+        """
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM cache_entries WHERE key = ?",
+                [(self._key(_k, version),) for _k in keys],
+            )
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM cache_entries")
+
+    async def aget(self, key: str, default: Any | None = None, version: Any = None) -> Any:
+        """
+        Async variant of get. Runs in default executor.
+        """
+        return await asyncio.to_thread(self.get, key, default, version)
+
+    async def aset(
+            self,
+            key: str,
+            value: Any,
+            timeout: int | None = 0,
+            version: Any = None,
+    ) -> None:
+        """
+        Async variant of set. Runs in default executor.
+        """
+        await asyncio.to_thread(self.set, key, value, timeout, version)
+
+    def cull(self) -> int:
+        """
+        Removes expired entries, then entries closest to expiry until size of values drops
+        under 90 % of max_size. Returns number of removed entries.
+        Called automatically after every few writes.
+        """
+        with self._transaction() as connection:
+            removed = connection.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),),
+            ).rowcount
+            total = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries",
+            ).fetchone()[0]
+            if total <= self.max_size:
+                return removed
+
+            excess, keys = total - self.max_size * 0.9, []
+            rows = connection.execute(
+                "SELECT key, size FROM cache_entries ORDER BY expires_at IS NULL, expires_at",
+            )
+            for key, size in rows:
+                keys.append((key,))
+                if (excess := excess - size) <= 0:
+                    break
+            connection.executemany("DELETE FROM cache_entries WHERE key = ?", keys)
+        return removed + len(keys)
+
+    def size(self) -> int:
+        """
+        Returns size of all stored values in bytes, including expired ones.
+        """
+        row = self._connection().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries",
+        ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """
+        Closes database connections of all threads.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def _store(
+            self,
+            connection: sqlite3.Connection,
+            key: str,
+            value: Any,
+            timeout: int | None,
+    ) -> None:
+        """
+        Saves value in open transaction. Negative timeout removes entry.
+        """
+        if timeout == 0:
+            timeout = self.default_timeout
+        if timeout is not None and timeout < 0:
+            connection.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = None if timeout is None else time.time() + timeout
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, size)"
+            " VALUES (?, ?, ?, ?)",
+            (key, data, expires_at, len(data)),
+        )
+
+    def _written(self) -> None:
+        """
+        Counts write. Culls database after every few writes.
+        """
+        with self._lock:
+            self._writes += 1
+            due = self._writes % _CULL_EVERY == 0
+        if due:
+            self.cull()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns connection of current thread. Connections are not reused after fork.
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._connections = []
+            self._local = threading.local()
+        if (connection := getattr(self._local, "connection", None)) is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,  # Transactions are started explicitly.
+                check_same_thread=False,  # Closed by other thread in close.
+            )
+            # Durable enough for cache in WAL mode.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs block in write transaction of current thread. Write lock is taken at start,
+        so read-modify-write is atomic across processes.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _key(key: str, version: Any) -> str:
+        """
+        Returns stored key. Versions are kept apart as in Django.
+        """
+        return key if version is None else f"{version}:{key}"
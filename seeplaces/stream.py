@@ -0,0 +1,175 @@
+import codecs
+import json
+import re
+from typing import Any
+
+from seeplaces.exceptions import ResponseParseError
+
+
+_WHITESPACE = " \t\n\r"
+
+_MORE = object()
+"""Sentinel returned when more data is needed to parse value."""
+
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+_NUMBER_CONTINUATION = re.compile(r"\.|[eE][+-]?")
+"""Text after number which continues as its fraction or exponent."""
+
+_UNICODE_ESCAPE = re.compile(r"u[0-9a-fA-F]{0,4}")
+"""Unicode escape which continues in next chunk."""
+
+
+class JsonArrayStream:
+    """
+    Incremental parser of single array in JSON object, eg. Items of api response.
+    Response is fed in chunks. Array items are returned as soon as they are complete,
+    so neither whole response nor whole array is held in memory.
+    Other keys of the object are parsed and discarded.
+    """
+    key: str
+
+    _decoder: json.JSONDecoder
+    _text_decoder: codecs.IncrementalDecoder
+    _buffer: str
+    _pos: int
+    _state: str
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "object"
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """
+        Returns array items completed by given chunk.
+        """
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        """
+        Returns remaining array items. Raises ResponseParseError if response is incomplete.
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state != "done":
+            raise ResponseParseError(f"Incomplete JSON response. Parser state: {self._state}")
+        return items
+
+    def _parse(self, final: bool) -> list[Any]:
+        """
+        Parses buffered text as far as possible. Returns completed array items.
+        """
+        items = []
+        while self._state != "done" and self._skip_whitespace():
+            char = self._buffer[self._pos]
+            match self._state:
+                case "object":  # Start of response object.
+                    self._expect(char, "{", next_state="key")
+                case "key":  # Key of next value or end of object.
+                    if char == "}":
+                        self._expect(char, "}", next_state="done")
+                    elif (key := self._decode(final)) is _MORE:
+                        break
+                    else:
+                        self._state = "items_colon" if key == self.key else "value_colon"
+                case "value_colon" | "items_colon":
+                    self._expect(char, ":", next_state=self._state.removesuffix("_colon"))
+                case "value":  # Other value. Parsed and discarded.
+                    if self._decode(final) is _MORE:
+                        break
+                    self._state = "separator"
+                case "items":  # Start of array. Missing items are sent as null.
+                    if char == "[":
+                        self._expect(char, "[", next_state="item")
+                    elif (value := self._decode(final)) is _MORE:
+                        break
+                    elif value is not None:
+                        raise ResponseParseError(f"Expected array or null in {self.key}.")
+                    else:
+                        self._state = "separator"
+                case "item":  # Next item or end of array.
+                    if char == "]":
+                        self._expect(char, "]", next_state="separator")
+                    elif (item := self._decode(final)) is _MORE:
+                        break
+                    else:
+                        items.append(item)
+                        self._state = "item_separator"
+                case "item_separator":  # Next item or end of array.
+                    if char == "]":
+                        self._expect(char, "]", next_state="separator")
+                    else:
+                        self._expect(char, ",", next_state="item")
+                case "separator":  # Next key or end of object.
+                    if char == "}":
+                        self._expect(char, "}", next_state="done")
+                    else:
+                        self._expect(char, ",", next_state="key")
+
+        # Drop parsed text. Keeps buffer small.
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        """
+        Moves position to next significant character. Returns False if buffer is exhausted.
+        """
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _expect(self, char: str, expected: str, next_state: str) -> None:
+        """
+        Consumes expected character and moves to next state.
+        """
+        if char != expected:
+            raise ResponseParseError(f"Expected {expected!r}, got {char!r} at state {self._state}.")
+        self._pos += 1
+        self._state = next_state
+
+    def _decode(self, final: bool) -> Any:
+        """
+        Returns next complete JSON value. Returns _MORE if more data is needed.
+        Raises ResponseParseError as soon as value cannot be completed by next chunk.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as exc:
+            if final or not self._is_incomplete(exc):
+                raise ResponseParseError(f"Invalid JSON response: {exc}") from exc
+            return _MORE
+        if not final:
+            # Numbers and literals at the end of buffer can continue in next chunk.
+            if end == len(self._buffer):
+                return _MORE
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if is_number and _NUMBER_CONTINUATION.fullmatch(self._buffer[end:]):
+                return _MORE
+        self._pos = end
+        return value
+
+    def _is_incomplete(self, exc: json.JSONDecodeError) -> bool:
+        """
+        Returns True if decoding failed only because buffer ends inside value.
+        Errors before end of buffer point at start of value, string or escape cut by end
+        of buffer, or at invalid input.
+        """
+        rest = self._buffer[exc.pos:]
+        if not rest or exc.msg.startswith("Unterminated string"):
+            return True
+        if exc.msg == "Expecting value":  # Literal or sign of number.
+            return any(_l.startswith(rest) for _l in _LITERALS)
+        if exc.msg == "Expecting ',' delimiter":  # Fraction or exponent of number.
+            return _NUMBER_CONTINUATION.fullmatch(rest) is not None
+        if exc.msg == "Invalid \\uXXXX escape":
+            return _UNICODE_ESCAPE.fullmatch(rest) is not None
+        return False
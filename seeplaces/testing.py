@@ -0,0 +1,327 @@
+import contextlib
+import functools
+import gzip
+import hashlib
+import importlib
+import json
+import random
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+
+_BANDWIDTH_CHUNK_SIZE = 16 * 1024
+
+STUB_LANGUAGES = [
+    {"Id": "lang-sk", "Name": "Slovak", "UrlName": "slovak"},
+    {"Id": "lang-cz", "Name": "Czech", "UrlName": "czech"},
+    {"Id": "lang-en", "Name": "English", "UrlName": "english"},
+    {"Id": "lang-de", "Name": "German", "UrlName": "german"},
+]
+
+
+def _brotli_compress() -> Callable[[bytes], bytes] | None:
+    """
+    Returns brotli compress function if brotli or brotlicffi package is installed.
+    """
+    for module_name in ("brotli", "brotlicffi"):
+        try:
+            return importlib.import_module(module_name).compress
+        except ImportError:
+            continue
+    return None
+
+
+_ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": functools.partial(gzip.compress, compresslevel=6, mtime=0),
+    "deflate": zlib.compress,  # HTTP deflate is zlib format.
+}
+if (_brotli := _brotli_compress()) is not None:
+    _ENCODERS["br"] = _brotli
+
+
+@functools.lru_cache(maxsize=32)
+def _compress(body: bytes, encoding: str) -> bytes:
+    """
+    Returns compressed body. Bodies are cached, as servers usually cache compressed
+    responses, so compression does not distort latency of benchmarks.
+    """
+    return _ENCODERS[encoding](body)
+
+
+def synthetic_excursion(index: int, iata_code: str = "AYT") -> dict[str, Any]:
+    """
+    Returns single synthetic ExcursionForIataCode item.
+    """
+    return {
+        "IataCode": iata_code,
+        "Name": f"Excursion {index}",
+        "FinalPrice": 20.0 + index % 180,
+        "PhotoPath": f"https://www.example.com/img/{index}.jpg",
+        "Description": f"Synthetic description of excursion {index}. " * 8,
+        "Currency": "EUR",
+        "IncludedInPrice": ["Guide", "Transport"] if index % 2 else ["Guide"],
+        "IsAllDay": index % 5 == 0,
+        "IsManyDays": index % 17 == 0,
+        "DurationHours": float(2 + index % 6),
+        "DurationDays": float(1 + index % 3),
+        "HideDuration": False,
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving synthetic SeePlaces api responses.
+    """
+    protocol_version = "HTTP/1.1"  # Required for keep-alive connections.
+    disable_nagle_algorithm = True  # Avoid delayed ACK stalls on reused connections.
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.stub.record_connection()
+
+    def do_GET(self) -> None:  # pylint: disable=C0103
+        stub = self.server.stub
+        stub.record_request()
+        if latency := stub.response_latency():
+            time.sleep(latency)
+
+        if stub.status != 200:
+            self._send(stub.status, b"{}")
+            return
+        if stub.take_failure():
+            self._send(stub.failure_status, b"{}")
+            return
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("ExcursionSpokenLanguages"):
+            payload: dict[str, Any] = {"SpokenLanguages": STUB_LANGUAGES}
+        elif url.path.endswith("ExcursionForIataCode"):
+            items = [
+                synthetic_excursion(i, iata_code=_c)
+                for _c in query.get("input.iataCodes", ["AYT"])
+                for i in range(stub.items)
+            ]
+            if not stub.tag_iata_codes:
+                for _i in items:
+                    del _i["IataCode"]
+            payload = {"Items": items, "Total": len(items)}
+        else:
+            self._send(404, b"{}")
+            return
+        body = json.dumps(payload).encode("utf-8")
+        headers = {}
+        if stub.etag:
+            # Responses are deterministic, so hash of body is valid entity tag.
+            etag = headers["ETag"] = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                stub.record_not_modified()
+                self._send(304, b"", headers=headers)
+                return
+        if stub.compression and (encoding := self._content_encoding()) is not None:
+            body = _compress(body, encoding)
+            headers |= {"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+        self._send(200, body, headers=headers)
+
+    def _content_encoding(self) -> str | None:
+        """
+        Returns first supported encoding accepted by client. None for identity.
+        """
+        accepted = [
+            _e.split(";")[0].strip().lower()
+            for _e in self.headers.get("Accept-Encoding", "").split(",")
+        ]
+        return next((_e for _e in accepted if _e in _ENCODERS), None)
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        # Client may close connection early, eg. after timeout or when stream is abandoned.
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            self._write(status, body, headers)
+
+    def _write(self, status: int, body: bytes, headers: dict[str, str] | None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if not (bandwidth := self.server.stub.bandwidth):
+            self.wfile.write(body)
+            return
+        # Slow link. Body is sent in chunks paced by bandwidth.
+        for offset in range(0, len(body), _BANDWIDTH_CHUNK_SIZE):
+            chunk = body[offset:offset + _BANDWIDTH_CHUNK_SIZE]
+            time.sleep(len(chunk) / bandwidth)
+            self.wfile.write(chunk)
+
+    def log_message(self, *args) -> None:  # pylint: disable=W0221
+        pass  # Keep test and benchmark output clean.
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    """
+    Threading server with reference to its StubServer.
+    """
+    daemon_threads = True
+    stub: "StubServer"
+
+
+class StubServer:
+    """
+    Local SeePlaces api stub for tests and benchmarks. Runs in a background thread.
+    """
+    items: int
+    latency: float
+    latency_jitter: float
+    tag_iata_codes: bool
+    status: int
+    etag: bool
+    failures: int
+    failure_status: int
+    error_rate: float
+    compression: bool
+    bandwidth: float | None
+    connections: int
+    requests: int
+    not_modified: int
+
+    _server: _StubHTTPServer | None
+    _thread: threading.Thread | None
+    _lock: threading.Lock
+    _random: random.Random
+
+    def __init__(
+            self,
+            *,  # Require keyword arguments.
+            items: int = 10,  # Number of excursions per airport.
+            latency: float = 0.0,  # Seconds added to every response.
+            tag_iata_codes: bool = True,  # Include airport in excursion items.
+            status: int = 200,  # Status code of all responses. Simulates failing api.
+            etag: bool = True,  # Send ETag and answer matching If-None-Match with 304.
+            failures: int = 0,  # Number of next requests failing with failure_status.
+            failure_status: int = 503,
+            error_rate: float = 0.0,  # Fraction of requests failing randomly with failure_status.
+            latency_jitter: float = 0.0,  # Maximum random seconds added to latency.
+            seed: int | None = None,  # Seed of random failures and jitter.
+            compression: bool = False,  # Compress bodies with encoding accepted by client.
+            bandwidth: float | None = None,  # Bytes per second of simulated slow link.
+    ) -> None:
+        self.items = items
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.tag_iata_codes = tag_iata_codes
+        self.status = status
+        self.etag = etag
+        self.failures = failures
+        self.failure_status = failure_status
+        self.error_rate = error_rate
+        self.compression = compression
+        self.bandwidth = bandwidth
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns base url of running server. Ends with trailing slash.
+        """
+        if self._server is None:
+            raise RuntimeError("Stub server is not running.")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubServer":
+        """
+        Starts server on random free local port.
+        """
+        self._server = _StubHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},  # Fast shutdown.
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops server and waits for its thread.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def reset_counters(self) -> None:
+        """
+        Resets connection and request counters.
+        """
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.not_modified = 0
+
+    def record_connection(self) -> None:
+        """
+        Counts accepted TCP connection.
+        """
+        with self._lock:
+            self.connections += 1
+
+    def record_request(self) -> None:
+        """
+        Counts handled HTTP request.
+        """
+        with self._lock:
+            self.requests += 1
+
+    def take_failure(self) -> bool:
+        """
+        Returns True if current request should fail. Counts down remaining failures,
+        then fails randomly with error rate.
+        """
+        with self._lock:
+            if self.failures <= 0:
+                return self.error_rate > 0 and self._random.random() < self.error_rate
+            self.failures -= 1
+            return True
+
+    def response_latency(self) -> float:
+        """
+        Returns seconds to wait before current response. Jitter is uniformly distributed.
+        """
+        if not self.latency_jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.latency_jitter)
+
+    def record_not_modified(self) -> None:
+        """
+        Counts request answered with 304 Not Modified.
+        """
+        with self._lock:
+            self.not_modified += 1
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
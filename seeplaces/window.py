@@ -0,0 +1,199 @@
+import calendar
+import datetime
+from dataclasses import dataclass, field
+
+from seeplaces.excursion import SeePlacesExcursion
+
+
+_interval = tuple[datetime.date, datetime.date]
+"""Type alias for inclusive date interval."""
+
+MAX_WINDOW_RANGES = 8  # Fetched ranges kept per window. Older ranges are dropped.
+
+
+def month_windows(date_from: datetime.date, date_to: datetime.date) -> list[_interval]:
+    """
+    Returns given date range split by calendar months.
+    """
+    windows = []
+    start = date_from
+    while start <= date_to:
+        month_end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+        end = min(month_end, date_to)
+        windows.append((start, end))
+        start = end + datetime.timedelta(days=1)
+    return windows
+
+
+def excursion_key(excursion: SeePlacesExcursion) -> tuple[str, str]:
+    """
+    Returns key identifying the same excursion in different api responses.
+    """
+    return excursion.name, excursion.photo_path
+
+
+def merge_excursions(*excursion_lists: list[SeePlacesExcursion]) -> list[SeePlacesExcursion]:
+    """
+    Returns excursions from all lists without duplicates. Keeps order of first occurrence.
+    """
+    merged: dict[tuple[str, str], SeePlacesExcursion] = {}
+    for excursions in excursion_lists:
+        for _e in excursions:
+            merged.setdefault(excursion_key(_e), _e)
+    return list(merged.values())
+
+
+def _join(intervals: list[_interval]) -> list[_interval]:
+    """
+    Returns sorted intervals with overlapping and adjacent intervals joined.
+    """
+    joined: list[_interval] = []
+    for interval in sorted(intervals):
+        if joined and interval[0] <= joined[-1][1] + datetime.timedelta(days=1):
+            joined[-1] = (joined[-1][0], max(joined[-1][1], interval[1]))
+        else:
+            joined.append(interval)
+    return joined
+
+
+@dataclass
+class FetchedRange:
+    """
+    Excursions returned by api for single date range.
+    """
+    date_from: datetime.date
+    date_to: datetime.date
+    excursions: list[SeePlacesExcursion] = field(default_factory=list)
+
+    @property
+    def interval(self) -> _interval:
+        """
+        Returns fetched dates as interval.
+        """
+        return self.date_from, self.date_to
+
+    def contains(self, date_from: datetime.date, date_to: datetime.date) -> bool:
+        """
+        Returns True if given range lies inside this range.
+        """
+        return self.date_from <= date_from and date_to <= self.date_to
+
+    def inside(self, date_from: datetime.date, date_to: datetime.date) -> bool:
+        """
+        Returns True if this range lies inside given range.
+        """
+        return date_from <= self.date_from and self.date_to <= date_to
+
+
+@dataclass
+class ExcursionWindow:
+    """
+    Excursions of single airport and calendar month, kept per date range fetched from api.
+    Api items do not carry their dates, so excursions of range cannot be filtered from
+    excursions of larger range. Range is answered by fetched range containing it, or by
+    union of fetched ranges inside it which cover all its dates.
+    """
+    ranges: list[FetchedRange] = field(default_factory=list)  # In order of fetching.
+
+    @property
+    def coverage(self) -> list[_interval]:
+        """
+        Returns sorted, non-adjacent intervals of dates fetched from api.
+        """
+        return _join([_r.interval for _r in self.ranges])
+
+    @property
+    def span(self) -> _interval | None:
+        """
+        Returns interval from first to last covered date. None if nothing is covered.
+        """
+        if not (coverage := self.coverage):
+            return None
+        return coverage[0][0], coverage[-1][1]
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Returns True if no fetched range holds any excursion.
+        """
+        return not any(_r.excursions for _r in self.ranges)
+
+    def find(
+            self,
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> list[SeePlacesExcursion] | None:
+        """
+        Returns excursions of given range. Returns None if range cannot be answered
+        from fetched ranges.
+        """
+        # Smallest containing range is the closest answer. Newer range wins ties.
+        containing = [_r for _r in self.ranges if _r.contains(date_from, date_to)]
+        if containing:
+            return min(reversed(containing), key=lambda _r: _r.date_to - _r.date_from).excursions
+        if self.gaps(date_from, date_to):
+            return None
+        return self.excursions_inside(date_from, date_to)
+
+    def excursions_inside(
+            self,
+            date_from: datetime.date,
+            date_to: datetime.date,
+    ) -> list[SeePlacesExcursion]:
+        """
+        Returns excursions of fetched ranges inside given range without duplicates.
+        """
+        inner = sorted(
+            (_r for _r in self.ranges if _r.inside(date_from, date_to)),
+            key=lambda _r: _r.interval,
+        )
+        if len(inner) == 1:
+            return inner[0].excursions
+        return merge_excursions(*(_r.excursions for _r in inner))
+
+    def covers(self, date_from: datetime.date, date_to: datetime.date) -> bool:
+        """
+        Returns True if given range can be answered from fetched ranges.
+        """
+        return not self.gaps(date_from, date_to)
+
+    def gaps(self, date_from: datetime.date, date_to: datetime.date) -> list[_interval]:
+        """
+        Returns intervals of given range to fetch before it can be answered.
+        Only fetched ranges inside given range are used. Ranges overlapping its edges
+        hold excursions of dates outside of it.
+        """
+        if any(_r.contains(date_from, date_to) for _r in self.ranges):
+            return []
+        gaps = []
+        start = date_from
+        for covered_from, covered_to in _join(
+            [_r.interval for _r in self.ranges if _r.inside(date_from, date_to)],
+        ):
+            if covered_from > start:
+                gaps.append((start, covered_from - datetime.timedelta(days=1)))
+            start = covered_to + datetime.timedelta(days=1)
+        if start <= date_to:
+            gaps.append((start, date_to))
+        return gaps
+
+    def merge(
+            self,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            excursions: list[SeePlacesExcursion],
+    ) -> "ExcursionWindow":
+        """
+        Returns new window extended by excursions fetched for given range.
+        Ranges inside given range are replaced, as they were fetched earlier.
+        """
+        return ExcursionWindow(ranges=[
+            *(_r for _r in self.ranges if not _r.inside(date_from, date_to)),
+            FetchedRange(date_from, date_to, excursions),
+        ])
+
+    def latest(self, count: int = MAX_WINDOW_RANGES) -> "ExcursionWindow":
+        """
+        Returns window with given number of most recently fetched ranges.
+        """
+        return ExcursionWindow(ranges=self.ranges[-count:])
@@ -1,9 +1,19 @@
 import os
+from collections.abc import Iterator
 from typing import Any
 
 import pytest
 
 from seeplaces.service import SeePlacesOptions
+from seeplaces.testing import StubServer
+
+
+@pytest.fixture(autouse=True)
+def language_catalogs(monkeypatch) -> None:
+    """
+    Isolates process-wide language catalogs between tests.
+    """
+    monkeypatch.setattr("seeplaces.languages._catalogs", {})
 
 
 class Cache:
@@ -22,6 +32,49 @@ class Cache:
         self._cache[key] = value
 
 
+class AsyncCache(Cache):
+    """
+    Dummy class to mimic async cache behavior.
+    """
+
+    async def aget(self, key: str, *args, **kwargs) -> Any:
+        return self.get(key, *args, **kwargs)
+
+    async def aset(self, key: str, value: Any, *args, **kwargs) -> None:
+        self.set(key, value, *args, **kwargs)
+
+
+class BatchCache(AsyncCache):
+    """
+    Dummy class to mimic cache with multi-key operations. Records called operations.
+    """
+    calls: list[str]
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get_many(self, keys: list[str], *args, **kwargs) -> dict[str, Any]:
+        self.calls.append("get_many")
+        return {_k: self._cache[_k] for _k in keys if _k in self._cache}
+
+    def set_many(self, data: dict[str, Any], *args, **kwargs) -> list:
+        self.calls.append("set_many")
+        self._cache.update(data)
+        return []
+
+    def delete_many(self, keys: list[str], *args, **kwargs) -> None:
+        self.calls.append("delete_many")
+        for key in keys:
+            self._cache.pop(key, None)
+
+    async def aget_many(self, keys: list[str], *args, **kwargs) -> dict[str, Any]:
+        return self.get_many(keys, *args, **kwargs)
+
+    async def aset_many(self, data: dict[str, Any], *args, **kwargs) -> list:
+        return self.set_many(data, *args, **kwargs)
+
+
 @pytest.fixture
 def cache() -> Cache:
     """
@@ -30,6 +83,22 @@ def cache() -> Cache:
     return Cache()
 
 
+@pytest.fixture
+def async_cache() -> AsyncCache:
+    """
+    Dummy async cache.
+    """
+    return AsyncCache()
+
+
+@pytest.fixture
+def batch_cache() -> BatchCache:
+    """
+    Dummy cache with multi-key operations.
+    """
+    return BatchCache()
+
+
 @pytest.fixture
 def options() -> SeePlacesOptions:
     """
@@ -43,3 +112,28 @@ def options() -> SeePlacesOptions:
         )
     except KeyError as exc:
         raise ValueError(f"Missing configuration key in environment: {exc}") from exc
+
+
+@pytest.fixture
+def server_items() -> int:
+    """
+    Number of excursions per airport served by stub server. Override to serve other number.
+    """
+    return 2
+
+
+@pytest.fixture
+def server(server_items) -> Iterator[StubServer]:
+    """
+    Stub SeePlaces api running in background thread.
+    """
+    with StubServer(items=server_items) as server:
+        yield server
+
+
+@pytest.fixture
+def server_options(server) -> SeePlacesOptions:
+    """
+    Options of service calling stub server.
+    """
+    return SeePlacesOptions(base_url=server.base_url, api_version="1.0", scope_id="123456")
@@ -0,0 +1,311 @@
+import asyncio
+import dataclasses
+import datetime
+import time
+
+import httpx
+import pytest
+
+from seeplaces.async_service import AsyncSeePlacesService
+from seeplaces.cache import CacheEntry
+from seeplaces.exceptions import ApiConnectionError, DeadlineExceededError
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.window import ExcursionWindow
+
+
+class TestAsyncSeePlacesService:
+
+    @pytest.fixture
+    def server_items(self) -> int:
+        return 3
+
+    def test_get_excursions(self, server, server_options, async_cache):
+
+        async def _get_excursions() -> list[list[SeePlacesExcursion]]:
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                return await asyncio.gather(*(
+                    service.get_excursions(
+                        iata_code=iata_code,
+                        date_from=datetime.date(2023, 1, 1),
+                        date_to=datetime.date(2023, 1, 7),
+                        spoken_languages=["Slovak"],
+                    )
+                    for iata_code in ("AYT", "BTS", "VIE")
+                ))
+
+        results = asyncio.run(_get_excursions())
+        assert len(results) == 3
+        for excursions in results:
+            assert len(excursions) == 3
+            assert all(isinstance(_e, SeePlacesExcursion) for _e in excursions)
+        # Concurrent tasks share connection pool.
+        assert server.connections < server.requests
+
+    def test_get_excursions__from_cache(self, server_options, async_cache):
+        service = AsyncSeePlacesService(options=server_options, cache=async_cache)
+        cached_value = "cached_value"
+        date_from = datetime.date(2023, 1, 1)
+        async_cache.set(service._excursions_cache_key("AYT", date_from, ["Slovak"]), cached_value)
+
+        excursions = asyncio.run(service.get_excursions(
+            iata_code="AYT",
+            date_from=date_from,
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        ))
+        assert excursions == cached_value
+
+    def test__get_language_ids(self, server_options):
+        service = AsyncSeePlacesService(options=server_options)
+        assert asyncio.run(service._get_language_ids(["Slovak", "Czech"])) == {"lang-sk", "lang-cz"}
+
+    def test__get_language_ids__shared_catalog(self, server, server_options):
+        async def _get_language_ids():
+            async with AsyncSeePlacesService(options=server_options) as first:
+                await first._get_language_ids(["Slovak"])
+            async with AsyncSeePlacesService(options=server_options) as second:
+                return await second._get_language_ids(["Czech", "English"])
+
+        assert asyncio.run(_get_language_ids()) == {"lang-cz", "lang-en"}
+        assert server.requests == 1
+
+    def test_iter_excursions(self, server, server_options, async_cache):
+        async def _iter_excursions() -> list[str]:
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                return [
+                    _e.name
+                    async for _e in service.iter_excursions(
+                        iata_code="AYT",
+                        date_from=datetime.date(2023, 1, 1),
+                        date_to=datetime.date(2023, 1, 7),
+                        spoken_languages=["Slovak"],
+                    )
+                ]
+
+        assert asyncio.run(_iter_excursions()) == ["Excursion 0", "Excursion 1", "Excursion 2"]
+        assert asyncio.run(_iter_excursions()) == ["Excursion 0", "Excursion 1", "Excursion 2"]
+        assert server.requests == 2  # Languages and excursions. Second run is served from cache.
+
+    def test_aclose(self, server_options):
+        service = AsyncSeePlacesService(options=server_options)
+        asyncio.run(service.aclose())
+        assert service._client.is_closed
+
+    def test_aclose__client_of_caller(self, server_options):
+
+        async def _run() -> bool:
+            async with httpx.AsyncClient() as client:
+                async with AsyncSeePlacesService(options=server_options, client=client):
+                    pass
+                return client.is_closed
+
+        assert not asyncio.run(_run())  # Closed by caller.
+
+    def test__call_api__not_found(self, server_options):
+        service = AsyncSeePlacesService(options=server_options)
+        with pytest.raises(ApiConnectionError):
+            asyncio.run(service._call_api(endpoint="api/Unknown", query={}, headers={}))
+
+    def test_get_excursions_many(self, server, server_options, async_cache):
+        service = AsyncSeePlacesService(options=server_options, cache=async_cache)
+        result = asyncio.run(service.get_excursions_many(
+            iata_codes=["AYT", "BTS"],
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        ))
+        assert list(result) == ["AYT", "BTS"]
+        assert all(len(_e) == 3 for _e in result.values())
+        assert server.requests == 2
+
+    def test_get_excursions_many__untagged_items(self, server, server_options):
+        server.tag_iata_codes = False
+
+        async def _get_excursions_many() -> list[dict[str, list[SeePlacesExcursion]]]:
+            async with AsyncSeePlacesService(options=server_options) as service:
+                return [
+                    await service.get_excursions_many(
+                        iata_codes=["AYT", "BTS"],
+                        date_from=datetime.date(2023, 1, day),
+                        date_to=datetime.date(2023, 1, day + 6),
+                        spoken_languages=["Slovak"],
+                    )
+                    for day in (1, 8)
+                ]
+
+        for result in asyncio.run(_get_excursions_many()):
+            assert all(len(_e) == 3 for _e in result.values())
+        # Combined call cannot be split. Later calls do not combine airports during pause.
+        assert server.requests == 4 + 2
+
+    def test_get_excursions_many__normalized_codes(self, server, server_options):
+        service = AsyncSeePlacesService(options=server_options)
+        result = asyncio.run(service.get_excursions_many(
+            iata_codes=["ayt", " AYT ", "bts"],
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        ))
+        assert list(result) == ["AYT", "BTS"]
+        assert all(len(_e) == 3 for _e in result.values())
+        assert server.requests == 2  # Languages and single combined call.
+
+    def test_get_excursions_many__coalesced(self, server, server_options):
+        server.latency = 0.1
+
+        async def _get_excursions_many() -> list[dict[str, list[SeePlacesExcursion]]]:
+            async with AsyncSeePlacesService(options=server_options) as service:
+                return await asyncio.gather(*(
+                    service.get_excursions_many(
+                        iata_codes=["AYT", "BTS"],
+                        date_from=datetime.date(2023, 1, 1),
+                        date_to=datetime.date(2023, 1, 7),
+                        spoken_languages=["Slovak"],
+                    )
+                    for _ in range(5)
+                ))
+
+        results = asyncio.run(_get_excursions_many())
+        assert all(_r["AYT"] is results[0]["AYT"] for _r in results)
+        assert server.requests == 2  # Languages and single combined call.
+
+    def test_get_excursions_many__batch_cache(self, server, server_options, batch_cache):
+        service = AsyncSeePlacesService(options=server_options, cache=batch_cache)
+        for _ in range(2):
+            result = asyncio.run(service.get_excursions_many(
+                iata_codes=["AYT", "BTS"],
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            ))
+            assert all(len(_e) == 3 for _e in result.values())
+        # Missing airports are read again before api call.
+        assert batch_cache.calls == ["get_many", "get_many", "set_many", "get_many"]
+        assert server.requests == 2
+
+    def test_get_excursions__months_read_together(self, server, server_options, batch_cache):
+        service = AsyncSeePlacesService(options=server_options, cache=batch_cache)
+        for _ in range(2):
+            excursions = asyncio.run(service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 25),
+                date_to=datetime.date(2023, 2, 5),
+                spoken_languages=["Slovak"],
+            ))
+            assert len(excursions) == 3
+        # Single cache round trip for both months of each call.
+        assert batch_cache.calls == ["get_many", "get_many"]
+        assert server.requests == 3
+
+    def test_get_excursions__other_dates_not_served(self, server, server_options, async_cache):
+
+        async def _get_excursions(service, day_from, day_to):
+            return await service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, day_from),
+                date_to=datetime.date(2023, 1, day_to),
+                spoken_languages=["Slovak"],
+            )
+
+        async def _get_all():
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                cached = await _get_excursions(service, 1, 7)
+                server.items = 0
+                return cached, await _get_excursions(service, 20, 25)
+
+        cached, other = asyncio.run(_get_all())
+        assert len(cached) == 3
+        assert other == []
+        assert server.requests == 3
+
+    def test_get_excursions__deadline_not_cached(self, server, server_options, async_cache):
+        server_options.error_cache_ttl = 60
+
+        async def _get_excursions(service, deadline=None):
+            return await service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+                deadline=deadline,
+            )
+
+        async def _get_all():
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                server.latency = 0.3
+                with pytest.raises(DeadlineExceededError):
+                    await _get_excursions(service, deadline=0.1)
+                # Deadline of previous caller does not block later calls.
+                server.latency = 0.0
+                return await _get_excursions(service)
+
+        assert len(asyncio.run(_get_all())) == 3
+
+    def test_get_excursions__two_gaps(self, server, server_options, async_cache):
+
+        async def _get_excursions(service, day_from, day_to):
+            return await service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, day_from),
+                date_to=datetime.date(2023, 1, day_to),
+                spoken_languages=["Slovak"],
+            )
+
+        async def _get_all():
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                await _get_excursions(service, 8, 14)
+                return await _get_excursions(service, 1, 21)
+
+        assert len(asyncio.run(_get_all())) == 3
+        assert server.requests == 4
+        assert server.not_modified == 0
+
+    def test_get_excursions__stale_while_revalidate(self, server, server_options, async_cache):
+        service = AsyncSeePlacesService(options=server_options, cache=async_cache)
+        date_from = datetime.date(2023, 1, 1)
+        cache_key = service._excursions_cache_key("AYT", date_from, ["Slovak"])
+        window = ExcursionWindow().merge(date_from, datetime.date(2023, 1, 7), ["stale"])
+        async_cache.set(
+            cache_key, CacheEntry(window, stale_at=time.time() - 1, expires_at=time.time() + 60),
+        )
+
+        async def _get_excursions():
+            excursions = await service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            )
+            await asyncio.gather(*service._refreshing.values())
+            return excursions
+
+        assert asyncio.run(_get_excursions()) == ["stale"]
+        assert len(async_cache.get(cache_key).value.ranges[0].excursions) == 3
+
+    def test_get_excursions__revalidate(self, server, server_options, async_cache):
+        date_from = datetime.date(2023, 1, 1)
+
+        async def _get_excursions(service):
+            excursions = await service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            )
+            await asyncio.gather(*service._refreshing.values())
+            return excursions
+
+        async def _revalidate():
+            async with AsyncSeePlacesService(options=server_options, cache=async_cache) as service:
+                excursions = await _get_excursions(service)
+                cache_key = service._excursions_cache_key("AYT", date_from, ["Slovak"])
+                entry = async_cache.get(cache_key)
+                async_cache.set(cache_key, dataclasses.replace(entry, stale_at=time.time() - 1))
+                assert await _get_excursions(service) is excursions
+                return service, async_cache.get(cache_key), excursions
+
+        service, entry, excursions = asyncio.run(_revalidate())
+        assert entry.value.ranges[0].excursions is excursions
+        assert not entry.is_stale()
+        assert service.revalidation_stats.not_modified == 1
+        assert server.not_modified == 1
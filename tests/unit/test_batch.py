@@ -0,0 +1,77 @@
+import pytest
+
+from seeplaces.batch import ExcursionBatch, PriceStats
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.testing import synthetic_excursion
+
+
+@pytest.fixture
+def items() -> list[dict]:
+    items = [synthetic_excursion(_i) for _i in range(10)]
+    items[3]["Currency"] = "CZK"
+    return items
+
+
+@pytest.fixture
+def batch(items) -> ExcursionBatch:
+    return ExcursionBatch.from_items(items)
+
+
+class TestExcursionBatch:
+
+    def test_from_items(self, items, batch):
+        assert len(batch) == 10
+        excursion = batch[5]
+        assert isinstance(excursion, SeePlacesExcursion)
+        assert excursion.name == "Excursion 5"
+        assert excursion.included_in_price == ("Guide", "Transport")
+        expected_duration = SeePlacesExcursion(**items[5]).get_duration_display()
+        assert excursion.get_duration_display() == expected_duration
+        assert batch.currencies.count("CZK") == 1
+
+    def test_from_excursions(self, items):
+        excursions = [SeePlacesExcursion(**_i) for _i in items]
+        batch = ExcursionBatch.from_excursions(excursions)
+        for excursion, materialized in zip(excursions, batch):
+            assert materialized.name == excursion.name
+            assert materialized.currency == excursion.currency
+            assert materialized.get_duration_display() == excursion.get_duration_display()
+
+    def test_filter(self, batch):
+        result = batch.filter(min_price=22, max_price=27, currency="EUR")
+        assert [_e.final_price for _e in result] == [22, 24, 25, 26, 27]
+        assert not batch.filter(currency="USD")
+        assert [_e.name for _e in batch.filter(all_day=True)] == ["Excursion 0", "Excursion 5"]
+        assert list(batch.filter(max_duration_hours=2).duration_hours) == [2.0, 2.0]
+
+    def test_sort(self, batch):
+        result = batch.sort(descending=True)
+        assert list(result.final_price) == sorted(batch.final_price, reverse=True)
+        assert result[0].name == "Excursion 9"
+
+        # Stable for equal values.
+        result = batch.sort("duration_hours")
+        assert [_e.name for _e in result][:2] == ["Excursion 0", "Excursion 6"]
+
+        with pytest.raises(ValueError):
+            batch.sort("name")
+
+    def test_top_k(self, batch):
+        assert [_e.name for _e in batch.top_k(2)] == ["Excursion 0", "Excursion 1"]
+        assert [_e.name for _e in batch.top_k(2, descending=True)] == ["Excursion 9", "Excursion 8"]
+        # Of equal values, earlier excursions are selected. Same order as stable sort.
+        assert [_e.name for _e in batch.top_k(3, "duration_hours")] == [
+            _e.name for _e in batch.sort("duration_hours")
+        ][:3]
+        assert len(batch.top_k(20)) == 10
+        assert not batch.top_k(0)
+
+    def test_empty(self):
+        batch = ExcursionBatch.from_items([])
+        assert not batch
+        assert not batch.filter(min_price=10).sort().top_k(5)
+        assert batch.price_stats() is None
+
+    def test_price_stats(self, batch):
+        assert batch.price_stats() == PriceStats(count=10, min=20, max=29, mean=24.5, median=24.5)
+        assert batch.filter(currency="USD").price_stats() is None
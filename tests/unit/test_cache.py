@@ -0,0 +1,163 @@
+import pytest
+
+from seeplaces.cache import CacheEntry, LocalCache, TieredCache, batch_delete, batch_get, batch_set
+
+
+class _Clock:
+    """
+    Controllable replacement of time.monotonic.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("seeplaces.cache.time.monotonic", clock)
+    return clock
+
+
+class TestLocalCache:
+
+    def test_get(self):
+        local = LocalCache()
+        local.set("key", "value", timeout=10)
+        assert local.get("key") == "value"
+        assert local.get("missing", "default") == "default"
+        assert (local.stats.hits, local.stats.misses) == (1, 1)
+
+    def test_get__expired(self, clock):
+        local = LocalCache()
+        local.set("key", "value", timeout=10)
+        clock.now += 11
+        assert local.get("key") is None
+        assert len(local) == 0
+
+    @pytest.mark.parametrize(
+        "timeout, expected_output",
+        [
+            pytest.param(0, "value", id="default_timeout"),
+            pytest.param(None, "value", id="no_expiry"),
+            pytest.param(-1, None, id="negative_timeout"),
+        ]
+    )
+    def test_set__timeout(self, clock, timeout, expected_output):
+        local = LocalCache(default_timeout=100)
+        local.set("key", "value", timeout=timeout)
+        clock.now += 50
+        assert local.get("key") == expected_output
+
+    def test_set__lru_eviction(self):
+        local = LocalCache(max_entries=2)
+        local.set("a", 1, timeout=10)
+        local.set("b", 2, timeout=10)
+        local.get("a")  # Mark as recently used.
+        local.set("c", 3, timeout=10)
+        assert local.get("b") is None
+        assert local.get("a") == 1
+        assert local.get("c") == 3
+
+
+    def test_get_many(self, clock):
+        local = LocalCache()
+        local.set_many({"a": 1, "b": None, "c": 3}, timeout=10)
+        assert local.get_many(["a", "b", "missing"]) == {"a": 1, "b": None}
+        local.delete_many(["a", "missing"])
+        clock.now += 10
+        assert local.get_many(["a", "c"]) == {}
+        assert (local.stats.hits, local.stats.misses) == (2, 3)
+
+
+class TestTieredCache:
+
+    def test_get__from_remote(self, cache):
+        tiered = TieredCache(local=LocalCache(), remote=cache)
+        cache.set("key", "value")
+
+        assert tiered.get("key") == "value"
+        assert tiered.get("key") == "value"
+        assert tiered.get("missing") is None
+        stats = tiered.stats
+        assert (stats["local"].hits, stats["local"].misses) == (1, 2)
+        assert (stats["remote"].hits, stats["remote"].misses) == (1, 1)
+
+    def test_set__local_timeout(self, clock, cache):
+        tiered = TieredCache(local=LocalCache(), remote=cache, local_timeout=60)
+        tiered.set("short", "value", timeout=30)
+        tiered.set("long", "value", timeout=3600)
+        assert cache.get("long") == "value"
+
+        clock.now += 45
+        assert tiered.local.get("short") is None
+        assert tiered.local.get("long") == "value"
+        clock.now += 30
+        assert tiered.local.get("long") is None
+
+
+    def test_get_many(self, batch_cache):
+        tiered = TieredCache(local=LocalCache(), remote=batch_cache)
+        batch_cache.set_many({"a": 1, "b": 2})
+        tiered.set("c", 3)
+
+        assert tiered.get_many(["a", "b", "c", "missing"]) == {"a": 1, "b": 2, "c": 3}
+        assert tiered.get_many(["a", "b"]) == {"a": 1, "b": 2}
+        # Only keys missing in local tier are read from remote tier.
+        assert batch_cache.calls == ["set_many", "get_many"]
+        assert (tiered.stats["remote"].hits, tiered.stats["remote"].misses) == (2, 1)
+
+        tiered.delete_many(["a"])
+        assert tiered.get("a") is None
+
+
+class TestBatchOperations:
+
+    def test_fallback(self, cache):
+        batch_set(cache, {"a": 1, "b": 2}, timeout=10)
+        assert batch_get(cache, ["a", "b", "missing"]) == {"a": 1, "b": 2}
+
+        local = LocalCache()  # Has delete, but batch_delete prefers delete_many.
+        local.set("a", 1)
+        batch_delete(local, ["a"])
+        assert local.get("a") is None
+
+    def test_get_many(self, batch_cache):
+        batch_set(batch_cache, {"a": 1}, timeout=10)
+        assert batch_get(batch_cache, ["a", "missing"]) == {"a": 1}
+        assert batch_cache.calls == ["set_many", "get_many"]
+
+
+class TestCacheEntry:
+
+    @pytest.fixture
+    def wall_clock(self, monkeypatch) -> _Clock:
+        clock = _Clock()
+        monkeypatch.setattr("seeplaces.cache.time.time", clock)
+        return clock
+
+    def test_create(self, wall_clock):
+        entry = CacheEntry.create("value", ttl=10, stale_ttl=20)
+        assert not entry.is_stale()
+        wall_clock.now += 15
+        assert entry.is_stale()
+        assert not entry.is_expired()
+        wall_clock.now += 20
+        assert entry.is_expired()
+
+    @pytest.mark.parametrize(
+        "beta, fetch_duration, expected_output",
+        [
+            pytest.param(0.0, 100.0, False, id="early_refresh_disabled"),
+            pytest.param(1.0, 0.0, False, id="unknown_fetch_duration"),
+            pytest.param(1000.0, 100.0, True, id="fetch_longer_than_ttl"),
+        ]
+    )
+    def test_should_refresh(self, wall_clock, beta, fetch_duration, expected_output):
+        entry = CacheEntry.create("value", ttl=10, fetch_duration=fetch_duration)
+        assert entry.should_refresh(beta=beta) == expected_output
+        wall_clock.now += 10
+        assert entry.should_refresh(beta=beta)
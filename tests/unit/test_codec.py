@@ -0,0 +1,117 @@
+import datetime
+import pickle
+
+import pytest
+
+from seeplaces import codec
+from seeplaces.cache import CacheEntry, ResponseValidators
+from seeplaces.codec import CodecCache
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.service import SeePlacesService
+from seeplaces.testing import synthetic_excursion
+from seeplaces.window import ExcursionWindow
+
+
+@pytest.fixture
+def entry() -> CacheEntry:
+    excursions = [SeePlacesExcursion(**synthetic_excursion(_i)) for _i in range(20)]
+    window = ExcursionWindow().merge(
+        datetime.date(2023, 1, 1), datetime.date(2023, 1, 7), excursions[:12],
+    ).merge(
+        datetime.date(2023, 1, 5), datetime.date(2023, 1, 10), excursions[8:],
+    )
+    return CacheEntry(value=window, stale_at=100.5, expires_at=200.5, fetch_duration=0.25)
+
+
+class TestCodec:
+
+    @pytest.mark.parametrize("compress", [True, False])
+    def test_encode(self, entry, compress):
+        data = codec.encode(entry, compress=compress)
+        decoded = codec.decode(data)
+        assert (decoded.stale_at, decoded.expires_at) == (100.5, 200.5)
+        assert decoded.fetch_duration == 0.25
+        assert decoded.validators is None
+        assert [(_r.interval, len(_r.excursions)) for _r in decoded.value.ranges] == [
+            (_r.interval, len(_r.excursions)) for _r in entry.value.ranges
+        ]
+        originals = [_e for _r in entry.value.ranges for _e in _r.excursions]
+        decoded_excursions = [_e for _r in decoded.value.ranges for _e in _r.excursions]
+        for original, excursion in zip(originals, decoded_excursions, strict=True):
+            assert excursion.name == original.name
+            assert excursion.final_price == original.final_price
+            assert excursion.included_in_price == original.included_in_price
+            assert excursion.get_duration_display() == original.get_duration_display()
+
+    @pytest.mark.parametrize(
+        "validators",
+        [
+            ResponseValidators(etag='"abc"', last_modified=None, content_hash="0123"),
+            ResponseValidators(etag=None, last_modified="Sun, 01 Jan 2023 00:00:00 GMT"),
+        ],
+    )
+    def test_encode__validators(self, entry, validators):
+        entry.validators = validators
+        assert codec.decode(codec.encode(entry)).validators == validators
+
+    def test_encode__compact(self, entry):
+        assert len(codec.encode(entry, compress=False)) < len(pickle.dumps(entry))
+        assert len(codec.encode(entry)) < len(codec.encode(entry, compress=False))
+
+    def test_encode__languages(self):
+        index = {"Slovak": "lang-sk", "Čeština": "lang-cz"}
+        assert codec.decode(codec.encode(index)) == index
+
+    def test_encode__unsupported(self):
+        assert codec.encode("error message") is None
+        assert codec.encode(["legacy", "list"]) is None
+
+    def test_decode__other_version(self, monkeypatch, entry):
+        data = codec.encode(entry)
+        monkeypatch.setattr(codec, "SCHEMA_VERSION", codec.SCHEMA_VERSION + 1)
+        assert codec.decode(data) is None
+
+    def test_decode__corrupted(self, entry):
+        assert codec.decode(codec.encode(entry)[:-10]) is None
+
+
+class TestCodecCache:
+
+    def test_get(self, monkeypatch, cache, entry):
+        codec_cache = CodecCache(cache)
+        codec_cache.set("exc", entry)
+        codec_cache.set("err", "error message")
+        assert isinstance(cache.get("exc"), bytes)
+        assert codec_cache.get("exc").value.coverage == entry.value.coverage
+        assert codec_cache.get("err") == "error message"
+        assert codec_cache.get("missing", "default") == "default"
+
+        # Entries of other schema version are cache misses.
+        monkeypatch.setattr(codec, "SCHEMA_VERSION", codec.SCHEMA_VERSION + 1)
+        assert codec_cache.get("exc") is None
+
+    def test_get_many(self, monkeypatch, batch_cache, entry):
+        codec_cache = CodecCache(batch_cache)
+        codec_cache.set_many({"exc": entry, "err": "error message"}, timeout=10)
+        assert isinstance(batch_cache.get("exc"), bytes)
+        values = codec_cache.get_many(["exc", "err", "missing"])
+        assert values["exc"].value.coverage == entry.value.coverage
+        assert values["err"] == "error message"
+        assert "missing" not in values
+
+        # Entries of other schema version are left out.
+        monkeypatch.setattr(codec, "SCHEMA_VERSION", codec.SCHEMA_VERSION + 1)
+        assert list(codec_cache.get_many(["exc", "err"])) == ["err"]
+
+    def test_service(self, server, server_options, cache):
+        service = SeePlacesService(options=server_options, cache=CodecCache(cache))
+        for _ in range(2):
+            excursions = service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            )
+            assert [_e.name for _e in excursions] == ["Excursion 0", "Excursion 1"]
+        assert server.requests == 2  # Languages and excursions.
+        assert all(isinstance(_v, bytes) for _v in cache._cache.values())
@@ -1,45 +1,98 @@
+import pickle
+
 import pytest
 
 from seeplaces.excursion import SeePlacesExcursion
 
 
-class TestSeePlacesExcursion:
+def _excursion(**kwargs) -> SeePlacesExcursion:
+    return SeePlacesExcursion(**{
+        "Name": "Test Excursion",
+        "FinalPrice": 100.0,
+        "PhotoPath": "https://example.com/img.jpg",
+        "Description": "Test description.",
+        "Currency": "EUR",
+        "IncludedInPrice": ["Guide"],
+        "IsAllDay": False,
+        "IsManyDays": False,
+        "DurationHours": 0.0,
+        "DurationDays": 0.0,
+        "HideDuration": False,
+    } | kwargs)
 
-    @pytest.fixture
-    def excursion(self) -> SeePlacesExcursion:
-        return SeePlacesExcursion(
-            Name="Test Excursion",
-            FinalPrice=100.0,
-            PhotoPath="https://example.com/img.jpg",
-            Description="Test description.",
-            Currency="EUR",
-            IncludedInPrice=["Guide"],
-            IsAllDay=False,
-            IsManyDays=False,
-            DurationHours=0.0,
-            DurationDays=0.0,
-            HideDuration=False,
-        )
+
+class TestSeePlacesExcursion:
 
     @pytest.mark.parametrize(
         "duration_settings, expected_output",
         [
             pytest.param(
-                {"hide_duration": True}, "Nie je k dispozícii", id="unavailable"
+                {"HideDuration": True}, "Nie je k dispozícii", id="unavailable"
             ),
             pytest.param(
-                {"is_many_days": True, "duration_days": 5.5}, "Počet dní: 5.50", id="multiple_days"
+                {"IsManyDays": True, "DurationDays": 5.5}, "Počet dní: 5.50", id="multiple_days"
             ),
             pytest.param(
-                {"is_all_day": True}, "Celý deň", id="all_day"
+                {"IsAllDay": True}, "Celý deň", id="all_day"
             ),
             pytest.param(
-                {"duration_hours": 5.5}, "Počet hodín: 5.50", id="multiple_hours"
+                {"DurationHours": 5.5}, "Počet hodín: 5.50", id="multiple_hours"
             ),
         ]
     )
-    def test_get_duration_display(self, excursion, duration_settings, expected_output):
-        for k, v in duration_settings.items():
-            setattr(excursion._duration, k, v)  # Update duration with given settings.
-            
+    def test_get_duration_display(self, duration_settings, expected_output):
+        excursion = _excursion(**duration_settings)  # Build with given duration settings.
         assert excursion.get_duration_display() == expected_output
+
+    def test_compact(self):
+        first = _excursion(IncludedInPrice=["Guide", "Transport"])
+        second = _excursion(Name="Other Excursion", Currency="".join(["E", "UR"]))
+        assert not hasattr(first, "__dict__")
+        assert first.included_in_price == ("Guide", "Transport")
+        assert first.currency is second.currency
+        assert first.included_in_price[0] is second.included_in_price[0]
+        assert first._duration is second._duration
+
+    def test_pickle(self):
+        excursion = pickle.loads(pickle.dumps(_excursion(IsAllDay=True)))
+        assert excursion.name == "Test Excursion"
+        assert excursion.included_in_price == ("Guide",)
+        assert excursion.get_duration_display() == "Celý deň"
+
+    def test_pickle__legacy(self, monkeypatch):
+        class _ExcursionDuration:  # Layout before slots.
+            __module__ = "seeplaces.excursion"
+            __qualname__ = "_ExcursionDuration"
+
+        class SeePlacesExcursion:  # pylint: disable=W0621
+            __module__ = "seeplaces.excursion"
+            __qualname__ = "SeePlacesExcursion"
+
+        duration = _ExcursionDuration()
+        duration.__dict__.update(
+            is_all_day=True,
+            is_many_days=False,
+            duration_hours=0.0,
+            duration_days=0.0,
+            hide_duration=False,
+        )
+        legacy = SeePlacesExcursion()
+        legacy.__dict__.update(
+            name="Test Excursion",
+            final_price=100.0,
+            photo_path="https://example.com/img.jpg",
+            description="Test description.",
+            currency="EUR",
+            included_in_price=["Guide"],
+            _duration=duration,
+        )
+        with monkeypatch.context() as patch:
+            for cls in (_ExcursionDuration, SeePlacesExcursion):
+                patch.setattr(f"seeplaces.excursion.{cls.__name__}", cls)
+            data = pickle.dumps([legacy])
+
+        excursion = pickle.loads(data)[0]
+        assert excursion.name == "Test Excursion"
+        assert excursion.included_in_price == ("Guide",)
+        assert excursion.get_duration_display() == "Celý deň"
+        assert excursion._duration is _excursion(IsAllDay=True)._duration
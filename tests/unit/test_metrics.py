@@ -0,0 +1,200 @@
+import asyncio
+import datetime
+import math
+
+import pytest
+
+from seeplaces.async_service import AsyncSeePlacesService
+from seeplaces.cache import LocalCache
+from seeplaces.exceptions import ApiConnectionError
+from seeplaces.metrics import (
+    API_CALLS,
+    BUILD_SECONDS,
+    CACHE_LOOKUPS,
+    CACHE_SECONDS,
+    DECODE_SECONDS,
+    HTTP_SECONDS,
+    LANGUAGES_SECONDS,
+    RESPONSE_BYTES,
+    WIRE_BYTES,
+    Histogram,
+    InMemoryCollector,
+)
+from seeplaces.service import SeePlacesService
+
+
+EXCURSIONS = "ExcursionForIataCode"
+LANGUAGES = "ExcursionSpokenLanguages"
+
+
+@pytest.fixture
+def server_items() -> int:
+    return 3
+
+
+def _lookup_kwargs() -> dict:
+    return {
+        "iata_code": "AYT",
+        "date_from": datetime.date(2023, 1, 1),
+        "date_to": datetime.date(2023, 1, 7),
+        "spoken_languages": ["Slovak"],
+    }
+
+
+class TestHistogram:
+
+    def test_quantile(self):
+        histogram = Histogram(bounds=(1.0, 2.0, 4.0))
+        for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+            histogram.observe(value)
+        assert histogram.bucket_counts == [2, 1, 1, 1]
+        assert histogram.count == 5
+        assert histogram.sum == 16.0
+        assert histogram.quantile(0.4) == 1.0
+        assert histogram.quantile(0.5) == 2.0
+        assert histogram.quantile(0.99) == math.inf
+
+    def test_quantile__empty(self):
+        assert Histogram(bounds=(1.0,)).quantile(0.5) == 0.0
+
+
+class TestInMemoryCollector:
+
+    def test_counter(self):
+        collector = InMemoryCollector()
+        collector.increment(API_CALLS, {"endpoint": "a", "result": "ok"})
+        collector.increment(API_CALLS, {"result": "ok", "endpoint": "a"}, value=2)
+        collector.increment(API_CALLS, {"endpoint": "b", "result": "error"})
+        assert collector.counter(API_CALLS, endpoint="a", result="ok") == 3
+        assert collector.counter(API_CALLS) == 4
+        assert collector.counter(CACHE_LOOKUPS) == 0
+
+        collector.reset()
+        assert collector.counter(API_CALLS) == 0
+
+    def test_histogram__buckets(self):
+        collector = InMemoryCollector()
+        collector.observe(HTTP_SECONDS, 0.01, {})
+        collector.observe(RESPONSE_BYTES, 1000, {})
+        assert collector.histogram(HTTP_SECONDS).bounds == collector.duration_buckets
+        assert collector.histogram(RESPONSE_BYTES).bounds == collector.size_buckets
+        assert collector.histogram(DECODE_SECONDS) is None
+
+    def test_to_prometheus(self):
+        collector = InMemoryCollector(duration_buckets=(0.1, 1.0))
+        collector.observe(HTTP_SECONDS, 0.5, {"endpoint": 'a"b'})
+        collector.increment(CACHE_LOOKUPS, {"family": "exc", "result": "hit"})
+        assert collector.to_prometheus() == (
+            "# TYPE seeplaces_http_seconds histogram\n"
+            'seeplaces_http_seconds_bucket{endpoint="a\\"b",le="0.1"} 0\n'
+            'seeplaces_http_seconds_bucket{endpoint="a\\"b",le="1.0"} 1\n'
+            'seeplaces_http_seconds_bucket{endpoint="a\\"b",le="+Inf"} 1\n'
+            'seeplaces_http_seconds_sum{endpoint="a\\"b"} 0.5\n'
+            'seeplaces_http_seconds_count{endpoint="a\\"b"} 1\n'
+            "# TYPE seeplaces_cache_lookups_total counter\n"
+            'seeplaces_cache_lookups_total{family="exc",result="hit"} 1.0\n'
+        )
+
+
+class TestServiceInstrumentation:
+
+    def test_get_excursions(self, server, server_options):
+        collector = InMemoryCollector()
+        with SeePlacesService(
+            options=server_options, cache=LocalCache(), instrumentation=collector,
+        ) as service:
+            service.get_excursions(**_lookup_kwargs())
+            service.get_excursions(**_lookup_kwargs())
+
+        assert collector.counter(API_CALLS, endpoint=EXCURSIONS, result="ok") == 1
+        assert collector.counter(API_CALLS, endpoint=LANGUAGES, result="ok") == 1
+        assert collector.counter(CACHE_LOOKUPS, family="exc", result="miss") == 1
+        assert collector.counter(CACHE_LOOKUPS, family="exc", result="hit") == 1
+        assert collector.histogram(HTTP_SECONDS, endpoint=EXCURSIONS).count == 1
+        assert collector.histogram(DECODE_SECONDS, endpoint=EXCURSIONS).count == 1
+        assert collector.histogram(BUILD_SECONDS, endpoint=EXCURSIONS).count == 1
+        assert collector.histogram(LANGUAGES_SECONDS).count == 1
+        assert collector.histogram(CACHE_SECONDS, operation="get").count >= 2
+        assert collector.histogram(CACHE_SECONDS, operation="set").count >= 2
+        assert collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS).sum > 0
+
+    def test_iter_excursions(self, server, server_options):
+        collector = InMemoryCollector()
+        with SeePlacesService(options=server_options, instrumentation=collector) as service:
+            assert len(list(service.iter_excursions(**_lookup_kwargs()))) == 3
+        assert collector.counter(API_CALLS, endpoint=EXCURSIONS, result="ok") == 1
+        assert collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS).sum > 0
+
+    def test_get_excursions__error(self, server, server_options):
+        server.status = 503
+        collector = InMemoryCollector()
+        with SeePlacesService(options=server_options, instrumentation=collector) as service:
+            with pytest.raises(ApiConnectionError):
+                service.get_excursions(**_lookup_kwargs())
+        assert collector.counter(API_CALLS, result="error") == 1
+        assert collector.counter(API_CALLS, result="ok") == 0
+
+    def test_async_get_excursions(self, server, server_options):
+        collector = InMemoryCollector()
+
+        async def _run():
+            async with AsyncSeePlacesService(
+                options=server_options, instrumentation=collector,
+            ) as service:
+                await service.get_excursions(**_lookup_kwargs())
+                assert len([_e async for _e in service.iter_excursions(**_lookup_kwargs())]) == 3
+
+        asyncio.run(_run())
+        assert collector.counter(API_CALLS, endpoint=EXCURSIONS, result="ok") == 2
+        assert collector.histogram(HTTP_SECONDS, endpoint=EXCURSIONS).count == 2
+        assert collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS).count == 2
+        assert collector.histogram(DECODE_SECONDS, endpoint=EXCURSIONS).count == 1
+
+
+class TestCompression:
+
+    @pytest.fixture
+    def server_items(self) -> int:
+        return 200
+
+    @pytest.fixture(autouse=True)
+    def compression(self, server) -> None:
+        server.compression = True
+
+    @pytest.mark.parametrize("stream", [False, True], ids=["buffered", "streamed"])
+    def test_get_excursions(self, server, server_options, stream):
+        collector = InMemoryCollector()
+        with SeePlacesService(options=server_options, instrumentation=collector) as service:
+            if stream:
+                excursions = list(service.iter_excursions(**_lookup_kwargs()))
+            else:
+                excursions = service.get_excursions(**_lookup_kwargs())
+        assert len(excursions) == 200
+
+        wire_bytes = collector.histogram(WIRE_BYTES, endpoint=EXCURSIONS).sum
+        response_bytes = collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS).sum
+        assert 0 < wire_bytes < response_bytes / 5  # Synthetic descriptions compress well.
+
+    def test_get_excursions__disabled(self, server, server_options):
+        server_options.compression = False
+        collector = InMemoryCollector()
+        with SeePlacesService(options=server_options, instrumentation=collector) as service:
+            service.get_excursions(**_lookup_kwargs())
+        wire_bytes = collector.histogram(WIRE_BYTES, endpoint=EXCURSIONS).sum
+        assert wire_bytes == collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS).sum
+
+    def test_async_get_excursions(self, server, server_options):
+        collector = InMemoryCollector()
+
+        async def _run():
+            async with AsyncSeePlacesService(
+                options=server_options, instrumentation=collector,
+            ) as service:
+                assert len(await service.get_excursions(**_lookup_kwargs())) == 200
+                assert len([_e async for _e in service.iter_excursions(**_lookup_kwargs())]) == 200
+
+        asyncio.run(_run())
+        wire_bytes = collector.histogram(WIRE_BYTES, endpoint=EXCURSIONS)
+        response_bytes = collector.histogram(RESPONSE_BYTES, endpoint=EXCURSIONS)
+        assert wire_bytes.count == 2
+        assert 0 < wire_bytes.sum < response_bytes.sum / 5
@@ -0,0 +1,176 @@
+import dataclasses
+import datetime
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from seeplaces.__main__ import _add_months, main
+from seeplaces.cache import LocalCache
+from seeplaces.prefetch import AccessTracker, PrefetchScheduler, PrefetchTarget, month_span
+from seeplaces.service import EXCURSIONS_CACHE_TTL, SeePlacesService
+
+
+CACHE = LocalCache()
+"""Cache used by command line test."""
+
+THIS_MONTH = datetime.date.today().replace(day=1)
+NEXT_MONTH = _add_months(THIS_MONTH, 1)
+
+
+@pytest.fixture
+def service(server_options) -> Iterator[SeePlacesService]:
+    with SeePlacesService(
+        options=server_options, cache=LocalCache(), access_tracker=AccessTracker(),
+    ) as service:
+        yield service
+
+
+class TestAccessTracker:
+
+    def test_hot(self):
+        tracker = AccessTracker()
+        tracker.record(
+            "ayt", NEXT_MONTH, NEXT_MONTH + datetime.timedelta(days=3), ["Slovak", "Czech"],
+        )
+        tracker.record("AYT", NEXT_MONTH, NEXT_MONTH, ["Czech", "Slovak"])
+        tracker.record("BTS", THIS_MONTH, month_span(NEXT_MONTH)[1], ["Slovak"])
+        tracker.record("VIE", _add_months(THIS_MONTH, -1), _add_months(THIS_MONTH, -1), ["Slovak"])
+
+        assert tracker.hot(limit=10) == [
+            PrefetchTarget("AYT", NEXT_MONTH, ("Czech", "Slovak")),
+            PrefetchTarget("BTS", THIS_MONTH, ("Slovak",)),
+            PrefetchTarget("BTS", NEXT_MONTH, ("Slovak",)),
+        ]  # Past months are skipped.
+        assert tracker.hot(limit=1) == [PrefetchTarget("AYT", NEXT_MONTH, ("Czech", "Slovak"))]
+        assert tracker.hot(limit=10, min_count=2) == [
+            PrefetchTarget("AYT", NEXT_MONTH, ("Czech", "Slovak")),
+        ]
+        assert len(tracker) == 3  # Past month is dropped.
+
+    def test_record__max_targets(self):
+        tracker = AccessTracker(max_targets=4)
+        for iata_code in ("AYT", "AYT", "BTS", "BTS", "VIE", "PRG", "BUD"):
+            tracker.record(iata_code, NEXT_MONTH, NEXT_MONTH, ["Slovak"])
+        assert len(tracker) == 2  # Half of limit with the highest counts is kept.
+        assert [_t.iata_code for _t in tracker.hot(limit=10)] == ["AYT", "BTS"]
+
+
+class TestPrefetchTarget:
+
+    def test_create(self, service):
+        target = PrefetchTarget.create(" ayt", NEXT_MONTH + datetime.timedelta(days=3), ["Slovak"])
+        assert target == PrefetchTarget("AYT", NEXT_MONTH, ("Slovak",))
+        # Prefetched target shares cache key with lookups of any case.
+        assert service._excursions_cache_key(target.iata_code, NEXT_MONTH, ["Slovak"]) == (
+            service._excursions_cache_key("ayt", NEXT_MONTH, ["Slovak"])
+        )
+
+
+class TestPrefetchScheduler:
+
+    def test_run_once(self, server, service):
+        targets = [PrefetchTarget.create(_c, NEXT_MONTH, ["Slovak"]) for _c in ("AYT", "BTS")]
+        scheduler = PrefetchScheduler(service, targets)
+        result = scheduler.run_once()
+        assert sorted(_t.iata_code for _t in result.prefetched) == ["AYT", "BTS"]
+        assert server.requests == 3  # Languages and excursions.
+
+        # Prefetched month is served from cache.
+        service.get_excursions(
+            iata_code="AYT",
+            date_from=NEXT_MONTH,
+            date_to=NEXT_MONTH + datetime.timedelta(days=6),
+            spoken_languages=["Slovak"],
+        )
+        assert len(scheduler.run_once().skipped) == 2
+        assert server.requests == 3
+
+    def test_run_once__becomes_stale(self, server, service):
+        targets = [PrefetchTarget.create("AYT", NEXT_MONTH, ["Slovak"])]
+        scheduler = PrefetchScheduler(service, targets)
+        scheduler.run_once()
+
+        # Entry becoming stale within lead time is refreshed conditionally.
+        scheduler.lead_time = EXCURSIONS_CACHE_TTL + 60
+        assert len(scheduler.run_once().prefetched) == 1
+        assert server.not_modified == 1
+        assert service.revalidation_stats.not_modified == 1
+
+    def test_run_once__learned_targets(self, server, service):
+        service.get_excursions_many(
+            iata_codes=["AYT", "BTS"],
+            date_from=NEXT_MONTH,
+            date_to=NEXT_MONTH + datetime.timedelta(days=6),
+            spoken_languages=["Slovak"],
+        )
+        scheduler = PrefetchScheduler(service, tracker=service._access_tracker)
+        assert scheduler.due_targets() == [
+            PrefetchTarget("AYT", NEXT_MONTH, ("Slovak",)),
+            PrefetchTarget("BTS", NEXT_MONTH, ("Slovak",)),
+        ]
+        # First week is cached. Rest of month is fetched.
+        assert len(scheduler.run_once().prefetched) == 2
+        assert len(scheduler.run_once().skipped) == 2
+
+    def test_run_once__failed(self, server, service):
+        server.status = 503
+        target = PrefetchTarget.create("AYT", NEXT_MONTH, ["Slovak"])
+        result = PrefetchScheduler(service, [target]).run_once()
+        assert list(result.failed) == [target]
+
+    def test_start(self, server, service):
+        targets = [PrefetchTarget.create("AYT", NEXT_MONTH, ["Slovak"])]
+        scheduler = PrefetchScheduler(service, targets)
+        scheduler.start(interval=0.01)
+        deadline = time.monotonic() + 2
+        while server.requests < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scheduler.stop()
+        assert server.requests == 2
+
+
+class TestCommandLine:
+
+    def test_warm(self, monkeypatch, capsys, server):
+        monkeypatch.setenv("BASE_URL", server.base_url)
+        monkeypatch.setenv("API_VERSION", "1.0")
+        monkeypatch.setenv("SCOPE_ID", "123456")
+        argv = [
+            "warm", "AYT", "BTS",
+            "--languages", "Slovak",
+            "--months", "2",
+            "--cache", f"{__name__}:CACHE",
+        ]
+        assert main(argv) == 0
+        assert "Prefetched 4, fresh 0, failed 0 of 4 targets." in capsys.readouterr().out
+        assert main(argv) == 0
+        assert "Prefetched 0, fresh 4, failed 0 of 4 targets." in capsys.readouterr().out
+
+    def test_warm__cache_path(self, monkeypatch, capsys, tmp_path, server):
+        monkeypatch.setenv("BASE_URL", server.base_url)
+        monkeypatch.setenv("API_VERSION", "1.0")
+        monkeypatch.setenv("SCOPE_ID", "123456")
+        argv = ["warm", "AYT", "--languages", "Slovak", "--cache-path", str(tmp_path / "cache.db")]
+        assert main(argv) == 0
+        assert main(argv) == 0  # Cache file survives between runs.
+        assert "Prefetched 0, fresh 1, failed 0 of 1 targets." in capsys.readouterr().out
+
+    def test_warm__failed(self, monkeypatch, capsys, server):
+        server.status = 503
+        monkeypatch.setenv("BASE_URL", server.base_url)
+        monkeypatch.setenv("API_VERSION", "1.0")
+        monkeypatch.setenv("SCOPE_ID", "123456")
+        argv = ["warm", "AYT", "--languages", "Slovak", "--cache", f"{__name__}:LocalCache"]
+        assert main(argv) == 1
+
+    @pytest.mark.parametrize(
+        ("month", "count", "expected_output"),
+        [
+            pytest.param(datetime.date(2023, 11, 1), 1, datetime.date(2023, 12, 1), id="same_year"),
+            pytest.param(datetime.date(2023, 12, 1), 1, datetime.date(2024, 1, 1), id="next_year"),
+            pytest.param(datetime.date(2023, 1, 1), -1, datetime.date(2022, 12, 1), id="previous"),
+        ],
+    )
+    def test__add_months(self, month, count, expected_output):
+        assert _add_months(month, count) == expected_output
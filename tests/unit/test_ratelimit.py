@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+
+from seeplaces.exceptions import DeadlineExceededError
+from seeplaces.ratelimit import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimiter,
+    current_priority,
+    priority_scope,
+)
+from seeplaces.resilience import deadline_scope
+from seeplaces.service import SeePlacesService
+
+
+class TestRateLimiter:
+
+    def test_acquire(self):
+        limiter = RateLimiter(rate=50, burst=2)
+        start = time.perf_counter()
+        for _ in range(4):
+            limiter.acquire()
+        # Burst is free, other calls wait for tokens.
+        assert time.perf_counter() - start >= 0.03
+        stats = limiter.stats[INTERACTIVE]
+        assert stats.acquired == 4
+        assert stats.max_wait > 0
+        assert stats.average_wait == pytest.approx(stats.wait_time / 4)
+
+    def test_acquire__priority(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        limiter.acquire()  # Empty bucket.
+        order = []
+
+        def _acquire(priority):
+            limiter.acquire(priority)
+            order.append(priority)
+
+        background = threading.Thread(target=_acquire, args=(BACKGROUND,))
+        background.start()
+        while not limiter.stats[BACKGROUND].queued:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=_acquire, args=(INTERACTIVE,))
+        interactive.start()
+        background.join()
+        interactive.join()
+
+        # Interactive call came later, but was served first.
+        assert order == [INTERACTIVE, BACKGROUND]
+        assert limiter.stats[BACKGROUND].queued == 0
+
+    def test_acquire__deadline(self):
+        limiter = RateLimiter(rate=1, burst=1)
+        limiter.acquire()
+        with deadline_scope(0.05), pytest.raises(DeadlineExceededError):
+            limiter.acquire()
+        assert limiter.stats[INTERACTIVE].queued == 0
+
+    def test_aacquire(self):
+        limiter = RateLimiter(rate=50, burst=1)
+
+        async def _acquire():
+            await asyncio.gather(*(limiter.aacquire() for _ in range(3)))
+
+        start = time.perf_counter()
+        asyncio.run(_acquire())
+        assert time.perf_counter() - start >= 0.03
+        assert limiter.stats[INTERACTIVE].acquired == 3
+
+    @pytest.mark.parametrize(
+        ("rate", "burst"),
+        [
+            pytest.param(0, 1, id="zero_rate"),
+            pytest.param(1, 0.5, id="small_burst"),
+        ],
+    )
+    def test_invalid(self, rate, burst):
+        with pytest.raises(ValueError):
+            RateLimiter(rate=rate, burst=burst)
+
+    def test_priority_scope(self):
+        assert current_priority() == INTERACTIVE
+        with priority_scope(BACKGROUND):
+            assert current_priority() == BACKGROUND
+        assert current_priority() == INTERACTIVE
+        with pytest.raises(ValueError):
+            with priority_scope("urgent"):
+                pass
+
+    def test_service(self, server, server_options):
+        limiter = RateLimiter(rate=100, burst=10)
+        with SeePlacesService(options=server_options, rate_limiter=limiter) as service:
+            service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            )
+        assert limiter.stats[INTERACTIVE].acquired == server.requests == 2
+        assert limiter.stats[BACKGROUND].acquired == 0
@@ -0,0 +1,233 @@
+import asyncio
+import dataclasses
+import datetime
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import requests
+
+from seeplaces import resilience
+from seeplaces.async_service import AsyncSeePlacesService
+from seeplaces.exceptions import ApiConnectionError, DeadlineExceededError
+from seeplaces.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+    deadline_scope,
+    no_deadline,
+    remaining_time,
+)
+from seeplaces.service import SeePlacesOptions, SeePlacesService
+
+
+class TestDeadline:
+
+    def test_deadline_scope(self):
+        assert remaining_time() is None
+        with deadline_scope(10):
+            assert 9 < remaining_time() <= 10
+            # Inner scope cannot extend outer deadline.
+            with deadline_scope(20):
+                assert remaining_time() <= 10
+            with deadline_scope(1):
+                assert remaining_time() <= 1
+            with no_deadline():
+                assert remaining_time() is None
+        assert remaining_time() is None
+
+    def test_deadline_scope__disabled(self):
+        with deadline_scope(None):
+            assert remaining_time() is None
+
+    @pytest.mark.parametrize("retry", [0, 1, 5, 20])
+    def test_backoff_delay(self, retry):
+        delay = backoff_delay(retry, base=0.1, cap=2.0)
+        assert 0.0 <= delay <= min(2.0, 0.1 * 2 ** retry)
+
+
+class TestCircuitBreaker:
+
+    def test_open(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_success()  # Failures must be consecutive.
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    @pytest.mark.parametrize(
+        ("probe_succeeded", "expected_state"),
+        [
+            pytest.param(True, "closed", id="probe_succeeded"),
+            pytest.param(False, "open", id="probe_failed"),
+        ],
+    )
+    def test_half_open(self, monkeypatch, probe_succeeded, expected_state):
+        now = 1000.0
+        monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now))
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        now += 10
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # Single probe.
+        if probe_succeeded:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        assert breaker.state == expected_state
+
+    def test_disabled(self):
+        breaker = CircuitBreaker(failure_threshold=0, reset_timeout=10)
+        for _ in range(100):
+            breaker.record_failure()
+        assert breaker.allow()
+        assert breaker.state == "closed"
+
+
+class TestServiceResilience:
+
+    @pytest.fixture
+    def options(self, server_options) -> SeePlacesOptions:
+        return dataclasses.replace(server_options, retry_backoff=0.01)
+
+    def _get_excursions(self, service, **kwargs):
+        return service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+            **kwargs,
+        )
+
+    def test_retry(self, server, options):
+        options.max_retries = 2
+        server.failures = 2
+        with SeePlacesService(options=options) as service:
+            service._call_excursion_spoken_languages()
+        assert server.requests == 3
+
+    def test_retry__exhausted(self, server, options):
+        options.max_retries = 2
+        server.failures = 5
+        with SeePlacesService(options=options) as service:
+            with pytest.raises(ApiConnectionError):
+                service._call_excursion_spoken_languages()
+        assert server.requests == 3
+
+    def test_retry__not_transient(self, server, options):
+        options.max_retries = 2
+        server.failures, server.failure_status = 1, 400
+        with SeePlacesService(options=options) as service:
+            with pytest.raises(ApiConnectionError):
+                service._call_excursion_spoken_languages()
+        assert server.requests == 1
+
+    def test_retry__error_rate(self, server, options):
+        options.max_retries = 1
+        server.error_rate = 1.0
+        with SeePlacesService(options=options) as service:
+            with pytest.raises(ApiConnectionError):
+                service._call_excursion_spoken_languages()
+            assert server.requests == 2
+
+            server.error_rate = 0.0
+            service._call_excursion_spoken_languages()
+        assert server.requests == 3
+
+    def test_retry__read_timeout(self, server, options):
+        options.max_retries, options.read_timeout = 1, 0.05
+        server.latency = 0.2
+        with SeePlacesService(options=options) as service:
+            with pytest.raises(requests.Timeout):
+                service._call_excursion_spoken_languages()
+        assert server.requests == 2
+
+    def test_deadline(self, server, options):
+        options.max_retries = 5
+        server.latency = 0.5
+        with SeePlacesService(options=options) as service:
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceededError):
+                self._get_excursions(service, deadline=0.1)
+            assert time.perf_counter() - start < 0.4
+
+    def test_circuit_breaker(self, server, options):
+        options.circuit_failure_threshold = 2
+        server.status = 503
+        with SeePlacesService(options=options) as service:
+            for _ in range(2):
+                with pytest.raises(ApiConnectionError):
+                    self._get_excursions(service)
+            assert service.circuit_state == "open"
+            with pytest.raises(CircuitOpenError):
+                self._get_excursions(service)
+        assert server.requests == 2
+
+    def test_async_retry(self, server, options):
+        options.max_retries = 2
+        server.failures = 2
+
+        async def _get_excursions():
+            async with AsyncSeePlacesService(options=options) as service:
+                return await service.get_excursions(
+                    iata_code="AYT",
+                    date_from=datetime.date(2023, 1, 1),
+                    date_to=datetime.date(2023, 1, 7),
+                    spoken_languages=["Slovak"],
+                )
+
+        assert len(asyncio.run(_get_excursions())) == 2
+        assert server.requests == 4  # Two failures, languages and excursions.
+
+    def test_async_stream_retry(self, server, options):
+        options.max_retries, options.circuit_failure_threshold = 2, 3
+
+        async def _iter_excursions(service):
+            return [
+                _e async for _e in service.iter_excursions(
+                    iata_code="AYT",
+                    date_from=datetime.date(2023, 1, 1),
+                    date_to=datetime.date(2023, 1, 7),
+                    spoken_languages=["Slovak"],
+                )
+            ]
+
+        async def _run():
+            async with AsyncSeePlacesService(options=options) as service:
+                await service._get_language_ids(["Slovak"])
+                server.failures = 2
+                excursions = await _iter_excursions(service)
+                assert len(excursions) == 2
+                assert server.requests == 4  # Languages, two failures and excursions.
+
+                # Transport failures of streamed call are recorded by circuit breaker.
+                options.read_timeout, server.latency = 0.05, 0.2
+                with pytest.raises(httpx.ReadTimeout):
+                    await _iter_excursions(service)
+                assert service.circuit_state == "open"
+
+        asyncio.run(_run())
+
+    def test_async_deadline(self, server, options):
+        server.latency = 0.5
+
+        async def _get_excursions():
+            async with AsyncSeePlacesService(options=options) as service:
+                return await service.get_excursions(
+                    iata_code="AYT",
+                    date_from=datetime.date(2023, 1, 1),
+                    date_to=datetime.date(2023, 1, 7),
+                    spoken_languages=["Slovak"],
+                    deadline=0.1,
+                )
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(_get_excursions())
@@ -1,12 +1,27 @@
+import dataclasses
 import datetime
 import os
+import re
+import threading
+import time
 from collections.abc import Iterator
 from unittest import mock
 
 import pytest
 import requests
 
-from seeplaces.service import _SpokenLanguage, SeePlacesService
+from seeplaces.cache import CacheEntry, LocalCache, TieredCache
+from seeplaces.exceptions import ApiConnectionError, DeadlineExceededError
+from seeplaces.service import (
+    EMPTY_EXCURSIONS_CACHE_TTL,
+    _SpokenLanguage,
+    ExcursionLookup,
+    SeePlacesOptions,
+    SeePlacesService,
+)
+from seeplaces.singleflight import CacheLock
+from seeplaces.testing import StubServer
+from seeplaces.window import ExcursionWindow
 
 
 @pytest.fixture()
@@ -49,24 +64,86 @@ class TestSeePlacesService:
         assert language_ids.pop() == test_id
 
     def test__get_language_ids__from_cache(self, monkeypatch, cache, service):
-        cached_value = "cached_value"
-        cache.set(service._languages_cache_key(["Slovak"]), cached_value)
-        assert cached_value == service._get_language_ids(["Slovak"])
+        cache.set(service._languages_cache_key(), {"Slovak": "cached_id"})
+        assert service._get_language_ids(["Slovak", "Unknown"]) == {"cached_id"}
+
+    def test__get_language_ids__shared_catalog(self, monkeypatch, cache, service, options):
+        calls = []
+
+        def _call_excursion_spoken_languages():
+            calls.append(1)
+            return mock.Mock(json=lambda: {"SpokenLanguages": [
+                {"Id": "lang-sk", "Name": "Slovak"},
+                {"Id": "lang-cz", "Name": "Czech"},
+            ]})
+
+        monkeypatch.setattr(
+            service, "_call_excursion_spoken_languages", _call_excursion_spoken_languages,
+        )
+        assert service._get_language_ids(["Slovak"]) == {"lang-sk"}
+
+        # Any combination is resolved by catalog shared with other services.
+        other_service = SeePlacesService(options=options)
+        assert other_service._get_language_ids(["Czech", "Slovak"]) == {"lang-sk", "lang-cz"}
+        assert other_service._get_language_ids(["Czech"]) == {"lang-cz"}
+        assert len(calls) == 1
+
+        # Expired catalog is loaded again.
+        monkeypatch.setattr(service._language_catalog, "ttl", 0)
+        cache.set(service._languages_cache_key(), None)
+        assert service._get_language_ids(["Czech"]) == {"lang-cz"}
+        assert len(calls) == 2
 
     def test__excursions_cache_key(self, service):
         key = service._excursions_cache_key("BTS", datetime.date(2023, 1, 1), ["Slovak", "Czech"])
-        assert key == "seeplaces_exc_BTS_1_SloCze"
+        assert key == "seeplaces_exc_v2_123456_EUR_sk-SK_BTS_2023-01_Czech,Slovak"
+
+    def test__get_cached__other_layout(self, cache, service):
+        cache.set("key", CacheEntry.create(["excursion"], ttl=60))  # Saved before month windows.
+        assert service._get_cached("key") is None
+        cache.set("key", CacheEntry.create(ExcursionWindow(), ttl=60))
+        assert service._get_cached("key") is not None
+
+    def test__excursions_cache_key__canonical(self, service):
+        date_from = datetime.date(2023, 1, 1)
+        key = service._excursions_cache_key("BTS", date_from, ["Slovak", "Czech"])
+        assert key == service._excursions_cache_key("BTS", date_from, ["Czech", "Slovak", "Czech"])
+        other_key = service._excursions_cache_key(
+            "BTS", datetime.date(2024, 1, 1), ["Slovak", "Czech"],
+        )
+        assert key != other_key
+
+        service._options.currency = "CZK"
+        assert key != service._excursions_cache_key("BTS", date_from, ["Slovak", "Czech"])
+
+    def test__languages_cache_key(self, service):
+        assert service._languages_cache_key() == "seeplaces_lang_catalog"
 
     @pytest.mark.parametrize(
-        "languages, expected_output",
+        "parts",
         [
-            ([], "seeplaces_lang_"),
-            (["Slovak"], "seeplaces_lang_Slo"),
-            (["Slovak", "Czech"], "seeplaces_lang_SloCze"),
+            pytest.param(["Brazilian Portuguese"], id="whitespace"),
+            pytest.param(["Slovenčina"], id="non_ascii"),
+            pytest.param([f"Language{i}" for i in range(50)], id="too_long"),
         ]
     )
-    def test__languages_cache_key(self, service, languages, expected_output):
-        assert service._languages_cache_key(languages) == expected_output
+    def test__cache_key__hashed(self, service, parts):
+        key = service._cache_key("lang", *parts)
+        assert re.fullmatch("seeplaces_lang_[0-9a-f]{40}", key)
+        assert key == service._cache_key("lang", *parts)
+
+    def test__cache_key(self, service):
+        assert service._cache_key("lang", "Czech,Slovak") == "seeplaces_lang_Czech,Slovak"
+
+    def test_key_stats(self, monkeypatch, cache, service):
+        monkeypatch.setattr(service, "_call_excursion_spoken_languages", lambda: None)
+        monkeypatch.setattr(service, "_parse_languages_from_response", lambda _: [])
+        service._get_language_ids(["Slovak", "Czech"])
+        service._get_language_ids(["Czech"])
+        service._get_language_ids(["Slovak"])
+        stats = service.key_stats["lang"]
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert stats.hit_ratio == 2 / 3
 
     @pytest.mark.parametrize(
         "json_data, expected_output",
@@ -105,5 +182,597 @@ class TestSeePlacesService:
     def test__call_api(self, monkeypatch, service, status_code):
         response = requests.Response()
         response.status_code = status_code
-        monkeypatch.setattr(requests, "get", lambda *args, **kwargs: response)
+        monkeypatch.setattr(requests.Session, "get", lambda *args, **kwargs: response)
         _ = service._call_api(endpoint="", query={}, headers={})
+
+    def test__session__thread_local(self, service):
+        session = service._session()
+        assert service._session() is session
+
+        other_sessions = []
+        thread = threading.Thread(target=lambda: other_sessions.append(service._session()))
+        thread.start()
+        thread.join()
+        assert other_sessions[0] is not session
+        # Connection pool is shared by all sessions.
+        assert other_sessions[0].get_adapter("https://") is session.get_adapter("https://")
+
+    def test__session__keep_alive_disabled(self, service):
+        service._options.keep_alive = False
+        assert service._session().headers["connection"] == "close"
+
+    def test_close(self, monkeypatch, service):
+        closed = []
+        monkeypatch.setattr(service._adapter, "close", lambda: closed.append(True))
+        with service:
+            pass
+        assert closed == [True]
+
+    def test__call_api__reuses_connection(self, setup_env, options):
+        with StubServer() as server:
+            options.base_url = server.base_url
+            with SeePlacesService(options=options) as service:
+                for _ in range(5):
+                    service._call_excursion_spoken_languages()
+            assert server.requests == 5
+            assert server.connections == 1
+
+
+class TestSeePlacesServiceMany:
+
+    @pytest.fixture
+    def service(self, server_options, cache) -> SeePlacesService:
+        return SeePlacesService(options=server_options, cache=cache)
+
+    def _get_excursions_many(self, service, iata_codes):
+        return service.get_excursions_many(
+            iata_codes=iata_codes,
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        )
+
+    def test_get_excursions_many(self, server, cache, service):
+        cached_value = ["cached_value"]
+        cache.set(
+            service._excursions_cache_key("BTS", datetime.date(2023, 1, 1), ["Slovak"]),
+            cached_value,
+        )
+
+        result = self._get_excursions_many(service, ["AYT", "BTS", "VIE", "AYT"])
+        assert list(result) == ["AYT", "BTS", "VIE"]
+        assert result["BTS"] == cached_value
+        for iata_code in ("AYT", "VIE"):
+            assert [_e.name for _e in result[iata_code]] == ["Excursion 0", "Excursion 1"]
+            key = service._excursions_cache_key(iata_code, datetime.date(2023, 1, 1), ["Slovak"])
+            assert cache.get(key).value.ranges[0].excursions is result[iata_code]
+        # Languages and single call for both missing airports.
+        assert server.requests == 2
+
+    def test_get_excursions_many__batch_cache(self, server, server_options, batch_cache):
+        service = SeePlacesService(options=server_options, cache=batch_cache)
+        self._get_excursions_many(service, ["AYT", "BTS"])
+        batch_cache.calls.clear()
+
+        result = self._get_excursions_many(service, ["AYT", "BTS", "VIE"])
+        assert all(len(_e) == 2 for _e in result.values())
+        # Single cache round trip for all airports, read again for missing one before api call
+        # and single write.
+        assert batch_cache.calls == ["get_many", "get_many", "set_many"]
+        assert server.requests == 3
+
+    def test_get_excursions_many__batches(self, server, service):
+        service._options.iata_codes_per_call = 2
+        result = self._get_excursions_many(service, ["AYT", "BTS", "VIE"])
+        assert all(len(_e) == 2 for _e in result.values())
+        assert server.requests == 3
+
+    def test_get_excursions_many__untagged_items(self, server, service):
+        server.tag_iata_codes = False
+        result = self._get_excursions_many(service, ["AYT", "BTS"])
+        assert all(len(_e) == 2 for _e in result.values())
+        # Combined call cannot be split. Falls back to call per airport.
+        assert server.requests == 4
+
+        # Later calls do not combine airports during pause.
+        result = service.get_excursions_many(
+            iata_codes=["AYT", "BTS"],
+            date_from=datetime.date(2023, 1, 8),
+            date_to=datetime.date(2023, 1, 14),
+            spoken_languages=["Slovak"],
+        )
+        assert all(len(_e) == 2 for _e in result.values())
+        assert server.requests == 6
+
+    def test_get_excursions_many__normalized_codes(self, server, service):
+        result = self._get_excursions_many(service, ["ayt", " AYT ", "bts"])
+        assert list(result) == ["AYT", "BTS"]
+        assert all(len(_e) == 2 for _e in result.values())
+        assert server.requests == 2  # Languages and single combined call.
+
+    def test_get_excursions_many__combined_calls_resumed(self, monkeypatch, server, service):
+        monkeypatch.setattr("seeplaces.base.COMBINED_CALLS_PAUSE", 0)
+        server.tag_iata_codes = False
+        self._get_excursions_many(service, ["AYT", "BTS"])
+        assert server.requests == 4
+
+        # Combined calls are tried again after pause.
+        server.tag_iata_codes = True
+        result = service.get_excursions_many(
+            iata_codes=["AYT", "BTS"],
+            date_from=datetime.date(2023, 1, 8),
+            date_to=datetime.date(2023, 1, 14),
+            spoken_languages=["Slovak"],
+        )
+        assert all(len(_e) == 2 for _e in result.values())
+        assert server.requests == 5
+
+    def test_get_excursions_many__error_cached(self, server, service):
+        server.status = 503
+        service._options.error_cache_ttl = 10
+        for _ in range(3):
+            with pytest.raises(ApiConnectionError):
+                self._get_excursions_many(service, ["AYT", "BTS"])
+        assert server.requests == 1
+
+    def test_get_excursions_many__coalesced(self, server, service):
+        server.latency = 0.1
+        results = []
+
+        def _get_excursions_many():
+            results.append(self._get_excursions_many(service, ["AYT", "BTS"]))
+
+        threads = [threading.Thread(target=_get_excursions_many) for _ in range(10)]
+        for _t in threads:
+            _t.start()
+        for _t in threads:
+            _t.join()
+        assert len(results) == 10
+        assert all(_r["AYT"] is results[0]["AYT"] for _r in results)
+        assert server.requests == 2  # Languages and single combined call.
+
+    def test_get_excursions__months_read_together(self, server, server_options, batch_cache):
+        service = SeePlacesService(options=server_options, cache=batch_cache)
+        for _ in range(2):
+            excursions = service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 25),
+                date_to=datetime.date(2023, 2, 5),
+                spoken_languages=["Slovak"],
+            )
+            assert len(excursions) == 2
+        # Single cache round trip for both months of each call.
+        assert batch_cache.calls == ["get_many", "get_many"]
+        assert server.requests == 3
+
+    def _lookups(self, iata_codes):
+        return [
+            ExcursionLookup(
+                iata_code=_c,
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            )
+            for _c in iata_codes
+        ]
+
+    def test_iter_excursions_concurrently(self, server, service):
+        server.latency = 0.2
+        start = time.perf_counter()
+        results = list(service.iter_excursions_concurrently(
+            self._lookups(["AYT", "BTS", "VIE", "PRG"]), max_workers=4,
+        ))
+        # Languages call is not cached in parallel lookups. Excursion calls run concurrently.
+        assert time.perf_counter() - start < 4 * 2 * server.latency
+        assert sorted(_r.lookup.iata_code for _r in results) == ["AYT", "BTS", "PRG", "VIE"]
+        assert all(len(_r.excursions) == 2 and _r.error is None for _r in results)
+
+    def test_iter_excursions_concurrently__error(self, monkeypatch, service):
+        get_excursions = service.get_excursions
+
+        def _get_excursions(iata_code, **kwargs):
+            if iata_code == "BTS":
+                raise ApiConnectionError("Cannot connect")
+            return get_excursions(iata_code=iata_code, **kwargs)
+
+        monkeypatch.setattr(service, "get_excursions", _get_excursions)
+        results = {
+            _r.lookup.iata_code: _r
+            for _r in service.iter_excursions_concurrently(self._lookups(["AYT", "BTS"]))
+        }
+        assert isinstance(results["BTS"].error, ApiConnectionError)
+        assert results["BTS"].excursions is None
+        assert len(results["AYT"].excursions) == 2
+
+    def test_iter_excursions_concurrently__deadline(self, server, service):
+        server.latency = 0.5
+        results = list(service.iter_excursions_concurrently(
+            self._lookups(["AYT", "BTS"]), deadline=0.1,
+        ))
+        assert len(results) == 2
+        assert all(isinstance(_r.error, DeadlineExceededError) for _r in results)
+
+    def test_cache_stats(self, server, cache, service):
+        service = SeePlacesService(options=service._options, cache=cache, local_cache=LocalCache())
+        self._get_excursions_many(service, ["AYT"])
+        self._get_excursions_many(service, ["AYT"])
+        stats = service.cache_stats
+        assert stats["local"].hits == 1
+        # Excursions read again before api call and languages.
+        assert stats["remote"].misses == 3
+        assert service.key_stats["exc"].hits == 1
+        assert service.key_stats["exc"].misses == 1
+
+    def test_get_excursions__coalesced(self, server, service):
+        server.latency = 0.1
+        results = []
+
+        def _get_excursions():
+            results.append(service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            ))
+
+        threads = [threading.Thread(target=_get_excursions) for _ in range(10)]
+        for _t in threads:
+            _t.start()
+        for _t in threads:
+            _t.join()
+        assert len(results) == 10
+        assert all(_r is results[0] for _r in results)
+        assert server.requests == 2  # Languages and excursions.
+
+    def test_get_excursions__coalesced_deadline(self, server, service):
+        server.latency = 0.5
+
+        def _get_excursions(deadline=None):
+            return service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+                deadline=deadline,
+            )
+
+        leader = threading.Thread(target=_get_excursions)
+        leader.start()
+        self._wait_for(lambda: server.requests)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            _get_excursions(deadline=0.2)  # Waits for slow call of leader.
+        assert time.monotonic() - start < 0.4
+        leader.join()
+
+    def test_get_excursions__cache_lock(self, server):
+        # Cache shared with other process which already fetches the same key.
+        cache = LocalCache()
+        options = SeePlacesOptions(
+            base_url=server.base_url,
+            api_version="1.0",
+            scope_id="123456",
+            cache_lock_timeout=5,
+            cache_lock_poll_interval=0.01,
+        )
+        service = SeePlacesService(options=options, cache=cache)
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        lock_key = f"{cache_key}_2023-01-01_2023-01-07_lock"
+        other_process_lock = CacheLock(cache, lock_key, timeout=5)
+        other_process_lock.acquire()
+
+        def _other_process():
+            window = ExcursionWindow().merge(
+                datetime.date(2023, 1, 1), datetime.date(2023, 1, 7), ["from_other_process"],
+            )
+            cache.set(cache_key, CacheEntry.create(window, ttl=60), 60)
+            other_process_lock.release()
+
+        timer = threading.Timer(0.1, _other_process)
+        timer.start()
+
+        excursions = service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        )
+        timer.join()
+        assert excursions == ["from_other_process"]
+        assert server.requests == 0
+
+    def test_get_excursions__cache_lock_no_add(self, server, cache):
+        # Remote tier without atomic add. Excursions are fetched without lock.
+        options = SeePlacesOptions(
+            base_url=server.base_url,
+            api_version="1.0",
+            scope_id="123456",
+            cache_lock_timeout=5,
+        )
+        tiered = TieredCache(local=LocalCache(), remote=cache)
+        service = SeePlacesService(options=options, cache=tiered)
+        excursions = service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        )
+        assert len(excursions) == 2
+
+    def _set_stale_entry(self, cache, service, iata_code):
+        cache_key = service._excursions_cache_key(iata_code, datetime.date(2023, 1, 1), ["Slovak"])
+        window = ExcursionWindow().merge(
+            datetime.date(2023, 1, 1), datetime.date(2023, 1, 7), ["stale"],
+        )
+        entry = CacheEntry(window, stale_at=time.time() - 1, expires_at=time.time() + 60)
+        cache.set(cache_key, entry)
+        return cache_key
+
+    def _wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_get_excursions__stale_while_revalidate(self, server, cache, service):
+        cache_key = self._set_stale_entry(cache, service, "AYT")
+        assert self._get_excursions_many(service, ["AYT"])["AYT"] == ["stale"]
+
+        self._wait_for(lambda: cache.get(cache_key).value.ranges[0].excursions != ["stale"])
+        assert len(cache.get(cache_key).value.ranges[0].excursions) == 2
+        assert not cache.get(cache_key).is_stale()
+        assert server.requests == 2
+
+    def test_get_excursions__stale_refresh_failed(self, monkeypatch, server, cache, service):
+        def _call_excursion_for_iata_code(*args, **kwargs):
+            raise ApiConnectionError("Cannot connect")
+
+        monkeypatch.setattr(service, "_call_excursion_for_iata_code", _call_excursion_for_iata_code)
+        cache_key = self._set_stale_entry(cache, service, "AYT")
+        excursions = service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        )
+        assert excursions == ["stale"]
+
+        self._wait_for(lambda: not service._refreshing)
+        assert cache.get(cache_key).value.ranges[0].excursions == ["stale"]
+
+    def _get_excursions(self, service):
+        return service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 1),
+            date_to=datetime.date(2023, 1, 7),
+            spoken_languages=["Slovak"],
+        )
+
+    def _expire_soft(self, cache, cache_key):
+        cache.set(cache_key, dataclasses.replace(cache.get(cache_key), stale_at=time.time() - 1))
+
+    @pytest.mark.parametrize(
+        ("etag", "outcome"),
+        [
+            pytest.param(True, "not_modified", id="etag"),
+            pytest.param(False, "unchanged", id="content_hash"),
+        ],
+    )
+    def test_get_excursions__revalidate(self, server, cache, service, etag, outcome):
+        server.etag = etag
+        excursions = self._get_excursions(service)
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        assert cache.get(cache_key).validators is not None
+        self._expire_soft(cache, cache_key)
+
+        assert self._get_excursions(service) is excursions
+        self._wait_for(lambda: not service._refreshing)
+
+        # Unchanged window is renewed, not replaced.
+        entry = cache.get(cache_key)
+        assert not entry.is_stale()
+        assert entry.value.ranges[0].excursions is excursions
+        assert getattr(service.revalidation_stats, outcome) == 1
+        assert service.revalidation_stats.avoided == 1
+        assert server.not_modified == int(etag)
+        assert server.requests == 3
+
+    def test_get_excursions__two_gaps(self, server, cache, service):
+        def _get_excursions(date_from, date_to):
+            return service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=["Slovak"],
+            )
+
+        _get_excursions(datetime.date(2023, 1, 8), datetime.date(2023, 1, 14))
+        # Both gaps return the same body. Second gap is not sent conditionally with ETag of first.
+        assert len(_get_excursions(datetime.date(2023, 1, 1), datetime.date(2023, 1, 21))) == 2
+        assert server.requests == 4
+        assert server.not_modified == 0
+
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        entry = cache.get(cache_key)
+        assert all(len(_r.excursions) == 2 for _r in entry.value.ranges)
+        assert entry.validators is None  # Window of several api calls is not revalidated.
+
+    def test_get_excursions__revalidate_modified(self, server, cache, service):
+        self._get_excursions(service)
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        self._expire_soft(cache, cache_key)
+        server.items = 3
+
+        self._get_excursions(service)
+        self._wait_for(lambda: not service._refreshing)
+        assert len(cache.get(cache_key).value.ranges[0].excursions) == 3
+        assert service.revalidation_stats.modified == 1
+        assert service.revalidation_stats.avoided == 0
+
+    def test_get_excursions__no_validators_for_extended_window(self, server, cache, service):
+        for date_from, date_to in (
+            (datetime.date(2023, 1, 1), datetime.date(2023, 1, 7)),
+            (datetime.date(2023, 1, 10), datetime.date(2023, 1, 12)),
+        ):
+            service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=["Slovak"],
+            )
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        assert cache.get(cache_key).validators is None
+
+    def test_get_excursions__gaps_not_conditional(self, server, cache, service):
+        for date_from, date_to in (
+            (datetime.date(2023, 1, 4), datetime.date(2023, 1, 6)),
+            (datetime.date(2023, 1, 1), datetime.date(2023, 1, 10)),  # Two gaps.
+        ):
+            excursions = service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=["Slovak"],
+            )
+        # Validators of first gap are not sent with request for second gap.
+        assert len(excursions) == 2
+        assert server.not_modified == 0
+        assert server.requests == 4
+
+    def test_get_excursions__empty_result_cached(self, server, cache, service):
+        server.items = 0
+        for _ in range(2):
+            assert self._get_excursions_many(service, ["AYT"]) == {"AYT": []}
+            assert service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            ) == []
+        assert server.requests == 2  # Languages and excursions.
+
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        entry = cache.get(cache_key)
+        assert entry.stale_at - time.time() <= EMPTY_EXCURSIONS_CACHE_TTL
+
+    def test_get_excursions__missing_dates_only(self, server, cache, service):
+        def _get_excursions(date_from, date_to):
+            return service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=["Slovak"],
+            )
+
+        _get_excursions(datetime.date(2023, 1, 1), datetime.date(2023, 1, 7))
+        assert server.requests == 2  # Languages and excursions.
+
+        # Only January 8 - 14 is fetched. Contained range is served from cache.
+        assert len(_get_excursions(datetime.date(2023, 1, 1), datetime.date(2023, 1, 14))) == 2
+        assert len(_get_excursions(datetime.date(2023, 1, 3), datetime.date(2023, 1, 5))) == 2
+        assert server.requests == 3
+
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        assert cache.get(cache_key).value.coverage == [
+            (datetime.date(2023, 1, 1), datetime.date(2023, 1, 14)),
+        ]
+
+    def test_get_excursions__other_dates_not_served(self, server, cache, service):
+        def _get_excursions(date_from, date_to):
+            return service.get_excursions(
+                iata_code="AYT",
+                date_from=date_from,
+                date_to=date_to,
+                spoken_languages=["Slovak"],
+            )
+
+        assert len(_get_excursions(datetime.date(2023, 1, 1), datetime.date(2023, 1, 7))) == 2
+        server.items = 0
+
+        # Excursions of January 1 - 7 are not answer for other dates of the same month.
+        assert _get_excursions(datetime.date(2023, 1, 20), datetime.date(2023, 1, 25)) == []
+        # Range overlapping cached range is fetched whole.
+        assert _get_excursions(datetime.date(2023, 1, 5), datetime.date(2023, 1, 10)) == []
+        assert len(_get_excursions(datetime.date(2023, 1, 2), datetime.date(2023, 1, 6))) == 2
+        assert server.requests == 4
+
+    def test_get_excursions__multiple_months(self, server, cache, service):
+        result = service.get_excursions(
+            iata_code="AYT",
+            date_from=datetime.date(2023, 1, 25),
+            date_to=datetime.date(2023, 2, 5),
+            spoken_languages=["Slovak"],
+        )
+        assert len(result) == 2  # Same excursions in both months are merged.
+        assert server.requests == 3  # Languages and excursions of each month.
+
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 2, 1), ["Slovak"])
+        assert cache.get(cache_key).value.coverage == [
+            (datetime.date(2023, 2, 1), datetime.date(2023, 2, 5)),
+        ]
+
+    def test_iter_excursions(self, server, cache, service):
+        def _iter_excursions():
+            return service.iter_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 25),
+                date_to=datetime.date(2023, 2, 5),
+                spoken_languages=["Slovak"],
+            )
+
+        # Consumer stopped early. Cache is not filled.
+        excursions = _iter_excursions()
+        assert next(excursions).name == "Excursion 0"
+        excursions.close()
+        cache_key = service._excursions_cache_key("AYT", datetime.date(2023, 1, 1), ["Slovak"])
+        assert cache.get(cache_key) is None
+
+        # Same excursions as get_excursions, merged over months.
+        assert [_e.name for _e in _iter_excursions()] == ["Excursion 0", "Excursion 1"]
+        assert cache.get(cache_key).value.coverage == [
+            (datetime.date(2023, 1, 25), datetime.date(2023, 1, 31)),
+        ]
+        requests_count = server.requests
+        assert [_e.name for _e in _iter_excursions()] == ["Excursion 0", "Excursion 1"]
+        assert server.requests == requests_count  # From cache.
+
+    def test_iter_excursions__error(self, server, service):
+        server.status = 503
+        with pytest.raises(ApiConnectionError):
+            list(service.iter_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+            ))
+
+    def test_get_excursions__error_cached(self, server, service):
+        server.status = 503
+        service._options.error_cache_ttl = 10
+        for _ in range(3):
+            with pytest.raises(ApiConnectionError):
+                service.get_excursions(
+                    iata_code="AYT",
+                    date_from=datetime.date(2023, 1, 1),
+                    date_to=datetime.date(2023, 1, 7),
+                    spoken_languages=["Slovak"],
+                )
+        assert server.requests == 1
+
+    def test_get_excursions__deadline_not_cached(self, server, service):
+        service._options.error_cache_ttl = 60
+
+        def _get_excursions(deadline=None):
+            return service.get_excursions(
+                iata_code="AYT",
+                date_from=datetime.date(2023, 1, 1),
+                date_to=datetime.date(2023, 1, 7),
+                spoken_languages=["Slovak"],
+                deadline=deadline,
+            )
+
+        server.latency = 0.3
+        with pytest.raises(DeadlineExceededError):
+            _get_excursions(deadline=0.1)
+        # Deadline of previous caller does not block later calls.
+        server.latency = 0.0
+        assert len(_get_excursions()) == 2
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from seeplaces.cache import LocalCache, TieredCache
+from seeplaces.exceptions import DeadlineExceededError
+from seeplaces.resilience import deadline_scope
+from seeplaces.singleflight import AsyncSingleFlight, CacheLock, SingleFlight
+
+
+class TestSingleFlight:
+
+    def _run_threads(self, target, count=10):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for _t in threads:
+            _t.start()
+        for _t in threads:
+            _t.join()
+
+    def test_do(self):
+        single_flight = SingleFlight()
+        calls = []
+        results = []
+
+        def _fn():
+            calls.append(True)
+            time.sleep(0.1)
+            return "result"
+
+        self._run_threads(lambda: results.append(single_flight.do("key", _fn)))
+        assert len(calls) == 1
+        assert results == ["result"] * 10
+
+    def test_do__error(self):
+        single_flight = SingleFlight()
+        errors = []
+
+        def _fn():
+            time.sleep(0.1)
+            raise ValueError("error")
+
+        def _target():
+            try:
+                single_flight.do("key", _fn)
+            except ValueError as exc:
+                errors.append(exc)
+
+        self._run_threads(_target)
+        assert len(errors) == 10
+        # Failed call is not remembered.
+        assert single_flight.do("key", lambda: "result") == "result"
+
+
+    def test_do__deadline(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+
+        def _fn():
+            started.set()
+            time.sleep(0.5)
+            return "result"
+
+        leader = threading.Thread(target=single_flight.do, args=("key", _fn))
+        leader.start()
+        started.wait()
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError), deadline_scope(0.1):
+            single_flight.do("key", _fn)
+        assert time.monotonic() - start < 0.3  # Follower does not wait for slow leader.
+        leader.join()
+
+
+    def test_do__leader_deadline(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        def _fn():
+            calls.append(True)
+            if len(calls) == 1:
+                started.set()
+                time.sleep(0.1)
+                raise DeadlineExceededError("deadline of leader")
+            return "result"
+
+        leader = threading.Thread(
+            target=lambda: pytest.raises(DeadlineExceededError, single_flight.do, "key", _fn)
+        )
+        leader.start()
+        started.wait()
+        assert single_flight.do("key", _fn) == "result"  # Runs again without deadline.
+        leader.join()
+
+
+class TestAsyncSingleFlight:
+
+    def test_do(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def _fn():
+            calls.append(True)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def _run():
+            return await asyncio.gather(*(single_flight.do("key", _fn) for _ in range(10)))
+
+        assert asyncio.run(_run()) == ["result"] * 10
+        assert len(calls) == 1
+
+    def test_do__deadline(self):
+        single_flight = AsyncSingleFlight()
+
+        async def _fn():
+            await asyncio.sleep(0.3)
+            return "result"
+
+        async def _follower():
+            with deadline_scope(0.05):
+                return await single_flight.do("key", _fn)
+
+        async def _run():
+            return await asyncio.gather(
+                single_flight.do("key", _fn), _follower(), return_exceptions=True,
+            )
+
+        result, error = asyncio.run(_run())
+        assert result == "result"  # Shared call is not cancelled by follower's deadline.
+        assert isinstance(error, DeadlineExceededError)
+
+
+class TestCacheLock:
+
+    def test_acquire(self):
+        cache = LocalCache()
+        lock = CacheLock(cache, "lock", timeout=10)
+        assert lock.acquire()
+        assert not CacheLock(cache, "lock", timeout=10).acquire()
+        lock.release()
+        assert CacheLock(cache, "lock", timeout=10).acquire()
+
+    def test_release__not_owned(self):
+        cache = LocalCache()
+        owner = CacheLock(cache, "lock", timeout=10)
+        owner.acquire()
+        CacheLock(cache, "lock", timeout=10).release()
+        assert cache.get("lock") is not None
+
+    @pytest.mark.parametrize(
+        "save_result, expected_output",
+        [
+            pytest.param(True, "result", id="result_saved"),
+            pytest.param(False, None, id="released_without_result"),
+        ]
+    )
+    def test_wait(self, save_result, expected_output):
+        cache = LocalCache()
+        owner = CacheLock(cache, "lock", timeout=10)
+        owner.acquire()
+
+        def _owner():
+            time.sleep(0.1)
+            if save_result:
+                cache.set("result", "result", timeout=10)
+            owner.release()
+
+        thread = threading.Thread(target=_owner)
+        thread.start()
+        waiter = CacheLock(cache, "lock", timeout=10)
+        assert waiter.wait("result", poll_interval=0.01) == expected_output
+        thread.join()
+
+    def test_wait__deadline(self):
+        cache = LocalCache()
+        CacheLock(cache, "lock", timeout=10).acquire()
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError), deadline_scope(0.1):
+            CacheLock(cache, "lock", timeout=10).wait("result", poll_interval=1.0)
+        assert time.monotonic() - start < 0.3
+
+    def test_wait__tiered_cache(self):
+        remote = LocalCache()
+        owner = CacheLock(TieredCache(local=LocalCache(), remote=remote), "lock", timeout=10)
+        owner.acquire()
+        waiter_cache = TieredCache(local=LocalCache(), remote=remote)
+        waiter = CacheLock(waiter_cache, "lock", timeout=10)
+        assert not waiter.acquire()
+
+        def _owner():
+            time.sleep(0.1)
+            remote.set("result", "result", timeout=10)
+            owner.release()
+
+        thread = threading.Thread(target=_owner)
+        thread.start()
+        assert waiter.wait("result", poll_interval=0.01) == "result"
+        thread.join()
+        # Lock token is not copied to local tier.
+        assert waiter_cache.local.get("lock") is None
+
+    def test_init__no_add(self, cache):
+        with pytest.raises(ValueError):
+            CacheLock(TieredCache(local=LocalCache(), remote=cache), "lock", timeout=10)
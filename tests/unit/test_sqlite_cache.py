@@ -0,0 +1,163 @@
+import asyncio
+import datetime
+import multiprocessing
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from seeplaces.sqlite_cache import SQLiteCache
+from seeplaces.service import SeePlacesService
+
+
+class _Clock:
+    """
+    Controllable replacement of time.time.
+    """
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("seeplaces.sqlite_cache.time.time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / "cache.db")
+
+
+@pytest.fixture
+def cache(path) -> Iterator[SQLiteCache]:
+    cache = SQLiteCache(path)
+    yield cache
+    cache.close()
+
+
+def _add_in_process(path: str, results) -> None:
+    """
+    Tries to add the same key from other process.
+    """
+    results.put(SQLiteCache(path).add("lock", "other", timeout=60))
+
+
+class TestSQLiteCache:
+
+    def test_get(self, cache):
+        cache.set("key", {"value": [1, 2]}, timeout=10)
+        assert cache.get("key") == {"value": [1, 2]}
+        assert cache.get("other", default="default") == "default"
+        assert cache.get("key", version=2) is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+    def test_get__expired(self, clock, cache):
+        cache.set("key", "value", timeout=10)
+        clock.now += 10
+        assert cache.get("key") is None
+
+    @pytest.mark.parametrize(
+        ("timeout", "expected_output"),
+        [
+            pytest.param(0, None, id="default_timeout"),
+            pytest.param(None, "value", id="never_expires"),
+            pytest.param(-1, None, id="negative_removes"),
+        ],
+    )
+    def test_set__timeout(self, clock, cache, timeout, expected_output):
+        cache.set("key", "value", timeout=timeout)
+        clock.now += cache.default_timeout
+        assert cache.get("key") == expected_output
+
+    def test_add(self, clock, cache):
+        assert cache.add("key", "first", timeout=10)
+        assert not cache.add("key", "second", timeout=10)
+        assert cache.get("key") == "first"
+        clock.now += 10
+        assert cache.add("key", "third", timeout=10)
+        assert cache.get("key") == "third"
+
+    def test_delete(self, cache):
+        cache.set("key", "value")
+        assert cache.delete("key")
+        assert not cache.delete("key")
+        assert cache.get("key") is None
+
+    def test_get_many(self, clock, cache):
+        cache.set_many({"a": 1, "b": 2, "c": 3}, timeout=10)
+        cache.set("short", 4, timeout=1)
+        clock.now += 1
+        assert cache.get_many(["a", "b", "short", "missing"]) == {"a": 1, "b": 2}
+        assert cache.get_many(["a"], version=2) == {}
+        cache.delete_many(["a", "b"])
+        assert cache.get_many(["a", "b", "c"]) == {"c": 3}
+
+    def test_persistent(self, path, cache):
+        cache.set("key", "value", timeout=60)
+        cache.close()
+        assert SQLiteCache(path).get("key") == "value"
+
+    def test_cull(self, clock, path):
+        cache = SQLiteCache(path, max_size=10_000)
+        cache.set("expired", "x", timeout=1)
+        for index in range(10):
+            cache.set(f"key{index}", b"x" * 1000, timeout=100 + index)
+        cache.set("forever", b"x" * 1000, timeout=None)
+        clock.now += 1
+        assert cache.size() > cache.max_size
+
+        # Expired entry goes first, then entries closest to expiry.
+        assert cache.cull() == 4
+        assert cache.size() <= cache.max_size * 0.9
+        assert cache.get("key0") is None
+        assert cache.get("key3") == b"x" * 1000
+        assert cache.get("forever") is not None
+
+    def test_threads(self, cache):
+        def _write(thread_index):
+            for index in range(50):
+                cache.set(f"{thread_index}:{index}", index)
+
+        threads = [threading.Thread(target=_write, args=(_i,)) for _i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(cache) == 200
+        assert cache.get("3:49") == 49
+
+    def test_processes(self, path, cache):
+        assert cache.add("lock", "owner", timeout=60)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        process = context.Process(target=_add_in_process, args=(path, results))
+        process.start()
+        process.join(timeout=30)
+        assert results.get(timeout=5) is False
+        assert cache.get("lock") == "owner"
+
+    def test_aget(self, cache):
+        async def _roundtrip():
+            await cache.aset("key", "value", timeout=10)
+            return await cache.aget("key")
+
+        assert asyncio.run(_roundtrip()) == "value"
+
+    def test_service(self, path, server, server_options):
+        for _ in range(2):
+            # New service and cache instance, as in new process.
+            with SeePlacesService(options=server_options, cache=SQLiteCache(path)) as service:
+                excursions = service.get_excursions(
+                    iata_code="AYT",
+                    date_from=datetime.date(2023, 1, 1),
+                    date_to=datetime.date(2023, 1, 7),
+                    spoken_languages=["Slovak"],
+                )
+                assert len(excursions) == 2
+        assert server.requests == 2  # Second service is served from file.
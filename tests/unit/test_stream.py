@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from seeplaces.exceptions import ResponseParseError
+from seeplaces.stream import JsonArrayStream
+from seeplaces.testing import synthetic_excursion
+
+
+def _parse(data: bytes, chunk_size: int) -> list:
+    parser = JsonArrayStream("Items")
+    items = []
+    for i in range(0, len(data), chunk_size):
+        items.extend(parser.feed(data[i:i + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+class TestJsonArrayStream:
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1024 * 1024])
+    def test_feed(self, chunk_size):
+        response = {
+            "TotalCount": 12345,  # Number split between chunks.
+            "Meta": {"Items": ["not", "these"], "Note": "Brackets in strings: ]}"},
+            "Items": [synthetic_excursion(_i) | {"Name": f"Výlet {_i}"} for _i in range(20)],
+            "Other": None,
+        }
+        data = json.dumps(response, ensure_ascii=False).encode()
+        assert _parse(data, chunk_size) == response["Items"]
+
+    def test_feed__incremental(self):
+        parser = JsonArrayStream("Items")
+        assert parser.feed(b'{"Items": [{"a": 1}, {"b"') == [{"a": 1}]
+        assert parser.feed(b': 2}]}') == [{"b": 2}]
+        assert parser.close() == []
+
+    def test_feed__split_values(self):
+        data = (
+            b'{"Total": -1.5e+3, "Flag": true, "Other": null, "Items": '
+            b'[{"a": "\\u00e9\\ud83d\\ude00", "b": false, "c": -0.25}]}'
+        )
+        assert _parse(data, chunk_size=1) == [{"a": "\u00e9\U0001f600", "b": False, "c": -0.25}]
+
+    def test_feed__invalid_before_end(self):
+        parser = JsonArrayStream("Items")
+        assert parser.feed(b'{"Items": [{"a": 1}, ') == [{"a": 1}]
+        # Raises without waiting for the rest of response.
+        with pytest.raises(ResponseParseError):
+            parser.feed(b'{"b": tx}, {"c": ')
+
+    @pytest.mark.parametrize(
+        "data", [b'{"Items": null}', b'{"Items": []}', b'{}', b' {"Other": 1} '],
+    )
+    def test_feed__no_items(self, data):
+        assert _parse(data, chunk_size=3) == []
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            pytest.param(b'{"Items": [{"a": 1}', id="incomplete"),
+            pytest.param(b'[{"a": 1}]', id="not_object"),
+            pytest.param(b'{"Items": {"a": 1}}', id="not_array"),
+            pytest.param(b'{"Items": [{"a": 1} {"b": 2}]}', id="missing_comma"),
+        ]
+    )
+    def test_feed__invalid(self, data):
+        with pytest.raises(ResponseParseError):
+            _parse(data, chunk_size=4)
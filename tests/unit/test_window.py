@@ -0,0 +1,120 @@
+import datetime
+
+from seeplaces.excursion import SeePlacesExcursion
+from seeplaces.window import (
+    MAX_WINDOW_RANGES,
+    ExcursionWindow,
+    merge_excursions,
+    month_windows,
+)
+
+
+def _date(month: int, day: int) -> datetime.date:
+    return datetime.date(2023, month, day)
+
+
+def _excursion(name: str) -> SeePlacesExcursion:
+    return SeePlacesExcursion(
+        Name=name,
+        FinalPrice=10.0,
+        PhotoPath=f"{name}.jpg",
+        Description="",
+        Currency="EUR",
+        IncludedInPrice=[],
+        IsAllDay=False,
+        IsManyDays=False,
+        DurationHours=1.0,
+        DurationDays=0.0,
+        HideDuration=False,
+    )
+
+
+def test_month_windows():
+    assert month_windows(_date(1, 5), _date(1, 20)) == [(_date(1, 5), _date(1, 20))]
+    assert month_windows(_date(1, 30), _date(3, 2)) == [
+        (_date(1, 30), _date(1, 31)),
+        (_date(2, 1), _date(2, 28)),
+        (_date(3, 1), _date(3, 2)),
+    ]
+    assert not month_windows(_date(1, 2), _date(1, 1))
+
+
+def test_merge_excursions():
+    first, second = _excursion("first"), _excursion("second")
+    assert merge_excursions([first], [_excursion("first"), second]) == [first, second]
+
+
+class TestExcursionWindow:
+
+    def test_gaps(self):
+        window = ExcursionWindow().merge(_date(1, 5), _date(1, 10), [])
+        window = window.merge(_date(1, 15), _date(1, 20), [])
+        assert window.gaps(_date(1, 1), _date(1, 31)) == [
+            (_date(1, 1), _date(1, 4)),
+            (_date(1, 11), _date(1, 14)),
+            (_date(1, 21), _date(1, 31)),
+        ]
+        # Range overlapping edge of query holds excursions of other dates, so it is not used.
+        assert window.gaps(_date(1, 8), _date(1, 12)) == [(_date(1, 8), _date(1, 12))]
+        assert window.gaps(_date(1, 6), _date(1, 9)) == []
+        assert ExcursionWindow().gaps(_date(1, 1), _date(1, 2)) == [(_date(1, 1), _date(1, 2))]
+
+    def test_covers(self):
+        window = ExcursionWindow().merge(_date(1, 5), _date(1, 10), [])
+        assert window.covers(_date(1, 5), _date(1, 10))
+        assert window.covers(_date(1, 6), _date(1, 8))
+        assert not window.covers(_date(1, 5), _date(1, 11))
+
+    def test_span(self):
+        assert ExcursionWindow().span is None
+        window = ExcursionWindow().merge(_date(1, 15), _date(1, 20), [])
+        window = window.merge(_date(1, 5), _date(1, 10), [])
+        assert window.span == (_date(1, 5), _date(1, 20))
+
+    def test_find(self):
+        first, second, third = _excursion("first"), _excursion("second"), _excursion("third")
+        window = ExcursionWindow().merge(_date(1, 1), _date(1, 7), [first, second])
+
+        assert window.find(_date(1, 1), _date(1, 7)) is window.ranges[0].excursions
+        assert window.find(_date(1, 3), _date(1, 5)) == [first, second]  # Containing range.
+        assert window.find(_date(1, 20), _date(1, 25)) is None  # Other dates are not answered.
+        assert window.find(_date(1, 5), _date(1, 10)) is None
+
+        window = window.merge(_date(1, 8), _date(1, 14), [first, third])
+        assert window.find(_date(1, 1), _date(1, 14)) == [first, second, third]  # Union of ranges.
+        assert window.find(_date(1, 1), _date(1, 20)) is None
+
+        # Smallest containing range is used.
+        window = window.merge(_date(1, 1), _date(1, 31), [first, second, third])
+        assert window.find(_date(1, 1), _date(1, 31)) == [first, second, third]
+        assert window.find(_date(1, 20), _date(1, 25)) == [first, second, third]
+
+    def test_merge(self):
+        first, second = _excursion("first"), _excursion("second")
+        window = ExcursionWindow().merge(_date(1, 1), _date(1, 7), [first])
+
+        merged = window.merge(_date(1, 8), _date(1, 14), [first, second])
+        assert merged.coverage == [(_date(1, 1), _date(1, 14))]  # Adjacent intervals are joined.
+        assert [_r.interval for _r in merged.ranges] == [
+            (_date(1, 1), _date(1, 7)),
+            (_date(1, 8), _date(1, 14)),
+        ]
+        assert window.coverage == [(_date(1, 1), _date(1, 7))]  # Original is not modified.
+
+        merged = merged.merge(_date(1, 20), _date(1, 25), [])
+        assert merged.coverage == [(_date(1, 1), _date(1, 14)), (_date(1, 20), _date(1, 25))]
+
+        # Ranges inside new range are replaced.
+        merged = merged.merge(_date(1, 1), _date(1, 14), [second])
+        assert [_r.interval for _r in merged.ranges] == [
+            (_date(1, 20), _date(1, 25)),
+            (_date(1, 1), _date(1, 14)),
+        ]
+        assert merged.find(_date(1, 2), _date(1, 3)) == [second]
+
+    def test_latest(self):
+        window = ExcursionWindow()
+        for day in range(1, 11):
+            window = window.merge(_date(1, day), _date(1, day), [])
+        assert [_r.date_from.day for _r in window.latest(3).ranges] == [8, 9, 10]
+        assert len(window.latest().ranges) == MAX_WINDOW_RANGES